@@ -1,22 +1,44 @@
+import importlib.util
 import logging
 logger = logging.getLogger('WattWatchersAPI')
 
 
 API_ENDPOINT = "https://api-v3.wattwatchers.com.au"
 API_KEY = ''
+# brotli is only negotiated when a decoder urllib3 supports is installed
+if any(importlib.util.find_spec(name) for name in ('brotli', 'brotlicffi')):
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+else:
+    ACCEPT_ENCODING = 'gzip, deflate'
+
 HEADERS = {
     'Authorization': 'Bearer '+ API_KEY,
-    'Content-Type': 'application/json'
+    'Content-Type': 'application/json',
+    'Accept-Encoding': ACCEPT_ENCODING
 }
 TIMEOUT = (5, 30)
 RETRY = None
 
 
 from .client import Client, GetRequest, PatchRequest
-from .exceptions import CommonError
+from .asyncclient import AsyncClient
+from .ratelimit import RateLimiter
+from .retry import RetryPolicy
+from .cache import WindowCache, TTLCache
+from .planner import WindowPlanner
+from .metrics import MetricsSink, Metrics
+from .profiling import Profiler, CallProfile, StageStats, StageSummary
+from .aggregation import Aggregate
+from .conversion import Convert, PowerFactor
+from .export import Export, ExportResult, CsvWriter, ParquetWriter, ArrowWriter
+from .sync import CursorStore, MemoryCursorStore, SqliteCursorStore
+from .simulator import Simulator, SimulatorAdapter, Serve
+from .columns import ShortColumns, LongColumns
+from .exceptions import CommonError, RetryError
+from .utilities import SetJsonBackend
 from .models import (
     RateLimits, ShortData, 
-    LongData, ModbusData, Device)
+    LongData, ModbusData, Device, FleetResult)
 
 
 
@@ -0,0 +1,77 @@
+"""
+Exports short energy, long energy or modbus data to partitioned files.
+
+Run from the directory containing the package:
+    python -m <package> short-energy --from 2021-01-01 --to 2021-02-01 --output export
+    python -m <package> long-energy D123 D456 --granularity hour --format parquet
+
+The api key is read from --api-key or the WATTWATCHERS_API_KEY environment
+variable. Every device of the key is exported when none are given.
+"""
+import argparse
+import os
+import sys
+from datetime import datetime
+from .client import Client
+from .enums import Energy, Granularity
+from .export import Export, EXPORTS, CsvWriter, ParquetWriter, ArrowWriter
+
+WRITERS = {
+    "csv": CsvWriter,
+    "parquet": ParquetWriter,
+    "arrow": ArrowWriter,
+}
+
+
+def _timestamp(value: str):
+    # epoch seconds, or an ISO 8601 date or time
+    if value.isdigit():
+        return int(value)
+
+    return datetime.fromisoformat(value)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("data", choices=list(EXPORTS), help="data to export")
+    parser.add_argument("devices", nargs="*", help="device ids, every device by default")
+    parser.add_argument("--from", dest="fromTs", type=_timestamp, help="start, epoch seconds or ISO 8601")
+    parser.add_argument("--to", dest="toTs", type=_timestamp, help="end, epoch seconds or ISO 8601")
+    parser.add_argument("--format", default="csv", choices=list(WRITERS), help="file format")
+    parser.add_argument("--output", default="export", help="directory the partitions are written under")
+    parser.add_argument("--timezone", help="timezone of long energy intervals and partition dates")
+    parser.add_argument("--granularity", default=str(Granularity.FifteenMinute),
+        choices=[str(g) for g in Granularity], help="long energy granularity")
+    parser.add_argument("--convert", choices=[str(e) for e in (Energy.Joules, Energy.KillowattHours, Energy.Killowatts)],
+        help="energy unit, converted locally from joules")
+    parser.add_argument("--workers", type=int, default=4, help="query windows to fetch in parallel")
+    parser.add_argument("--api-key", default=os.environ.get("WATTWATCHERS_API_KEY"), help="api key")
+    parser.add_argument("--endpoint", help="api endpoint, such as a simulator")
+    args = parser.parse_args(argv)
+
+    if not args.api_key:
+        parser.error("an api key is required, set --api-key or WATTWATCHERS_API_KEY")
+
+    client = Client(args.api_key, timezone=args.timezone, endpoint=args.endpoint, localConvert=True)
+    deviceIds = args.devices or [d.Id for d in client.devices()]
+
+    kwargs = {}
+    if args.data != "modbus" and args.convert:
+        kwargs["convert"] = args.convert
+    if args.data == "long-energy":
+        kwargs["granularity"] = Granularity(args.granularity)
+        kwargs["timezone"] = args.timezone
+
+    writer = WRITERS[args.format](args.output, timezone=args.timezone)
+    result = Export(client, args.data, deviceIds, writer,
+        args.fromTs, args.toTs, maxWorkers=args.workers, **kwargs)
+
+    print(f"{result.Rows:,} rows written to {len(result.Files):,} files under {args.output}")
+    for deviceId, error in result.Errors.items():
+        print(f"{deviceId} failed: {error}", file=sys.stderr)
+
+    return 1 if result.Errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,169 @@
+from dataclasses import fields, replace
+from datetime import datetime, timedelta, timezone as dtTimezone
+from typing import Optional, List, Iterable, Union
+from zoneinfo import ZoneInfo
+from .enums import Energy, Granularity
+from .columns import ShortColumns, LongColumns, _requireNumpy
+from .models import ShortData, LongData
+from .utilities import GRANULARITY_MINUTES
+
+try:
+    import numpy as np
+except ImportError: # pragma: no cover - optional dependency
+    np = None
+
+__all__ = [
+    "Aggregate"
+]
+
+# energy units summed across intervals, power units are averaged by duration
+SUMMED_UNITS = (str(Energy.Joules), str(Energy.KillowattHours))
+AVERAGED_UNITS = (str(Energy.Killowatts),)
+
+# utc offsets can only change on a quarter hour
+_OFFSET_STEP = 900
+_DAY = 86400
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _offsets(timestamps: "np.ndarray", timezone: Optional[str]) -> "np.ndarray":
+    """
+    UTC offset in seconds of each timestamp, looked up once per quarter hour.
+    """
+    if not timezone:
+        return np.zeros(len(timestamps), dtype=np.int64)
+
+    zone = ZoneInfo(timezone)
+    quarters, inverse = np.unique(timestamps // _OFFSET_STEP, return_inverse=True)
+    offsets = np.array([
+        int(datetime.fromtimestamp(int(q) * _OFFSET_STEP, zone).utcoffset().total_seconds())
+        for q in quarters], dtype=np.int64)
+
+    return offsets[inverse]
+
+
+def _bucketStarts(timestamps: "np.ndarray", granularity: Granularity, timezone: Optional[str]) -> "np.ndarray":
+    """
+    Epoch start of the granularity interval each timestamp falls in,
+    following the local clock of the timezone. Weeks start on a Monday.
+    """
+    offsets = _offsets(timestamps, timezone)
+    local = timestamps + offsets
+
+    if granularity in GRANULARITY_MINUTES:
+        step = GRANULARITY_MINUTES[granularity] * 60
+        # the offset is constant within an interval, so the local start maps straight back
+        return local - local % step - offsets
+
+    days = local // _DAY
+    if granularity == Granularity.Weekly:
+        # the epoch was a Thursday
+        days -= (days + 3) % 7
+    elif granularity == Granularity.Monthly:
+        months = days.astype('datetime64[D]').astype('datetime64[M]')
+        days = months.astype('datetime64[D]').astype(np.int64)
+
+    # local midnights are converted once per interval, the offset may differ from the samples
+    keys, inverse = np.unique(days, return_inverse=True)
+    zone = ZoneInfo(timezone) if timezone else dtTimezone.utc
+    starts = np.array([
+        int((_EPOCH + timedelta(days=int(d))).replace(tzinfo=zone).timestamp())
+        for d in keys], dtype=np.int64)
+
+    return starts[inverse]
+
+
+def _sums(values: "np.ndarray", boundaries: "np.ndarray") -> "np.ndarray":
+    # NaN intervals are skipped, a bucket without any value stays NaN
+    valid = np.add.reduceat((~np.isnan(values)).astype(np.int64), boundaries, axis=0)
+    sums = np.add.reduceat(np.nan_to_num(values), boundaries, axis=0)
+    sums[valid == 0] = np.nan
+
+    return sums
+
+
+def _means(values: "np.ndarray", durations: "np.ndarray", boundaries: "np.ndarray") -> "np.ndarray":
+    weights = np.where(np.isnan(values), 0, durations[:, None]).astype(np.float64)
+    total = np.add.reduceat(weights, boundaries, axis=0)
+    weighted = np.add.reduceat(np.nan_to_num(values) * weights, boundaries, axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(total > 0, weighted / total, np.nan)
+
+
+def _rollup(columns: ShortColumns, granularity: Granularity, timezone: Optional[str]) -> LongColumns:
+    unit = str(columns.Unit) if columns.Unit is not None else str(Energy.Joules)
+    if unit not in SUMMED_UNITS and unit not in AVERAGED_UNITS:
+        raise ValueError(f"short energy in {unit} cannot be aggregated")
+
+    if len(columns) == 0:
+        return LongColumns(Timestamp=np.zeros(0, dtype=np.int64),
+            Duration=np.zeros(0, dtype=np.int64), Unit=columns.Unit)
+
+    order = np.argsort(columns.Timestamp, kind='stable')
+    if np.any(order != np.arange(len(order))):
+        columns = replace(columns, **{f.name: getattr(columns, f.name)[order] for f in fields(columns)
+            if isinstance(getattr(columns, f.name), np.ndarray)})
+
+    starts = _bucketStarts(columns.Timestamp, granularity, timezone)
+    boundaries = np.flatnonzero(np.r_[True, starts[1:] != starts[:-1]])
+    durations = columns.Duration
+
+    if unit in SUMMED_UNITS:
+        combine = lambda values: _sums(values, boundaries)
+    else:
+        combine = lambda values: _means(values, durations, boundaries)
+
+    values = {}
+    for name in ('Real', 'Reactive'):
+        energy = getattr(columns, name)
+        if energy is None:
+            continue
+
+        values[name] = combine(energy)
+        # split by direction, negative energy is reported as a positive magnitude
+        values[name + 'Positive'] = combine(np.maximum(energy, 0.0))
+        values[name + 'Negative'] = combine(np.maximum(-energy, 0.0))
+
+    for name in ('VoltageRMS', 'CurrentRMS'):
+        rms = getattr(columns, name)
+        if rms is None:
+            continue
+
+        # fmin and fmax ignore NaN unless every interval of the bucket is NaN
+        values[name + 'Min'] = np.fmin.reduceat(rms, boundaries, axis=0)
+        values[name + 'Max'] = np.fmax.reduceat(rms, boundaries, axis=0)
+
+    return LongColumns(
+        Timestamp=starts[boundaries],
+        Duration=np.add.reduceat(durations, boundaries),
+        Unit=columns.Unit,
+        **values)
+
+
+def Aggregate(
+        data: Union[ShortColumns, Iterable[ShortData]],
+        granularity: Union[str, Granularity],
+        timezone: str = None) -> Union[LongColumns, List[LongData]]:
+    """
+    Rolls short energy up into long energy intervals locally, instead of
+    requesting the same period again from longEnergy.
+
+    Energy in J or kWh is summed and power in kW is averaged by duration,
+    each split into its positive and negative parts, and the RMS voltage
+    and current become the minimum and maximum of each interval. Duration
+    is the seconds of short energy in the interval, so an interval only
+    partly covered by the data has a shorter duration than its length.
+
+    data : ShortColumns, List[ShortData] - short energy in J, kWh or kW
+    granularity : str, Granularity - interval to roll up to
+    timezone : str - IANA timezone name the intervals follow, defaults to UTC
+
+    return : LongColumns, List[LongData] - long energy, as columns when given columns
+    """
+    _requireNumpy()
+    granularity = Granularity(granularity)
+
+    if isinstance(data, ShortColumns):
+        return _rollup(data, granularity, timezone)
+
+    return _rollup(ShortColumns.fromRecords(data), granularity, timezone).toRecords()
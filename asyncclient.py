@@ -0,0 +1,574 @@
+import asyncio
+from time import perf_counter
+from datetime import datetime
+from typing import List, Dict, Union, Tuple, Callable, Awaitable
+from . import TIMEOUT, API_ENDPOINT, HEADERS, logger
+from .client import (
+    _parseHeaders, _recordRateLimits, _NO_METRICS, SHORT_ENERGY_QUERY_PERIOD, MODBUS_QUERY_PERIOD,
+    LONG_ENERGY_QUERY_PERIODS)
+from .ratelimit import RateLimiter
+from .retry import RetryPolicy
+from .metrics import MetricsSink, EndpointLabel
+from .exceptions import CommonError, UnprocessableEntityError, RetryError
+from .enums import Energy, Groups, Granularity
+from .utilities import NormaliseTimestamps, CreateQueryWindows, JsonLoads
+from .models import (
+    RateLimits, Device, DeviceSchema,
+    ShortData, ShortDataSchema, LongData, LongDataSchema,
+    ModbusData, ModbusDataSchema,
+    ChannelCategory, ChannelCategorySchema,
+    DeviceModel, DeviceModelSchema)
+
+try:
+    import aiohttp
+except ImportError: # pragma: no cover - optional dependency
+    aiohttp = None
+
+__all__ = [
+    "AsyncClient",
+    "AsyncGetRequest",
+    "AsyncPatchRequest",
+    "AsyncApiRequest"
+]
+
+TOO_MANY_REQUESTS = 429
+UNPROCESSABLE_ENTITY = 422
+
+
+def _clientTimeout(timeout: Union[int, float, Tuple[int, int]]):
+    if isinstance(timeout, tuple):
+        return aiohttp.ClientTimeout(sock_connect=timeout[0], sock_read=timeout[1])
+
+    return aiohttp.ClientTimeout(total=timeout)
+
+
+def _cleanParams(params: Dict) -> Dict[str, str]:
+    # aiohttp rejects None values where requests silently drops them
+    return {k: str(v) for k, v in params.items() if v is not None}
+
+
+async def AsyncGetRequest(
+    url: str,
+    session: "aiohttp.ClientSession",
+    timeout: Union[int, float, Tuple[int, int]] = 3,
+    headers: Dict[str, str] = {},
+    retry = 3,
+    params = {},
+    limiter: RateLimiter = None,
+    metrics: MetricsSink = None,
+    **kwargs
+) -> Tuple[bytes, RateLimits]:
+    params = {
+        "timeout": _clientTimeout(timeout),
+        "params": _cleanParams(params),
+        **kwargs,
+    }
+
+    async def requestFunc():
+        async with session.get(url, **params) as response:
+            return response, await response.read()
+
+    endpoint = EndpointLabel(url) if metrics is not None else None
+    return await AsyncApiRequest(requestFunc, retry, limiter, metrics, endpoint)
+
+
+async def AsyncPatchRequest(
+    url: str,
+    session: "aiohttp.ClientSession",
+    timeout: Union[int, float, Tuple[int, int]] = 3,
+    headers: Dict[str, str] = {},
+    retry = 3,
+    params = {},
+    limiter: RateLimiter = None,
+    metrics: MetricsSink = None,
+    **kwargs
+) -> Tuple[bytes, RateLimits]:
+    params = {
+        "timeout": _clientTimeout(timeout),
+        "json": params,
+        **kwargs,
+    }
+
+    async def requestFunc():
+        async with session.patch(url, **params) as response:
+            return response, await response.read()
+
+    endpoint = EndpointLabel(url) if metrics is not None else None
+    return await AsyncApiRequest(requestFunc, retry, limiter, metrics, endpoint)
+
+
+async def _responseError(response, rateLimits: RateLimits) -> Exception:
+    try:
+        content = await response.json(content_type=None)
+        if response.status == UNPROCESSABLE_ENTITY:
+            return UnprocessableEntityError(content)
+
+        return CommonError(content, rateLimits)
+    except Exception:
+        try:
+            response.raise_for_status()
+        except aiohttp.ClientResponseError as e:
+            return e
+
+        return aiohttp.ClientResponseError(response.request_info, response.history,
+            status=response.status, message=response.reason)
+
+async def AsyncApiRequest(
+    requestFunc: Callable[[], Awaitable],
+    retry: Union[int, RetryPolicy] = 3,
+    limiter: RateLimiter = None,
+    metrics: MetricsSink = None,
+    endpoint: str = None,
+) -> Tuple[bytes, RateLimits]:
+    """
+    Coroutine version of ApiRequest.
+
+    raises : RetryError - when a retryable failure outlasts the retries or the retry budget
+    """
+    policy = retry if isinstance(retry, RetryPolicy) else RetryPolicy(retry or 0)
+    policy.deposit()
+    if metrics is None:
+        metrics = _NO_METRICS
+    endpoint = endpoint or "unknown"
+
+    attempt = 0
+    throttles = 0
+    while True:
+        if limiter is not None:
+            delay = limiter.reserve()
+            if delay > 0:
+                metrics.increment("ratelimit_wait_seconds_total", delay, endpoint=endpoint)
+                await asyncio.sleep(delay)
+
+        retryAfter = None
+        throttled = False
+        started = perf_counter()
+        try:
+            response, content = await requestFunc()
+        except (asyncio.TimeoutError, aiohttp.ClientConnectionError) as e:
+            error = e
+            reason = "timeout" if isinstance(e, asyncio.TimeoutError) else "connection"
+            metrics.observe("request_seconds", perf_counter() - started, endpoint=endpoint, status=reason)
+        else:
+            metrics.observe("request_seconds", perf_counter() - started,
+                endpoint=endpoint, status=response.status)
+            metrics.increment("requests_total", endpoint=endpoint, status=response.status)
+            rateLimits = _parseHeaders(response)
+            _recordRateLimits(metrics, rateLimits)
+            if limiter is not None:
+                limiter.update(rateLimits)
+            if response.ok:
+                # aiohttp only exposes the decompressed body, so use the header when it is sent
+                length = response.content_length if response.content_length is not None else len(content)
+                metrics.increment("response_bytes_total", length, endpoint=endpoint)
+                return (content, rateLimits)
+
+            error = await _responseError(response, rateLimits)
+            if not policy.isRetryable(response.status, rateLimits):
+                raise error
+
+            throttled = response.status == TOO_MANY_REQUESTS
+            if throttled:
+                metrics.increment("throttled_total", endpoint=endpoint)
+            reason = response.status
+            retryAfter = rateLimits.RetryAfter
+            if retryAfter is None and throttled:
+                retryAfter = rateLimits.TotalPerSecondResetCounter
+
+        # 429s and failures are retried on separate counts
+        count = throttles if throttled else attempt
+        if not policy.withdraw(count, throttled):
+            raise RetryError(attempt + throttles + 1, error) from error
+
+        delay = policy.delay(count, retryAfter)
+        if throttled:
+            throttles += 1
+        else:
+            attempt += 1
+        metrics.increment("retries_total", endpoint=endpoint, reason=reason)
+
+        if throttled and limiter is not None:
+            # the limiter holds this and every other request until the limit
+            # resets, so the wait is taken once, when the retry reserves a token
+            limiter.block(delay)
+            continue
+
+        metrics.increment("backoff_seconds_total", delay, endpoint=endpoint)
+        await asyncio.sleep(delay)
+
+
+class AsyncClient:
+    """
+    Asyncio Watt Watchers client for the Version 3 REST API.
+
+    Mirrors Client, but every request method is a coroutine and all
+    requests share a single aiohttp connection pool. Use as an async
+    context manager, or await close() when finished.
+    """
+
+    def __init__(self,
+            apiKey: str,
+            timezone: str = None,
+            timeout: Union[int, float, Tuple[int, int]] = None,
+            retry: Union[int, RetryPolicy] = 3,
+            headers: Dict[str, str] = None,
+            endpoint: str = None,
+            connectionLimit: int = 100,
+            connectionLimitPerHost: int = 0,
+            rateLimiter: RateLimiter = None,
+            metrics: MetricsSink = None
+        ):
+        """
+        metrics : MetricsSink - receives request, retry and rate limit metrics, such as Metrics
+        """
+        if aiohttp is None:
+            raise ImportError("AsyncClient requires the aiohttp package")
+
+        self.timezone = timezone
+        self.timeout = timeout or TIMEOUT
+        self.retry = retry if isinstance(retry, RetryPolicy) else RetryPolicy(retry or 0)
+        self.endpoint = endpoint or API_ENDPOINT
+        self.connectionLimit = connectionLimit
+        self.connectionLimitPerHost = connectionLimitPerHost
+        self.rateLimiter = rateLimiter or RateLimiter()
+        self.metrics = metrics
+
+        self.__headers = {
+            **HEADERS,
+            **(headers or {}),
+            "Authorization": "Bearer " + apiKey
+        }
+        # the session binds to the running event loop, so create it on first use
+        self.__session = None
+
+        self.__deviceSchema = DeviceSchema()
+        self.__deviceSchema.context['client'] = self
+        self.__schemas = {}
+
+    @property
+    def RateLimits(self) -> RateLimits:
+        """
+        Rate limits across every request of the client, see Client.RateLimits.
+        """
+        return self.rateLimiter.RateLimits
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    async def close(self):
+        if self.__session is not None:
+            await self.__session.close()
+            self.__session = None
+
+    def _session(self) -> "aiohttp.ClientSession":
+        if self.__session is None or self.__session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.connectionLimit,
+                limit_per_host=self.connectionLimitPerHost)
+            self.__session = aiohttp.ClientSession(
+                headers=self.__headers, connector=connector)
+
+        return self.__session
+
+    def _schema(self, schemaClass, unit):
+        # coroutines interleave between request and decode, so each unit
+        # gets its own schema rather than mutating a shared context
+        key = (schemaClass, str(unit))
+        schema = self.__schemas.get(key)
+        if schema is None:
+            schema = schemaClass()
+            schema.context['unit'] = str(unit)
+            self.__schemas[key] = schema
+
+        return schema
+
+    async def _get(self, url: str, params = {}, **kwargs) -> bytes:
+        content, _ = await AsyncGetRequest(url,
+            self._session(), self.timeout,
+            retry=self.retry, limiter=self.rateLimiter, metrics=self.metrics, params=params, **kwargs)
+
+        return content
+
+    async def devices(self, hydrate: bool = False, maxWorkers: int = 4, **kwargs) -> List[Device]:
+        """
+        Retrieves all device ids and wraps them in a Device object.
+
+        Unlike Client, the devices are not lazily loaded as attribute
+        access cannot be awaited. Pass hydrate, or await hydrate(), before
+        reading anything but the Id.
+
+        hydrate : bool - fetch every full device record up front, see hydrate()
+        maxWorkers : int - number of device records to fetch concurrently when hydrating
+
+        return : List[Device] - Device instances with only the Id set, unless hydrated
+        """
+
+        url = f"{self.endpoint}/devices"
+        content = await self._get(url, **kwargs)
+
+        devices = [Device(deviceId, _client=self) for deviceId in JsonLoads(content)]
+        if hydrate:
+            await self.hydrate(devices, maxWorkers, **kwargs)
+
+        return devices
+
+    async def hydrate(self, devices: List[Device], maxWorkers: int = 4, **kwargs) -> List[Device]:
+        """
+        Fetches the full record of every partial device concurrently and
+        fills them in place, see Client.hydrate. Devices that fail to load
+        are logged and left partial.
+
+        devices : List[Device] - devices as returned by devices()
+        maxWorkers : int - number of device records to fetch concurrently
+
+        return : List[Device] - the same devices
+        """
+        semaphore = asyncio.Semaphore(maxWorkers)
+
+        async def fetch(device: Device):
+            async with semaphore:
+                try:
+                    device._hydrate(await self.device(device.Id, **kwargs))
+                except Exception as e:
+                    logger.warning(f"{device.Id} failed to hydrate: {e}")
+
+        await asyncio.gather(*[fetch(d) for d in devices if d._isPartial])
+        return devices
+
+    async def device(self, deviceId: str, **kwargs) -> Device:
+        url = f"{self.endpoint}/devices/{deviceId}"
+        content = await self._get(url, **kwargs)
+
+        return self.__deviceSchema.loads(content)
+
+    async def updateDevice(self, deviceId: Union[str, Device], updateFields, **kwargs) -> Device:
+        url = f"{self.endpoint}/devices/{deviceId}"
+        body = {
+            "id": deviceId,
+        }
+        validFields = ("label", "timezone", "channels", "phases", "switches")
+        for key in updateFields.keys():
+            newKey = key[0].lower() + key[1:]
+            if newKey in validFields:
+                body[newKey] = updateFields[key]
+            else:
+                logger.warning(f"{key} is not a valid update field")
+
+        await AsyncPatchRequest(url,
+            self._session(), self.timeout,
+            retry=self.retry, limiter=self.rateLimiter, metrics=self.metrics, params=body,
+            **kwargs)
+
+    async def channelCategories(self, **kwargs) -> List[ChannelCategory]:
+        url = f"{self.endpoint}/devices/channel-categories"
+        content = await self._get(url, **kwargs)
+
+        return ChannelCategorySchema().loads(content, many=True)
+
+    async def modelTypes(self, **kwargs) -> List[DeviceModel]:
+        url = f"{self.endpoint}/devices/models"
+        content = await self._get(url, **kwargs)
+
+        return DeviceModelSchema().loads(content, many=True)
+
+    async def shortEnergy(self,
+            deviceId: str,
+            fromTs: Union[int, datetime] = None,
+            toTs: Union[int, datetime] = None,
+            filter: Union[str, Groups] = None,
+            convert: Union[str, Energy] = None,
+            fields: Union[str, Energy] = None,
+            **kwargs) -> List[ShortData]:
+        """
+        Returns short energy data for a specific device, see
+        Client.shortEnergy.
+        """
+        url = f"{self.endpoint}/short-energy/{deviceId}"
+        maxQueryPeriod = SHORT_ENERGY_QUERY_PERIOD
+
+        fromTs, toTs = NormaliseTimestamps(fromTs, toTs, maxQueryPeriod)
+        params = dict()
+
+        if filter is not None:
+            params['filter[group]'] = str(filter)
+
+        unit = Energy.Joules
+        if convert is not None:
+            params['convert[energy]'] = str(convert)
+            unit = convert
+
+        if fields is not None:
+            params['fields[energy]'] = str(fields)
+
+        schema = self._schema(ShortDataSchema, unit)
+        data = []
+        windows = CreateQueryWindows(fromTs, toTs, maxQueryPeriod)
+        for period in windows:
+            requestParams = {"fromTs": int(period[0].timestamp()), "toTs": int(period[1].timestamp()), **params}
+            content = await self._get(url, params=requestParams, **kwargs)
+
+            data.extend(schema.loads(content, many=True))
+
+        return data
+
+    async def firstShortEnergy(self,
+            deviceId: str,
+            filter: Union[str, Groups] = None,
+            convert: Union[str, Energy] = None,
+            fields: Union[str, Energy] = None,
+            **kwargs) -> ShortData:
+
+        url = f"{self.endpoint}/short-energy/{deviceId}/first"
+        params = dict()
+
+        if filter is not None:
+            params['filter'] = str(filter)
+
+        unit = Energy.Joules
+        if convert is not None:
+            params['convert'] = str(convert)
+            unit = convert
+
+        if fields is not None:
+            params['fields'] = str(fields)
+
+        content = await self._get(url, params=params, **kwargs)
+        return self._schema(ShortDataSchema, unit).loads(content)
+
+    async def latestShortEnergy(self,
+            deviceId: str,
+            filter: Union[str, Groups] = None,
+            convert: Union[str, Energy] = None,
+            fields: Union[str, Energy] = None,
+            **kwargs) -> ShortData:
+
+        url = f"{self.endpoint}/short-energy/{deviceId}/latest"
+        params = dict()
+
+        if filter is not None:
+            params['filter[group]'] = str(filter)
+
+        unit = Energy.Joules
+        if convert is not None:
+            params['convert[energy]'] = str(convert)
+            unit = convert
+
+        if fields is not None:
+            params['fields[energy]'] = str(fields)
+
+        content = await self._get(url, params=params, **kwargs)
+        return self._schema(ShortDataSchema, unit).loads(content)
+
+    async def longEnergy(self,
+            deviceId: str,
+            fromTs: Union[int, datetime] = None,
+            toTs: Union[int, datetime] = None,
+            granularity: Union[str, Granularity] = Granularity.FifteenMinute,
+            timezone: str = None,
+            filter: Union[str, Groups] = None,
+            convert: Union[str, Energy] = None,
+            fields: Union[str, Energy] = None,
+            **kwargs) -> List[LongData]:
+
+        if granularity not in LONG_ENERGY_QUERY_PERIODS:
+            raise ValueError(granularity)
+
+        maxQueryPeriod = LONG_ENERGY_QUERY_PERIODS[granularity][0]
+        extendPeriod = LONG_ENERGY_QUERY_PERIODS[granularity][1]
+        url = f"{self.endpoint}/long-energy/{deviceId}"
+
+        params = {"granularity": str(granularity), "timezone": timezone or self.timezone}
+        fromTs, toTs = NormaliseTimestamps(fromTs, toTs, extendPeriod)
+
+        if filter is not None:
+            params['filter[group]'] = str(filter)
+
+        unit = Energy.Joules
+        if convert is not None:
+            params['convert[energy]'] = str(convert)
+            unit = convert
+
+        if fields is not None:
+            params['fields[energy]'] = str(fields)
+
+        schema = self._schema(LongDataSchema, unit)
+        data = []
+        windows = CreateQueryWindows(fromTs, toTs, maxQueryPeriod)
+        for period in windows:
+            requestParams = {"fromTs": int(period[0].timestamp()), "toTs": int(period[1].timestamp()), **params}
+            content = await self._get(url, params=requestParams, **kwargs)
+
+            data.extend(schema.loads(content, many=True))
+
+        return data
+
+    async def firstLongEnergy(self,
+            deviceId: str,
+            filter: Union[str, Groups] = None,
+            convert: Union[str, Energy] = None,
+            fields: Union[str, Energy] = None,
+            **kwargs) -> LongData:
+        url = f"{self.endpoint}/long-energy/{deviceId}/first"
+        params = {}
+
+        if filter is not None:
+            params['filter'] = str(filter)
+
+        unit = Energy.Joules
+        if convert is not None:
+            params['convert'] = str(convert)
+            unit = convert
+
+        if fields is not None:
+            params['fields'] = str(fields)
+
+        content = await self._get(url, params=params, **kwargs)
+        return self._schema(LongDataSchema, unit).loads(content)
+
+    async def latestLongEnergy(self,
+            deviceId: str,
+            filter: Union[str, Groups] = None,
+            convert: Union[str, Energy] = None,
+            fields: Union[str, Energy] = None,
+            **kwargs) -> LongData:
+
+        url = f"{self.endpoint}/long-energy/{deviceId}/latest"
+        params = {}
+
+        if filter is not None:
+            params['filter'] = str(filter)
+
+        unit = Energy.Joules
+        if convert is not None:
+            params['convert'] = str(convert)
+            unit = convert
+
+        if fields is not None:
+            params['fields'] = str(fields)
+
+        content = await self._get(url, params=params, **kwargs)
+        return self._schema(LongDataSchema, unit).loads(content)
+
+    async def modbus(self,
+            deviceId: str,
+            fromTs: Union[int, datetime] = None,
+            toTs: Union[int, datetime] = None,
+            **kwargs) -> List[ModbusData]:
+        url = f"{self.endpoint}/modbus/{deviceId}"
+        maxQueryPeriod = MODBUS_QUERY_PERIOD
+
+        fromTs, toTs = NormaliseTimestamps(fromTs, toTs, maxQueryPeriod)
+
+        schema = ModbusDataSchema()
+        data = []
+        windows = CreateQueryWindows(fromTs, toTs, maxQueryPeriod)
+        for period in windows:
+            requestParams = {"fromTs": int(period[0].timestamp()), "toTs": int(period[1].timestamp())}
+            content = await self._get(url, params=requestParams, **kwargs)
+
+            data.extend(schema.loads(content, many=True))
+
+        return data
@@ -0,0 +1,110 @@
+"""
+Runs every benchmark and compares the results with a stored baseline.
+
+Run from the directory containing the package:
+    python -m <package>.benchmarks              # run and compare with baseline.json
+    python -m <package>.benchmarks --save       # run and store as the new baseline
+
+Exits with status 1 when a result is worse than the baseline by more
+than the tolerance, so it can gate changes to the hot paths. Results
+vary between machines, so save a baseline on the machine that compares.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+from . import models, decode, windows, fetch
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+SUITES = {
+    "models": models.Run,
+    "decode": decode.Run,
+    "windows": windows.Run,
+    "fetch": fetch.Run,
+}
+
+
+def _higherIsBetter(name: str) -> bool:
+    # rates improve upwards, durations, sizes and per row costs downwards
+    return name.endswith("/s")
+
+
+def Compare(results: dict, baseline: dict, tolerance: float, absolute: float = 1.0) -> list:
+    """
+    absolute : float - amount a result may be worse than a zero baseline,
+        which has no relative change, such as a count of 429 responses
+
+    return : list - (name, baseline, result, change) of every regression,
+        the change is absolute against a zero baseline and relative otherwise
+    """
+    regressions = []
+    for name, value in results.items():
+        expected = baseline.get(name)
+        if expected is None:
+            continue
+
+        if expected == 0:
+            worse = value if not _higherIsBetter(name) else -value
+            if worse > absolute:
+                regressions.append((name, expected, value, -worse))
+            continue
+
+        change = (value - expected) / expected
+        if not _higherIsBetter(name):
+            change = -change
+        if change < -tolerance:
+            regressions.append((name, expected, value, change))
+
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("suites", nargs="*", metavar="suite",
+        help=f"suites to run, all by default: {', '.join(SUITES)}")
+    parser.add_argument("--save", action="store_true", help="store the results as the baseline")
+    parser.add_argument("--baseline", default=BASELINE, help="baseline file")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+        help="fraction a result may be worse than the baseline")
+    parser.add_argument("--absolute", type=float, default=1.0,
+        help="amount a result may be worse than a baseline of zero")
+    args = parser.parse_args(argv)
+    for suite in args.suites:
+        if suite not in SUITES:
+            parser.error(f"unknown suite {suite}")
+
+    results = {}
+    for suite in args.suites or SUITES:
+        for name, value in SUITES[suite]().items():
+            results[f"{suite}: {name}"] = value
+            print(f"{suite + ': ' + name:<64}{value:>16,.3f}")
+
+    if args.save:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f).get("results", {})
+        baseline.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump({"python": platform.python_version(), "results": baseline}, f, indent=2, sort_keys=True)
+        print(f"baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"no baseline at {args.baseline}, run with --save to create one")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)["results"]
+
+    regressions = Compare(results, baseline, args.tolerance, args.absolute)
+    for name, expected, value, change in regressions:
+        change = f"{change:+.0%}" if expected else f"{-change:+,.3f}"
+        print(f"REGRESSION {name}: {expected:,.3f} -> {value:,.3f} ({change})")
+
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""
+Benchmarks decoding of energy and modbus payloads, through the
+marshmallow schemas and through FastDecoder, and checks both produce
+the same records.
+
+Run from the directory containing the package:
+    python -m <package>.benchmarks.decode
+"""
+from time import perf_counter
+from typing import Callable
+from ..enums import Energy
+from ..models import ShortDataSchema, LongDataSchema, ModbusDataSchema
+from ..decoders import SHORT_DATA_DECODER, LONG_DATA_DECODER, MODBUS_DATA_DECODER
+from .payloads import ShortEnergyRows, LongEnergyRows, ModbusRows, Encode
+
+ROWS = 1440 # 12 hours of 30 second short energy, one query window
+CHANNELS = (3, 6, 12)
+REPEAT = 5
+
+
+def _best(func: Callable, repeat: int = REPEAT, number: int = 1) -> float:
+    """
+    return : float - fastest seconds per call of repeat runs, each of number calls
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        started = perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, (perf_counter() - started) / number)
+
+    return best
+
+
+def _schema(schemaClass, unit=None):
+    schema = schemaClass()
+    if unit is not None:
+        schema.context['unit'] = unit
+
+    return schema
+
+
+def CheckParity():
+    """
+    Raises AssertionError when FastDecoder and the schema disagree on any payload.
+    """
+    cases = [
+        (ShortDataSchema, SHORT_DATA_DECODER, ShortEnergyRows(50), (Energy.Joules, Energy.Killowatts)),
+        (LongDataSchema, LONG_DATA_DECODER, LongEnergyRows(50), (Energy.Joules, Energy.KillowattHours)),
+        (ModbusDataSchema, MODBUS_DATA_DECODER, ModbusRows(50), (None,)),
+    ]
+    for schemaClass, decoder, rows, units in cases:
+        content = Encode(rows)
+        for unit in units:
+            expected = _schema(schemaClass, unit).loads(content, many=True)
+            actual = decoder.loads(content, unit, many=True)
+            assert actual == expected, f"{schemaClass.__name__} differs from FastDecoder in {unit}"
+
+
+def Run() -> dict:
+    CheckParity()
+    results = {}
+
+    cases = [("ShortData", ShortDataSchema, SHORT_DATA_DECODER, ShortEnergyRows),
+        ("LongData", LongDataSchema, LONG_DATA_DECODER, LongEnergyRows)]
+    for name, schemaClass, decoder, rowsFunc in cases:
+        for channels in CHANNELS:
+            content = Encode(rowsFunc(ROWS, channels))
+            schema = _schema(schemaClass, Energy.Joules)
+            results[f"{name} {channels}ch schema rows/s"] = \
+                ROWS / _best(lambda: schema.loads(content, many=True))
+            results[f"{name} {channels}ch fast rows/s"] = \
+                ROWS / _best(lambda: decoder.loads(content, Energy.Joules, many=True))
+
+    content = Encode(ModbusRows(ROWS))
+    schema = _schema(ModbusDataSchema)
+    results["ModbusData schema rows/s"] = ROWS / _best(lambda: schema.loads(content, many=True))
+    results["ModbusData fast rows/s"] = ROWS / _best(lambda: MODBUS_DATA_DECODER.loads(content, None, many=True))
+
+    # pre_load on its own, less the cost of copying the rows it mutates
+    rows = ShortEnergyRows(ROWS, 6)
+    copyTime = _best(lambda: [dict(row) for row in rows])
+    for unit in (Energy.Joules, Energy.Killowatts):
+        schema = _schema(ShortDataSchema, unit)
+        elapsed = _best(lambda: [schema.pre_load(dict(row)) for row in rows])
+        results[f"pre_load {unit} us/row"] = max(0.0, elapsed - copyTime) / ROWS * 1e6
+
+    return results
+
+
+if __name__ == '__main__':
+    for name, value in Run().items():
+        print(f"{name:<34}{value:>16,.2f}")
@@ -0,0 +1,70 @@
+"""
+Benchmarks shortEnergy and longEnergy end to end, from the request
+through windowing, transport and decoding, against the local api
+simulator so no api quota is used.
+
+Run from the directory containing the package:
+    python -m <package>.benchmarks.fetch
+"""
+from datetime import datetime, timedelta, timezone
+from time import perf_counter
+from requests.adapters import BaseAdapter
+from ..client import Client
+from ..enums import Granularity
+from ..simulator import Simulator, SimulatorAdapter
+from .decode import _best
+
+ENDPOINT = "http://benchmark.invalid"
+FROM_TS = datetime(2021, 1, 1, tzinfo=timezone.utc)
+DEVICE = "D100001" # a 6 channel device
+
+
+def _simulator() -> Simulator:
+    # no limits or latency, and the simulator keeps every window body so
+    # repeated runs measure the client only
+    return Simulator(devices=2, perSecond=None, perDay=None, cacheSize=1024,
+        now=(FROM_TS + timedelta(days=120)).timestamp(), history=timedelta(days=3650))
+
+
+def _client(adapter: BaseAdapter, **kwargs) -> Client:
+    return Client("benchmark", endpoint=ENDPOINT, adapter=adapter, **kwargs)
+
+
+def Run() -> dict:
+    results = {}
+    adapter = SimulatorAdapter(_simulator())
+
+    toTs = FROM_TS + timedelta(days=7)
+    for fastDecode in (False, True):
+        for maxWorkers in (None, 4):
+            client = _client(adapter, fastDecode=fastDecode)
+            count = len(client.shortEnergy(DEVICE, FROM_TS, toTs, maxWorkers=maxWorkers))
+            name = f"shortEnergy 7d {'fast' if fastDecode else 'schema'} workers={maxWorkers or 1} rows/s"
+            results[name] = count / _best(
+                lambda: client.shortEnergy(DEVICE, FROM_TS, toTs, maxWorkers=maxWorkers), repeat=3)
+
+    toTs = FROM_TS + timedelta(days=90)
+    for fastDecode in (False, True):
+        client = _client(adapter, fastDecode=fastDecode)
+        count = len(client.longEnergy(DEVICE, FROM_TS, toTs, Granularity.FiveMinute))
+        name = f"longEnergy 90d 5m {'fast' if fastDecode else 'schema'} rows/s"
+        results[name] = count / _best(
+            lambda: client.longEnergy(DEVICE, FROM_TS, toTs, Granularity.FiveMinute), repeat=3)
+
+    # a rate limited fleet over a network with latency, as a poller would see it
+    simulator = Simulator(devices=500, perSecond=100, perDay=None, latency=0.02, jitter=0.01,
+        now=(FROM_TS + timedelta(days=1)).timestamp())
+    client = _client(SimulatorAdapter(simulator), fastDecode=True, poolMaxSize=32)
+    deviceIds = simulator.deviceIds()
+    started = perf_counter()
+    client.fleetShortEnergy(deviceIds, FROM_TS + timedelta(hours=23), FROM_TS + timedelta(days=1), maxWorkers=32)
+    elapsed = perf_counter() - started
+    results["fleetShortEnergy 500 devices requests/s"] = simulator.Requests / elapsed
+    results["fleetShortEnergy 500 devices 429 responses"] = simulator.Throttled
+
+    return results
+
+
+if __name__ == '__main__':
+    for name, value in Run().items():
+        print(f"{name:<48}{value:>14,.0f}")
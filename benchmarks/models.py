@@ -0,0 +1,153 @@
+"""
+Benchmarks attribute access and memory per instance of the models,
+against the models as they were before slots for comparison.
+
+Run from the directory containing the package:
+    python -m <package>.benchmarks.models
+"""
+import gc
+import timeit
+import tracemalloc
+from dataclasses import dataclass, make_dataclass, fields, field
+from datetime import datetime
+from typing import Any, List, Optional
+from ..models import (
+    Device, ChannelAttribute, ShortData, LongData,
+    DevicePending, DeviceComms, PhaseConfiguration, SwitchAttribute)
+
+COUNT = 100_000
+READS = 1_000_000
+
+
+def _memoryPerObject(factory, count: int = COUNT) -> float:
+    gc.collect()
+    tracemalloc.start()
+    start = tracemalloc.take_snapshot()
+    objects = [factory(i) for i in range(count)]
+    end = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    size = sum(stat.size_diff for stat in end.compare_to(start, 'filename'))
+    del objects
+    return size / count
+
+
+def _readsPerSecond(obj, name: str, count: int = READS) -> float:
+    timer = timeit.Timer(f"obj.{name}", globals={"obj": obj})
+    return count / min(timer.repeat(repeat=5, number=count))
+
+
+def _unslotted(cls: type) -> type:
+    # the same fields in a plain dataclass, as the models were before slots
+    return make_dataclass(f"Unslotted{cls.__name__}",
+        [(f.name, f.type, field(default=None)) for f in fields(cls)])
+
+
+UnslottedShortData = _unslotted(ShortData)
+UnslottedLongData = _unslotted(LongData)
+
+
+@dataclass
+class UnslottedChannelAttribute:
+    # ChannelAttribute before slots
+    Id: str = None
+    CtRating: int = None
+    Label: str = None
+    CategoryId: int = None
+    CategoryLabel: str = None
+    pending: DevicePending = field(default=DevicePending)
+
+    def __post_init__(self):
+        self._dirtyFields = {}
+
+    def __setattr__(self, name, value):
+        if '_' not in name and name != 'Id' and hasattr(self, '_dirtyFields'):
+            object.__getattribute__(self, '_dirtyFields')[name] = value
+
+        object.__setattr__(self, name, value)
+
+
+@dataclass
+class UnslottedDevice:
+    # Device before slots, lazy loading checked on every read
+    Id: str
+    Label: str = None
+    Timezone: str = None
+    Model: str = None
+    FirmwareVersion: str = None
+    LatestStatus: int = None
+    ShortEnergyReportingInterval: int = None
+    Pending: DevicePending = field(default=DevicePending)
+    Comms: DeviceComms = field(default=DeviceComms)
+    Channels: List[UnslottedChannelAttribute] = field(default_factory=list)
+    Phases: PhaseConfiguration = field(default=PhaseConfiguration)
+    Switches: List[SwitchAttribute] = field(default_factory=list)
+
+    _client: Optional[Any] = None
+
+    _dirtyFields = {}
+    _isPartial = False
+
+    def __post_init__(self, *args, **kwargs):
+        self._isPartial = self.Model == None
+
+    def __setattr__(self, name, value):
+        if '_' not in name and name != 'Id':
+            object.__getattribute__(self, '_dirtyFields')[name] = value
+
+        object.__setattr__(self, name, value)
+
+    def __getattribute__(self, name):
+        if name != 'Id' and '_' not in name and object.__getattribute__(self, '_isPartial'):
+            raise AttributeError(name)
+
+        return object.__getattribute__(self, name)
+
+
+def _device(i: int, cls: type = Device, channelClass: type = ChannelAttribute) -> Device:
+    return cls(f"D{i}", Label="meter", Model="3W+", Timezone="Australia/Sydney",
+        Channels=[channelClass(Id=f"c{c}", Label="load") for c in range(3)])
+
+
+def _unslottedDevice(i: int) -> UnslottedDevice:
+    return _device(i, UnslottedDevice, UnslottedChannelAttribute)
+
+
+def _shortData(i: int, cls: type = ShortData) -> ShortData:
+    return cls(Timestamp=datetime.fromtimestamp(1600000000 + i * 30),
+        Duration=30, Frequency=50.0, Unit='J',
+        Real=[1.0, 2.0, 3.0], Reactive=[0.1, 0.2, 0.3],
+        VoltageRMS=[240.0, 240.0, 240.0], CurrentRMS=[1.0, 1.0, 1.0])
+
+
+def _longData(i: int, cls: type = LongData) -> LongData:
+    return cls(Timestamp=datetime.fromtimestamp(1600000000 + i * 900),
+        Duration=900, Unit='J', Real=[1, 2, 3])
+
+
+def Run() -> dict:
+    device = _device(0)
+    channel = device.Channels[0]
+    unslottedDevice = _unslottedDevice(0)
+    shortData = _shortData(0)
+
+    results = {
+        "Device.Label reads/s": _readsPerSecond(device, "Label"),
+        "Device.Label unslotted reads/s": _readsPerSecond(unslottedDevice, "Label"),
+        "ChannelAttribute.Label reads/s": _readsPerSecond(channel, "Label"),
+        "ChannelAttribute.Label unslotted reads/s": _readsPerSecond(unslottedDevice.Channels[0], "Label"),
+        "ShortData.Real reads/s": _readsPerSecond(shortData, "Real"),
+        "ShortData.Real unslotted reads/s": _readsPerSecond(_shortData(0, UnslottedShortData), "Real"),
+        "Device bytes/object": _memoryPerObject(_device, COUNT // 10),
+        "Device unslotted bytes/object": _memoryPerObject(_unslottedDevice, COUNT // 10),
+        "ShortData bytes/object": _memoryPerObject(_shortData),
+        "ShortData unslotted bytes/object": _memoryPerObject(lambda i: _shortData(i, UnslottedShortData)),
+        "LongData bytes/object": _memoryPerObject(_longData),
+        "LongData unslotted bytes/object": _memoryPerObject(lambda i: _longData(i, UnslottedLongData)),
+    }
+    return results
+
+
+if __name__ == '__main__':
+    for name, value in Run().items():
+        print(f"{name:<42}{value:>16,.0f}")
@@ -0,0 +1,72 @@
+"""
+Synthetic api payloads shaped like real Watt Watchers responses.
+"""
+import json
+import random
+from typing import List, Dict
+
+START = 1_600_000_000
+
+
+def _channels(rng: random.Random, channels: int, scale: float) -> List[float]:
+    return [round(rng.uniform(0, scale), 3) for _ in range(channels)]
+
+
+def ShortEnergyRows(count: int, channels: int = 6, seed: int = 0, interval: int = 30, start: int = START) -> List[Dict]:
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        real = _channels(rng, channels, 30000)
+        reactive = _channels(rng, channels, 3000)
+        rows.append({
+            "timestamp": start + i * interval,
+            "duration": interval,
+            "frequency": round(rng.uniform(49.9, 50.1), 3),
+            "eReal": real,
+            "eReactive": reactive,
+            "eRealKw": [round(v / interval / 1000, 5) for v in real],
+            "eReactiveKw": [round(v / interval / 1000, 5) for v in reactive],
+            "vRMS": _channels(rng, channels, 250),
+            "iRMS": _channels(rng, channels, 40),
+        })
+
+    return rows
+
+
+def LongEnergyRows(count: int, channels: int = 6, seed: int = 0, interval: int = 900, start: int = START) -> List[Dict]:
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        row = {"timestamp": start + i * interval, "duration": interval}
+        for key in ("eReal", "eRealNegative", "eRealPositive",
+                "eReactive", "eReactiveNegative", "eReactivePositive"):
+            values = [int(v) for v in _channels(rng, channels, 900000)]
+            row[key] = values
+            row[key + "Kwh"] = [round(v / 3.6e6, 5) for v in values]
+        for key in ("vRMSMin", "vRMSMax"):
+            row[key] = _channels(rng, channels, 250)
+        for key in ("iRMSMin", "iRMSMax"):
+            row[key] = _channels(rng, channels, 40)
+        rows.append(row)
+
+    return rows
+
+
+def ModbusRows(count: int, seed: int = 0, interval: int = 300, start: int = START) -> List[Dict]:
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        row = {"timestamp": start + i * interval, "model": "DTSU666"}
+        for key in ("_Ia", "_Ib", "_Ic", "_PFa", "_PFb", "_PFc", "_Uan", "_Ubn", "_Ucn"):
+            row[key] = round(rng.uniform(0, 250), 2)
+        for key in ("kVAh", "kWh_Exp", "kWh_Imp", "kWh_Net", "kWh_Tot",
+                "kvarh_Q1", "kvarh_Q2", "kvarh_Q3", "kvarh_Q4",
+                "kvarh_Exp", "kvarh_Imp", "kvarh_Net", "kvarh_Tot"):
+            row[key] = rng.randrange(1_000_000)
+        rows.append(row)
+
+    return rows
+
+
+def Encode(rows: List[Dict]) -> bytes:
+    return json.dumps(rows).encode()
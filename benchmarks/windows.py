@@ -0,0 +1,36 @@
+"""
+Benchmarks query window planning over multi-year ranges.
+
+Run from the directory containing the package:
+    python -m <package>.benchmarks.windows
+"""
+from datetime import datetime, timedelta, timezone
+from ..enums import Granularity
+from ..utilities import CreateQueryWindows, CreateAlignedQueryWindows
+from .decode import _best
+
+FROM_TS = datetime(2015, 1, 1, tzinfo=timezone.utc)
+YEARS = (1, 5, 10)
+NUMBER = 20
+
+
+def Run() -> dict:
+    results = {}
+    for years in YEARS:
+        toTs = FROM_TS + timedelta(days=365 * years)
+
+        # 12 hour short energy windows are the most numerous
+        results[f"CreateQueryWindows {years}y short ms"] = 1000 * _best(
+            lambda: CreateQueryWindows(FROM_TS, toTs, timedelta(hours=12)), number=NUMBER)
+        results[f"CreateAlignedQueryWindows {years}y short ms"] = 1000 * _best(
+            lambda: CreateAlignedQueryWindows(FROM_TS, toTs, timedelta(hours=12)), number=NUMBER)
+        results[f"CreateAlignedQueryWindows {years}y 5m ms"] = 1000 * _best(
+            lambda: CreateAlignedQueryWindows(FROM_TS, toTs, timedelta(days=7),
+                Granularity.FiveMinute, "Australia/Sydney"), number=NUMBER)
+
+    return results
+
+
+if __name__ == '__main__':
+    for name, value in Run().items():
+        print(f"{name:<44}{value:>12,.3f}")
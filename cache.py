@@ -0,0 +1,181 @@
+import sqlite3
+import threading
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from time import time, monotonic
+from typing import Optional, Dict, Tuple
+from urllib.parse import urlencode
+
+__all__ = [
+    "WindowCache",
+    "TTLCache"
+]
+
+
+class WindowCache:
+    """
+    Persistent SQLite cache of raw query window responses.
+
+    Energy data for a closed interval never changes, so windows that
+    ended more than settlePeriod ago are stored compressed and served
+    locally on the next request. Windows that are still open, or may
+    still receive late data from a device, are always fetched.
+
+    Entries are keyed by request url, which holds the endpoint and
+    device id, the query parameters (granularity, unit, fields,
+    filter, timezone) and the window itself.
+    """
+
+    def __init__(self, path: str = ':memory:', settlePeriod: timedelta = timedelta(hours=1)):
+        self.path = path
+        self.settlePeriod = settlePeriod
+        self.Hits = 0
+        self.Misses = 0
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute("""
+                CREATE TABLE IF NOT EXISTS windows (
+                    url TEXT NOT NULL,
+                    params TEXT NOT NULL,
+                    fromTs INTEGER NOT NULL,
+                    toTs INTEGER NOT NULL,
+                    fetchedAt INTEGER NOT NULL,
+                    content BLOB NOT NULL,
+                    PRIMARY KEY (url, params, fromTs, toTs)
+                )""")
+
+    @staticmethod
+    def _key(url: str, params: Dict[str, str], period: Tuple[datetime, datetime]) -> Tuple[str, str, int, int]:
+        params = urlencode(sorted((k, str(v)) for k, v in params.items() if v is not None))
+        return (url, params, int(period[0].timestamp()), int(period[1].timestamp()))
+
+    def isClosed(self, period: Tuple[datetime, datetime]) -> bool:
+        return period[1].timestamp() <= time() - self.settlePeriod.total_seconds()
+
+    def get(self, url: str, params: Dict[str, str], period: Tuple[datetime, datetime]) -> Optional[bytes]:
+        """
+        return : bytes - the cached response body, or None on a miss
+        """
+        if not self.isClosed(period):
+            return None
+
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT content FROM windows WHERE url = ? AND params = ? AND fromTs = ? AND toTs = ?",
+                self._key(url, params, period)).fetchone()
+
+            if row is None:
+                self.Misses += 1
+                return None
+
+            self.Hits += 1
+
+        return zlib.decompress(row[0])
+
+    def set(self, url: str, params: Dict[str, str], period: Tuple[datetime, datetime], content: bytes):
+        """
+        Stores a response body, ignoring windows that are not yet closed.
+        """
+        if not self.isClosed(period):
+            return
+
+        compressed = zlib.compress(content)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO windows VALUES (?, ?, ?, ?, ?, ?)",
+                (*self._key(url, params, period), int(time()), compressed))
+
+    def clear(self, url: str = None):
+        """
+        Removes every cached window, or only those of one url.
+        """
+        with self._lock, self._connection:
+            if url is None:
+                self._connection.execute("DELETE FROM windows")
+            else:
+                self._connection.execute("DELETE FROM windows WHERE url = ?", (url,))
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+@dataclass
+class CacheEntry:
+    Content: bytes
+    ETag: Optional[str] = None
+    LastModified: Optional[str] = None
+    ExpiresAt: float = 0.0
+
+    @property
+    def IsFresh(self) -> bool:
+        return monotonic() < self.ExpiresAt
+
+
+class TTLCache:
+    """
+    In-memory LRU cache of response bodies for rarely changing
+    endpoints such as device metadata.
+
+    Entries are served without a request until ttl seconds have passed.
+    Expired entries are kept so they can be revalidated with their ETag
+    or Last-Modified value when the api provides one, and the least
+    recently used entries are evicted past maxSize.
+    """
+
+    def __init__(self, ttl: float = 300, maxSize: int = 1024):
+        self.ttl = ttl
+        self.maxSize = maxSize
+        self.Hits = 0
+        self.Misses = 0
+        self.Revalidations = 0
+
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(self, key: str) -> Optional[CacheEntry]:
+        """
+        return : CacheEntry - the entry even if it has expired, or None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.Misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            if entry.IsFresh:
+                self.Hits += 1
+
+            return entry
+
+    def set(self, key: str, content: bytes, etag: str = None, lastModified: str = None):
+        with self._lock:
+            self._entries[key] = CacheEntry(content, etag, lastModified, monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxSize:
+                self._entries.popitem(last=False)
+
+    def touch(self, key: str):
+        """
+        Extends an entry after the server confirmed it is unchanged.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self.Revalidations += 1
+                entry.ExpiresAt = monotonic() + self.ttl
+
+    def invalidate(self, key: str = None):
+        """
+        Removes one entry, or every entry when no key is given.
+        """
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
@@ -1,16 +1,31 @@
 import requests
-import json
-from time import sleep
+from requests.adapters import BaseAdapter, HTTPAdapter
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from contextlib import contextmanager
+from contextvars import copy_context
+from time import sleep, perf_counter
 from datetime import datetime, timezone as dtTimezone, timedelta
-from typing import Optional, List, Dict, Union, Tuple, Callable
+from typing import Optional, List, Dict, Union, Tuple, Callable, Iterator, Any, Type
 from . import TIMEOUT, API_ENDPOINT, HEADERS, RETRY, logger
-from .exceptions import CommonError, UnprocessableEntityError
-from .enums import Energy, Groups, Granularity
-from .utilities import NormaliseTimestamps, CreateQueryWindows
+from .ratelimit import RateLimiter
+from .retry import RetryPolicy
+from .cache import WindowCache, TTLCache
+from .planner import WindowPlanner
+from .sync import CursorStore
+from .metrics import MetricsSink, EndpointLabel
+from .profiling import Profiler, Stage, profiled
+from .exceptions import CommonError, UnprocessableEntityError, RetryError
+from .enums import Energy, Groups, Granularity, ResultFormat
+from .utilities import NormaliseTimestamps, CreateQueryWindows, CreateAlignedQueryWindows, JsonLoads
+from .columns import ShortColumns, LongColumns
+from .conversion import Convert, IsLocalUnit, _convertRecord
+from .decoders import FastDecoder, SHORT_DATA_DECODER, LONG_DATA_DECODER, MODBUS_DATA_DECODER
 from .models import (
     RateLimits, RateLimitsSchema, Device, DeviceSchema,
     ShortData, ShortDataSchema, LongData, LongDataSchema,
-    ModbusData, ModbusDataSchema,
+    ModbusData, ModbusDataSchema, FleetResult, PoolStats,
     ChannelCategory, ChannelCategorySchema,
     DeviceModel, DeviceModelSchema)
 
@@ -21,12 +36,93 @@ __all__ = [
     "ApiRequest"
 ]
 
+# maximum query period per request for each range endpoint
+SHORT_ENERGY_QUERY_PERIOD = timedelta(hours=12)
+MODBUS_QUERY_PERIOD = timedelta(days=7)
+LONG_ENERGY_QUERY_PERIODS = {
+    Granularity.FiveMinute: (timedelta(days=7), timedelta(days=1)),
+    Granularity.FifteenMinute: (timedelta(days=14), timedelta(days=1)),
+    Granularity.HalfHourly: (timedelta(days=31), timedelta(days=1)),
+    Granularity.Hourly: (timedelta(days=90), timedelta(days=1)),
+    Granularity.Daily: (timedelta(days=360*3), timedelta(days=30)), # 3 years
+    Granularity.Weekly: (timedelta(days=360*5), timedelta(days=90)), # 5 years
+    Granularity.Monthly: (timedelta(days=360*10), timedelta(days=365)) # 10 years... approximately
+}
+
+# metrics label of the data decoded by each schema
+_SCHEMA_ENDPOINTS = {
+    ShortDataSchema: "short-energy",
+    LongDataSchema: "long-energy",
+    ModbusDataSchema: "modbus",
+}
+
+# discards the metrics of requests sent without a sink
+_NO_METRICS = MetricsSink()
+
+
+def _dedupeBatches(batches: Iterator[List]) -> Iterator[List]:
+    """
+    Drops records repeated at the start of a window because they sit on
+    the edge it shares with the previous window.
+    """
+    last = None
+    for batch in batches:
+        if isinstance(batch, (ShortColumns, LongColumns)):
+            if last is not None and len(batch) and batch.Timestamp[0] <= last:
+                batch = batch.between(last + 1)
+            if len(batch):
+                last = int(batch.Timestamp[-1])
+            yield batch
+            continue
+
+        if last is not None and batch and batch[0].Timestamp is not None and batch[0].Timestamp <= last:
+            batch = [r for r in batch if r.Timestamp is None or r.Timestamp > last]
+        if batch and batch[-1].Timestamp is not None:
+            last = batch[-1].Timestamp
+        yield batch
+
+
+def _deviceId(device: Union[str, Device]) -> str:
+    return device.Id if isinstance(device, Device) else device
+
+
+def _submit(executor: ThreadPoolExecutor, func: Callable, *args, **kwargs) -> Future:
+    # workers run in a copy of the caller's context, so their stages
+    # are profiled as part of the call that started them
+    return executor.submit(copy_context().run, func, *args, **kwargs)
+
 
 def _parseHeaders(response) -> RateLimits:
     headers = response.headers
     return RateLimitsSchema().load(headers)
 
 
+def _wireBytes(response, content: bytes) -> int:
+    """
+    Size of a response body as received, before any decompression.
+    """
+    length = response.headers.get('Content-Length')
+    if length is not None and length.isdigit():
+        return int(length)
+
+    raw = getattr(response, 'raw', None)
+    if hasattr(raw, 'tell'):
+        try:
+            # urllib3 counts the bytes read off the connection
+            return raw.tell()
+        except (OSError, ValueError):
+            pass
+
+    return len(content)
+
+
+def _recordRateLimits(metrics: MetricsSink, rateLimits: RateLimits):
+    if rateLimits.RemainingPerSecond is not None:
+        metrics.gauge("ratelimit_remaining", rateLimits.RemainingPerSecond, period="second")
+    if rateLimits.RemainingPerDay is not None:
+        metrics.gauge("ratelimit_remaining", rateLimits.RemainingPerDay, period="day")
+
+
 def GetRequest(
     url: str, 
     session: requests.Session, 
@@ -34,6 +130,8 @@ def GetRequest(
     headers: Dict[str, str] = {},
     retry = 3,
     params = {},
+    limiter: RateLimiter = None,
+    metrics: MetricsSink = None,
     **kwargs
 ) -> Tuple[bytes, RateLimits]:
     params = {
@@ -43,7 +141,8 @@ def GetRequest(
     }
 
     requestFunc = lambda: session.get(url, **params)
-    return ApiRequest(requestFunc, retry)
+    endpoint = EndpointLabel(url) if metrics is not None else None
+    return ApiRequest(requestFunc, retry, limiter, metrics, endpoint)
     
 
 def PatchRequest(
@@ -53,6 +152,8 @@ def PatchRequest(
     headers: Dict[str, str] = {},
     retry = 3,
     params = {},
+    limiter: RateLimiter = None,
+    metrics: MetricsSink = None,
     **kwargs
 ) -> Tuple[bytes, RateLimits]:
     params = {
@@ -62,43 +163,113 @@ def PatchRequest(
     }
 
     requestFunc = lambda: session.patch(url, **params)
-    return ApiRequest(requestFunc, retry)
+    endpoint = EndpointLabel(url) if metrics is not None else None
+    return ApiRequest(requestFunc, retry, limiter, metrics, endpoint)
+
+def _responseError(response, rateLimits: RateLimits) -> Exception:
+    try:
+        content = response.json()
+        if response.status_code == requests.codes.unprocessable_entity:
+            return UnprocessableEntityError(content)
+
+        return CommonError(content, rateLimits)
+    except Exception:
+        try:
+            response.raise_for_status()
+        except requests.exceptions.HTTPError as e:
+            return e
+
+        return requests.exceptions.HTTPError(response.reason, response=response)
 
 def ApiRequest(
     requestFunc: Callable,
-    retry = 3,
+    retry: Union[int, RetryPolicy] = 3,
+    limiter: RateLimiter = None,
+    metrics: MetricsSink = None,
+    endpoint: str = None,
 ) -> Tuple[bytes, RateLimits]:
+    """
+    Sends a request, retrying timeouts, connection errors and retryable
+    statuses as the retry policy allows.
 
-    retryCount = 0
+    retry : int, RetryPolicy - number of retries, or the policy shared by a client
+    metrics : MetricsSink - receives the latency, size, retries and waits of the request
+    endpoint : str - label of the request in metrics, see EndpointLabel
+
+    raises : RetryError - when a retryable failure outlasts the retries or the retry budget
+    """
+    policy = retry if isinstance(retry, RetryPolicy) else RetryPolicy(retry or 0)
+    policy.deposit()
+    if metrics is None:
+        metrics = _NO_METRICS
+    endpoint = endpoint or "unknown"
+
+    attempt = 0
+    throttles = 0
     while True:
+        if limiter is not None:
+            delay = limiter.reserve()
+            if delay > 0:
+                metrics.increment("ratelimit_wait_seconds_total", delay, endpoint=endpoint)
+                with Stage("wait"):
+                    sleep(delay)
+
+        retryAfter = None
+        throttled = False
+        started = perf_counter()
         try:
-            response = requestFunc()
-            
+            with Stage("http"):
+                response = requestFunc()
+        except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+            error = e
+            reason = "timeout" if isinstance(e, requests.exceptions.Timeout) else "connection"
+            metrics.observe("request_seconds", perf_counter() - started, endpoint=endpoint, status=reason)
+        else:
+            metrics.observe("request_seconds", perf_counter() - started,
+                endpoint=endpoint, status=response.status_code)
+            metrics.increment("requests_total", endpoint=endpoint, status=response.status_code)
             rateLimits = _parseHeaders(response)
+            _recordRateLimits(metrics, rateLimits)
+            if limiter is not None:
+                limiter.update(rateLimits)
             if response.ok:
-                return (response.content, rateLimits)
-            elif response.status_code == requests.codes.too_many_requests and rateLimits.RemainingPerDay > 0:
-                sleep(rateLimits.TotalPerSecondResetCounter + 0.2)
-                retryCount += 1
-            else:
-                try:
-                    content = response.json()
-                    if response.status_code == requests.codes.unprocessable_entity:
-                        error = UnprocessableEntityError(content)
-                    else:
-                        error = CommonError(content, rateLimits)
-                except Exception:
-                    response.raise_for_status()
-                
-                raise error
+                content = response.content
+                metrics.increment("response_bytes_total", _wireBytes(response, content), endpoint=endpoint)
+                return (content, rateLimits)
 
-        except requests.exceptions.Timeout:
-            if not retry or retryCount >= retry:
-                break
+            error = _responseError(response, rateLimits)
+            if not policy.isRetryable(response.status_code, rateLimits):
+                raise error
 
-            # linear backoff policy
-            sleep((1 + retryCount))
-            retryCount += 1
+            throttled = response.status_code == requests.codes.too_many_requests
+            if throttled:
+                metrics.increment("throttled_total", endpoint=endpoint)
+            reason = response.status_code
+            retryAfter = rateLimits.RetryAfter
+            if retryAfter is None and throttled:
+                retryAfter = rateLimits.TotalPerSecondResetCounter
+
+        # 429s and failures are retried on separate counts
+        count = throttles if throttled else attempt
+        if not policy.withdraw(count, throttled):
+            raise RetryError(attempt + throttles + 1, error) from error
+
+        delay = policy.delay(count, retryAfter)
+        if throttled:
+            throttles += 1
+        else:
+            attempt += 1
+        metrics.increment("retries_total", endpoint=endpoint, reason=reason)
+
+        if throttled and limiter is not None:
+            # the limiter holds this and every other request until the limit
+            # resets, so the wait is taken once, when the retry reserves a token
+            limiter.block(delay)
+            continue
+
+        metrics.increment("backoff_seconds_total", delay, endpoint=endpoint)
+        with Stage("wait"):
+            sleep(delay)
 
 
 class Client:
@@ -110,18 +281,62 @@ class Client:
             apiKey: str,
             timezone: str = None,
             timeout: Union[int, float, Tuple[int, int]] = None,
-            retry: int = 3,
+            retry: Union[int, RetryPolicy] = 3,
             headers: Dict[str, str] = None,
             hooks = None,
-            endpoint: str = None
+            endpoint: str = None,
+            rateLimiter: RateLimiter = None,
+            fastDecode: bool = False,
+            cache: WindowCache = None,
+            metadataCache: TTLCache = None,
+            poolConnections: int = 10,
+            poolMaxSize: int = 10,
+            poolBlock: bool = False,
+            keepAlive: bool = True,
+            adapter: BaseAdapter = None,
+            alignWindows: bool = None,
+            planner: WindowPlanner = None,
+            metrics: MetricsSink = None,
+            localConvert: bool = False
         ):
+        """
+        retry : int, RetryPolicy - retries per request, or a policy to tune backoff and the retry budget
+        poolConnections : int - number of hosts to keep connection pools for
+        poolMaxSize : int - connections kept open per host, raise above maxWorkers for parallel fetches
+        poolBlock : bool - wait for a free connection instead of opening one that is discarded afterwards
+        keepAlive : bool - reuse connections between requests
+        adapter : BaseAdapter - transport mounted for the endpoint, such as an HTTP/2 capable adapter
+        alignWindows : bool - cut query windows on a fixed grid, defaults to on when a cache is set
+        planner : WindowPlanner - sizes query windows from observed response size and latency
+        metrics : MetricsSink - receives request, retry, rate limit and decode metrics, such as Metrics
+        localConvert : bool - fetch energy in joules and convert to kWh or kW locally, so cached windows serve every unit
+        """
         self.timezone = timezone
         self.timeout = timeout or TIMEOUT
-        self.retry = retry
+        # one policy for every request, so they share the retry budget
+        self.retry = retry if isinstance(retry, RetryPolicy) else RetryPolicy(retry or 0)
         # modify headers
         # add hooks / requests changes
         # set default timezone
         self.endpoint = endpoint or API_ENDPOINT
+        # shared by every method and thread using this client
+        self.rateLimiter = rateLimiter or RateLimiter()
+        # decode energy and modbus data without marshmallow
+        self.fastDecode = fastDecode
+        # serves closed query windows locally instead of refetching them
+        self.cache = cache
+        # serves device metadata and reference endpoints from memory
+        self.metadataCache = metadataCache
+        # stable windows are what lets the cache and resumed backfills hit
+        self.alignWindows = cache is not None if alignWindows is None else alignWindows
+        # shrinks query windows for dense or slow devices
+        self.planner = planner
+        # time spent on the network, throttled and decoding, per endpoint
+        self.metrics = metrics
+        # converting locally keeps one response, and cache entry, per window for every unit
+        self.localConvert = localConvert
+        # set while profiling, see profile()
+        self.profiler: Optional[Profiler] = None
 
         session = requests.Session()
         self.__session = session
@@ -131,48 +346,558 @@ class Client:
             "Authorization": "Bearer " + apiKey
         }
 
+        if not keepAlive:
+            session.headers["Connection"] = "close"
+
         if hooks:
             session.hooks = hooks
 
+        if adapter is None:
+            adapter = HTTPAdapter(pool_connections=poolConnections,
+                pool_maxsize=poolMaxSize, pool_block=poolBlock)
+        self.__adapter = adapter
+        session.mount(self.endpoint, adapter)
+
         self.__deviceSchema = DeviceSchema()
         self.__deviceSchema.context['client'] = self
-        self.__shortDataSchema = ShortDataSchema()
-        self.__longDataSchema = LongDataSchema()
-        self.__modbusDataSchema = ModbusDataSchema()
-
-        self.RateLimits = None
+        self.__schemas = {}
+        self.__lock = threading.Lock()
+        # rate limits of the last response received by each thread
+        self.__local = threading.local()
+        # device timezones looked up for aligned long energy windows
+        self.__timezones: Dict[str, str] = {}
     
-    def devices(self, **kwargs) -> List[Device]:
+    @property
+    def RateLimits(self) -> "RateLimits":
+        """
+        Rate limits across every request of the client, the lowest
+        remaining and latest reset of the current windows, see RateLimiter.
+        """
+        return self.rateLimiter.RateLimits
+
+    @property
+    def LastRateLimits(self) -> "RateLimits":
+        """
+        Rate limits of the last response received by the calling thread.
+        Windows fetched in parallel are received by worker threads, so
+        use RateLimits after a call with maxWorkers or a fleet call.
+        """
+        return getattr(self.__local, 'RateLimits', None)
+
+    @contextmanager
+    def profile(self,
+            output: Callable = None,
+            trackAllocations: bool = True,
+            keepCalls: Optional[int] = 100) -> Iterator[Profiler]:
+        """
+        Profiles every call made on this client inside the with block,
+        reporting the time and allocations of each stage per call.
+
+        output : Callable[[CallProfile], None] - receives the report of each call, logged by default
+        trackAllocations : bool - trace allocations with tracemalloc, which slows decoding
+        keepCalls : int - number of recent reports kept in Calls, None to keep all of them
+
+        return : Profiler - holds recent reports in Calls and totals per method and stage in Summary
+        """
+        profiler = Profiler(output, trackAllocations, keepCalls)
+        previous = self.profiler
+        profiler.start()
+        self.profiler = profiler
+        try:
+            yield profiler
+        finally:
+            self.profiler = previous
+            profiler.stop()
+
+    def poolStats(self) -> PoolStats:
+        """
+        Connection reuse of the client's pools. A hit is a request sent
+        over a pooled connection, a miss had to create a new connection.
+        """
+        stats = PoolStats()
+        poolManager = getattr(self.__adapter, 'poolmanager', None)
+        if poolManager is None:
+            return stats
+
+        for key in list(poolManager.pools.keys()):
+            pool = poolManager.pools.get(key)
+            if pool is None:
+                continue
+
+            stats.Requests += pool.num_requests
+            stats.Misses += pool.num_connections
+            if pool.pool is not None:
+                # the queue is padded with None for connections not yet opened
+                stats.IdleConnections += sum(1 for c in list(pool.pool.queue) if c is not None)
+
+        stats.Hits = max(0, stats.Requests - stats.Misses)
+        return stats
+
+    def __schema(self, schemaClass, unit: Union[str, Energy] = None):
+        """
+        Returns a schema with the unit in its context. Each unit gets its
+        own schema that is never modified afterwards, so concurrent calls
+        in different units cannot decode with each other's unit.
+        """
+        key = (schemaClass, None if unit is None else str(unit))
+        schema = self.__schemas.get(key)
+        if schema is None:
+            with self.__lock:
+                schema = self.__schemas.get(key)
+                if schema is None:
+                    schema = schemaClass()
+                    if unit is not None:
+                        schema.context['unit'] = str(unit)
+                    self.__schemas[key] = schema
+
+        return schema
+
+    def __loads(self,
+            schemaClass,
+            unit: Union[str, Energy],
+            decoder: FastDecoder,
+            many: bool = True,
+            columns: Type[Union[ShortColumns, LongColumns]] = None) -> Callable[[bytes], Any]:
+        """
+        Returns the decode function for a response in the given unit,
+        using the fast decoder when enabled. With columns the response is
+        decoded straight into arrays, without a record per row.
+        """
+        target = None
+        if self.localConvert and IsLocalUnit(unit) and str(unit) != str(Energy.Joules):
+            # the request was made in joules, see __unit
+            target, unit = str(unit), Energy.Joules
+
+        if columns is not None:
+            loads = lambda content: decoder.loadsColumns(content, columns, unit)
+        elif self.fastDecode:
+            loads = lambda content: decoder.loads(content, unit, many)
+        else:
+            schema = self.__schema(schemaClass, unit)
+            loads = lambda content: schema.loads(content, many=many)
+
+        if target is not None:
+            loads = self.__converted(loads, target)
+
+        return self.__measure(_SCHEMA_ENDPOINTS.get(schemaClass), loads)
+
+    @staticmethod
+    def __converted(loads: Callable[[bytes], Any], unit: str) -> Callable[[bytes], Any]:
+        def converted(content: bytes):
+            data = loads(content)
+            with Stage("conversion"):
+                # freshly decoded, so the records can be converted in place
+                for record in (data if isinstance(data, list) else [data]):
+                    _convertRecord(record, str(Energy.Joules), unit)
+            return data
+
+        return converted
+
+    def __unit(self, params: Dict[str, str], key: str, convert: Union[str, Energy, None]) -> Union[str, Energy]:
+        """
+        Asks the api for the energy unit, unless it is converted locally.
+
+        return : str, Energy - the unit the records are decoded to
+        """
+        if convert is None:
+            return Energy.Joules
+        if not (self.localConvert and IsLocalUnit(convert)):
+            params[key] = str(convert)
+
+        return convert
+
+    def __convertsColumns(self, convert: Union[str, Energy, None], as_: Union[str, ResultFormat]) -> bool:
+        # columns are fetched in joules and converted once, in bulk
+        return as_ == ResultFormat.Columns and self.localConvert and IsLocalUnit(convert)
+
+    def __measure(self, endpoint: str, loads: Callable[[bytes], Any]) -> Callable[[bytes], Any]:
+        """
+        Wraps a decode function to record its duration and the rows it returns.
+        """
+        metrics = self.metrics
+        if metrics is None:
+            return loads
+
+        def measured(content: bytes):
+            started = perf_counter()
+            result = loads(content)
+            metrics.observe("decode_seconds", perf_counter() - started, endpoint=endpoint)
+            rows = len(result) if isinstance(result, (list, ShortColumns, LongColumns)) else 1
+            metrics.increment("rows_total", rows, endpoint=endpoint)
+            return result
+
+        return measured
+
+    def __endpoint(self, url: str) -> Optional[str]:
+        return EndpointLabel(url) if self.metrics is not None else None
+
+    def __fetchWindow(self,
+            url: str,
+            period: Tuple[datetime, datetime],
+            params: Dict[str, str],
+            loads: Callable[[bytes], List],
+            **kwargs) -> List:
+        if self.cache is not None:
+            content = self.cache.get(url, params, period)
+            if content is not None:
+                return loads(content)
+
+        requestParams = {"fromTs": int(period[0].timestamp()), "toTs": int(period[1].timestamp()), **params}
+
+        if self.planner is None:
+            content, rateLimits = GetRequest(url, 
+                self.__session, self.timeout, 
+                retry=self.retry, limiter=self.rateLimiter, metrics=self.metrics, params=requestParams,
+                **kwargs)
+        else:
+            content, rateLimits = self.__plannedRequest(url, period, params, requestParams, **kwargs)
+        self.__local.RateLimits = rateLimits
+
+        if self.cache is not None:
+            self.cache.set(url, params, period, content)
+
+        return loads(content)
+
+    def __plannedRequest(self,
+            url: str,
+            period: Tuple[datetime, datetime],
+            params: Dict[str, str],
+            requestParams: Dict[str, str],
+            **kwargs) -> Tuple[bytes, RateLimits]:
+        """
+        GetRequest that reports the size and latency of the response, or
+        a timeout, to the planner. Only the request itself is timed, not
+        the time spent waiting on the rate limiter.
+        """
+        length = timedelta(seconds=period[1].timestamp() - period[0].timestamp())
+        latency = []
+
+        def requestFunc():
+            started = perf_counter()
+            try:
+                response = self.__session.get(url, timeout=self.timeout, params=requestParams, **kwargs)
+            except requests.exceptions.Timeout:
+                self.planner.timeout(url, params, length)
+                raise
+            latency.append(perf_counter() - started)
+            return response
+
+        content, rateLimits = ApiRequest(requestFunc, self.retry, self.rateLimiter,
+            self.metrics, self.__endpoint(url))
+        self.planner.record(url, params, length, len(content), latency[-1])
+
+        return content, rateLimits
+
+    def __boundWorkers(self, maxWorkers: int) -> int:
+        # never run more requests in flight than the api allows per second
+        if self.RateLimits is not None and self.RateLimits.TotalPerSecond:
+            return max(1, min(maxWorkers, self.RateLimits.TotalPerSecond))
+
+        return maxWorkers
+
+    def __windows(self,
+            fromTs: datetime,
+            toTs: datetime,
+            maxQueryPeriod: timedelta,
+            granularity: Granularity = None,
+            timezone: str = None) -> List[Tuple[datetime, datetime]]:
+        with Stage("planning"):
+            if self.alignWindows:
+                return CreateAlignedQueryWindows(fromTs, toTs, maxQueryPeriod, granularity, timezone)
+
+            return CreateQueryWindows(fromTs, toTs, maxQueryPeriod)
+
+    def __planWindows(self,
+            url: str,
+            params: Dict[str, str],
+            fromTs: datetime,
+            toTs: datetime,
+            maxQueryPeriod: timedelta,
+            granularity: Granularity = None,
+            timezone: str = None) -> Iterator[Tuple[datetime, datetime]]:
+        """
+        Yields the query windows for a range. With a planner each window
+        is sized when it is taken, so windows fetched later in a range
+        already follow the responses received so far.
+        """
+        if self.planner is None:
+            yield from self.__windows(fromTs, toTs, maxQueryPeriod, granularity, timezone)
+            return
+
+        # an empty range is still one request, as it is without a planner
+        end = toTs.timestamp()
+        while True:
+            with Stage("planning"):
+                period = self.planner.period(url, params, maxQueryPeriod)
+            # only the first window is used, so there is no need to plan the whole range
+            until = toTs if end <= (fromTs + 2 * period).timestamp() else fromTs + 2 * period
+            window = self.__windows(fromTs, until, period, granularity, timezone)[0]
+            yield window
+            fromTs = window[1]
+            if fromTs.timestamp() >= end:
+                return
+
+    def __windowTimezone(self, device: Union[str, Device], timezone: str = None) -> Optional[str]:
+        """
+        Timezone long energy intervals are bucketed in, only looked up
+        from the device when windows are aligned.
+        """
+        if timezone is not None or not self.alignWindows:
+            return timezone
+
+        return self.__windowTimezones([device])[_deviceId(device)]
+
+    def __windowTimezones(self,
+            devices: List[Union[str, Device]],
+            timezone: str = None,
+            maxWorkers: int = 4) -> Dict[str, Optional[str]]:
+        """
+        __windowTimezone for many devices. Timezones not yet known are
+        looked up concurrently, and kept for later calls. A device that
+        fails to load falls back to windows aligned in UTC.
+        """
+        if timezone is not None or not self.alignWindows:
+            return {_deviceId(d): timezone for d in devices}
+
+        missing = []
+        for device in devices:
+            deviceId = _deviceId(device)
+            if isinstance(device, Device) and not device._isPartial:
+                self.__timezones[deviceId] = device.Timezone
+            elif deviceId not in self.__timezones:
+                missing.append(device if isinstance(device, Device) else Device(deviceId, _client=self))
+
+        if missing:
+            self.hydrate(missing, maxWorkers)
+            for device in missing:
+                if not device._isPartial:
+                    self.__timezones[device.Id] = device.Timezone
+
+        return {_deviceId(d): self.__timezones.get(_deviceId(d)) for d in devices}
+
+    def __fetchFleet(self,
+            queries: Dict[str, Tuple[str, List[Tuple[datetime, datetime]], Dict[str, str]]],
+            loads: Callable[[bytes], List],
+            maxWorkers: int,
+            **kwargs) -> FleetResult:
+        """
+        Fetches every window of every device through one shared pool.
+        Windows are scheduled round robin across devices so each device
+        progresses evenly, and a failing device is recorded in
+        FleetResult.Errors without stopping the others.
+
+        queries : Dict[str, Tuple] - device id to (url, windows, params)
+        """
+
+        # interleave windows across devices: window 0 of every device, then window 1...
+        schedule = []
+        longest = max([len(windows) for _, windows, _ in queries.values()], default=0)
+        for index in range(longest):
+            for deviceId, (_, windows, _) in queries.items():
+                if index < len(windows):
+                    schedule.append((deviceId, index))
+
+        results = {deviceId: [None] * len(windows) for deviceId, (_, windows, _) in queries.items()}
+        errors = {}
+        pending = {}
+        tasks = iter(schedule)
+        maxWorkers = self.__boundWorkers(maxWorkers)
+        executor = ThreadPoolExecutor(max_workers=maxWorkers)
+
+        def submitNext() -> bool:
+            for deviceId, index in tasks:
+                # skip the remaining windows of a device that has already failed
+                if deviceId in errors:
+                    continue
+
+                url, windows, params = queries[deviceId]
+                future = _submit(executor, self.__fetchWindow,
+                    url, windows[index], params, loads, **kwargs)
+                pending[future] = (deviceId, index)
+                return True
+
+            return False
+
+        try:
+            for _ in range(maxWorkers):
+                if not submitNext():
+                    break
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    deviceId, index = pending.pop(future)
+                    try:
+                        results[deviceId][index] = future.result()
+                    except Exception as e:
+                        logger.warning(f"{deviceId} failed: {e}")
+                        errors.setdefault(deviceId, e)
+
+                    submitNext()
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
+
+        data = {}
+        for deviceId, windows in results.items():
+            if deviceId not in errors:
+                data[deviceId] = [record for window in _dedupeBatches(windows) for record in window]
+
+        return FleetResult(data, errors)
+
+    def __fetchWindows(self,
+            url: str,
+            windows: Iterator[Tuple[datetime, datetime]],
+            params: Dict[str, str],
+            loads: Callable[[bytes], List],
+            maxWorkers: int = None,
+            **kwargs) -> Iterator[List]:
+        """
+        Fetches each query window and yields the decoded results in
+        window order. With maxWorkers, windows are fetched in parallel
+        while keeping at most maxWorkers requests in flight.
+        """
+        return _dedupeBatches(self.__fetchWindowBatches(url, windows, params, loads, maxWorkers, **kwargs))
+
+    def __fetchWindowBatches(self,
+            url: str,
+            windows: Iterator[Tuple[datetime, datetime]],
+            params: Dict[str, str],
+            loads: Callable[[bytes], List],
+            maxWorkers: int = None,
+            **kwargs) -> Iterator[List]:
+
+        fetch = lambda period: self.__fetchWindow(url, period, params, loads, **kwargs)
+
+        if not maxWorkers or maxWorkers <= 1:
+            for period in windows:
+                yield fetch(period)
+            return
+
+        maxWorkers = self.__boundWorkers(maxWorkers)
+        executor = ThreadPoolExecutor(max_workers=maxWorkers)
+        pending = deque()
+        try:
+            for period in windows:
+                pending.append(_submit(executor, fetch, period))
+                if len(pending) >= maxWorkers:
+                    yield pending.popleft().result()
+
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
+
+    def __getMetadata(self, url: str, **kwargs) -> bytes:
+        """
+        GET for rarely changing endpoints, served from metadataCache when
+        enabled. Expired entries are revalidated with If-None-Match or
+        If-Modified-Since when the api returned an ETag or Last-Modified.
+        """
+        cache = self.metadataCache
+        if cache is None:
+            content, rateLimits = GetRequest(url, 
+                self.__session, self.timeout, 
+                retry=self.retry, limiter=self.rateLimiter, metrics=self.metrics, **kwargs)
+            self.__local.RateLimits = rateLimits
+            return content
+
+        entry = cache.lookup(url)
+        if entry is not None and entry.IsFresh:
+            return entry.Content
+
+        headers = dict(kwargs.pop('headers', None) or {})
+        if entry is not None and entry.ETag:
+            headers['If-None-Match'] = entry.ETag
+        if entry is not None and entry.LastModified:
+            headers['If-Modified-Since'] = entry.LastModified
+
+        responses = []
+        def requestFunc():
+            response = self.__session.get(url,
+                timeout=self.timeout, headers=headers, **kwargs)
+            responses.append(response)
+            return response
+
+        content, rateLimits = ApiRequest(requestFunc, self.retry, self.rateLimiter,
+            self.metrics, self.__endpoint(url))
+        self.__local.RateLimits = rateLimits
+
+        response = responses[-1]
+        if response.status_code == requests.codes.not_modified and entry is not None:
+            cache.touch(url)
+            return entry.Content
+
+        cache.set(url, content,
+            response.headers.get('ETag'), response.headers.get('Last-Modified'))
+        return content
+
+    @profiled
+    def devices(self, hydrate: bool = False, maxWorkers: int = 4, **kwargs) -> List[Device]:
         """
         Retrieves all device ids and wraps them in a Device object.
 
-        return : List[Device] - Device instances with only the Id set
+        hydrate : bool - fetch every full device record up front, see hydrate()
+        maxWorkers : int - number of device records to fetch in parallel when hydrating
+
+        return : List[Device] - Device instances with only the Id set, unless hydrated
         """
 
         url = f"{self.endpoint}/devices"
         
-        content, rateLimits = GetRequest(url, 
-            self.__session, self.timeout, 
-            retry=self.retry, **kwargs)
-        self.RateLimits = rateLimits
+        content = self.__getMetadata(url, **kwargs)
 
         devices = []
-        deviceIds = json.loads(content)
+        deviceIds = self.__measure("devices", JsonLoads)(content)
         for deviceId in deviceIds:
             devices.append(Device(deviceId, _client=self))
 
+        if hydrate:
+            self.hydrate(devices, maxWorkers, **kwargs)
+
         return devices
 
+    @profiled
+    def hydrate(self, devices: List[Device], maxWorkers: int = 4, **kwargs) -> List[Device]:
+        """
+        Fetches the full record of every partial device concurrently and
+        fills them in place, so reading their attributes no longer makes
+        a request per device. Devices that fail to load are logged and
+        left partial, to be loaded lazily on first access.
+
+        devices : List[Device] - devices as returned by devices()
+        maxWorkers : int - number of device records to fetch in parallel
+
+        return : List[Device] - the same devices
+        """
+        partial = [d for d in devices if d._isPartial]
+        if not partial:
+            return devices
+
+        def fetch(device: Device):
+            try:
+                device._hydrate(self.device(device.Id, **kwargs))
+            except Exception as e:
+                logger.warning(f"{device.Id} failed to hydrate: {e}")
+
+        with ThreadPoolExecutor(max_workers=self.__boundWorkers(maxWorkers)) as executor:
+            for future in [_submit(executor, fetch, device) for device in partial]:
+                future.result()
+
+        return devices
+
+    @profiled
     def device(self, deviceId: str, **kwargs) -> Device:
         url = f"{self.endpoint}/devices/{deviceId}"
         
-        content, rateLimits = GetRequest(url, 
-            self.__session, self.timeout, 
-            retry=self.retry, **kwargs)
-        self.RateLimits = rateLimits
+        content = self.__getMetadata(url, **kwargs)
         
-        return self.__deviceSchema.loads(content)
+        return self.__measure("device", self.__deviceSchema.loads)(content)
 
+    @profiled
     def updateDevice(self, deviceId: Union[str, Device], updateFields, **kwargs) -> Device:
         url = f"{self.endpoint}/devices/{deviceId}"
         body = {
@@ -188,31 +913,35 @@ class Client:
 
         _, rateLimits = PatchRequest(url,
             self.__session, self.timeout,
-            retry=self.retry, params=body,
+            retry=self.retry, limiter=self.rateLimiter, metrics=self.metrics, params=body,
             **kwargs)
-        self.RateLimits = rateLimits
+        self.__local.RateLimits = rateLimits
+
+        if self.metadataCache is not None:
+            self.metadataCache.invalidate(url)
+        # the timezone windows are aligned in may have changed
+        self.__timezones.pop(_deviceId(deviceId), None)
 
 
+    @profiled
     def channelCategories(self, **kwargs) -> List[ChannelCategory]:
         url = f"{self.endpoint}/devices/channel-categories"
 
-        content, rateLimits = GetRequest(url, 
-            self.__session, self.timeout, 
-            retry=self.retry, **kwargs)
-        self.RateLimits = rateLimits
+        content = self.__getMetadata(url, **kwargs)
 
-        return ChannelCategorySchema().loads(content, many=True)
+        loads = lambda content: ChannelCategorySchema().loads(content, many=True)
+        return self.__measure("devices/channel-categories", loads)(content)
 
+    @profiled
     def modelTypes(self, **kwargs) -> List[DeviceModel]:
         url = f"{self.endpoint}/devices/models"
 
-        content, rateLimits = GetRequest(url, 
-            self.__session, self.timeout, 
-            retry=self.retry, **kwargs)
-        self.RateLimits = rateLimits
+        content = self.__getMetadata(url, **kwargs)
 
-        return DeviceModelSchema().loads(content, many=True)
+        loads = lambda content: DeviceModelSchema().loads(content, many=True)
+        return self.__measure("devices/models", loads)(content)
 
+    @profiled
     def shortEnergy(self, 
             deviceId:str, 
             fromTs: Union[int, datetime] = None,
@@ -220,7 +949,9 @@ class Client:
             filter: Union[str, Groups] = None,
             convert: Union[str, Energy] = None,
             fields: Union[str, Energy] = None,
-            **kwargs) -> List[ShortData]:
+            maxWorkers: int = None,
+            as_: Union[str, ResultFormat] = ResultFormat.Records,
+            **kwargs) -> Union[List[ShortData], ShortColumns]:
         """
         Returns short energy data for a specific device. Typically this
         is every 30 seconds, but depends on the 
@@ -233,11 +964,64 @@ class Client:
         deviceId : str - device id to query
         fromTs : int, datetime - from timestamp as epoch timestamp as int or python datetime class
         toTs : int, datetime - to timestamp epoch timestamp as int or python datetime class
+        maxWorkers : int - number of query windows to fetch in parallel, defaults to one at a time
+        as_ : str, ResultFormat - 'columns' to return numpy backed ShortColumns instead of records
 
         return : ShortEnergyData - interable/callable class for short energy data.
         """
+        as_ = ResultFormat(as_)
+        if as_ == ResultFormat.Columns:
+            localColumns = self.__convertsColumns(convert, as_)
+            # each window is decoded straight into arrays as it arrives
+            columns = ShortColumns.concatenate(self.__shortEnergyBatches(deviceId, fromTs, toTs,
+                filter, None if localColumns else convert, fields, maxWorkers, ShortColumns, **kwargs))
+            if localColumns:
+                with Stage("conversion"):
+                    columns = Convert(columns, convert)
+            return columns
+
+        data = []
+        for shortData in self.__shortEnergyBatches(deviceId, fromTs, toTs,
+                filter, convert, fields, maxWorkers, **kwargs):
+            data.extend(shortData)
+
+        return data
+
+    def iterShortEnergy(self, 
+            deviceId:str, 
+            fromTs: Union[int, datetime] = None,
+            toTs: Union[int, datetime] = None,
+            filter: Union[str, Groups] = None,
+            convert: Union[str, Energy] = None,
+            fields: Union[str, Energy] = None,
+            maxWorkers: int = None,
+            batches: bool = False,
+            **kwargs) -> Iterator[Union[ShortData, List[ShortData]]]:
+        """
+        Generator version of shortEnergy that yields data as each query
+        window arrives, so memory stays flat regardless of the range.
+
+        batches : bool - yield one list per query window instead of individual records
+        """
+        for shortData in self.__shortEnergyBatches(deviceId, fromTs, toTs,
+                filter, convert, fields, maxWorkers, **kwargs):
+            if batches:
+                yield shortData
+            else:
+                yield from shortData
+
+    def __shortEnergyBatches(self,
+            deviceId: str,
+            fromTs: Union[int, datetime] = None,
+            toTs: Union[int, datetime] = None,
+            filter: Union[str, Groups] = None,
+            convert: Union[str, Energy] = None,
+            fields: Union[str, Energy] = None,
+            maxWorkers: int = None,
+            columns: Type[ShortColumns] = None,
+            **kwargs) -> Iterator[Union[List[ShortData], ShortColumns]]:
         url = f"{self.endpoint}/short-energy/{deviceId}"
-        maxQueryPeriod = timedelta(hours=12)
+        maxQueryPeriod = SHORT_ENERGY_QUERY_PERIOD
 
         fromTs, toTs = NormaliseTimestamps(fromTs, toTs, maxQueryPeriod)
         params = dict()
@@ -245,31 +1029,18 @@ class Client:
         if filter is not None:
             params['filter[group]'] = str(filter)
 
-        self.__shortDataSchema.context['unit'] = Energy.Joules
-        if convert is not None:
-            params['convert[energy]'] = str(convert)
-            self.__shortDataSchema.context['unit'] = str(convert)
+        unit = self.__unit(params, 'convert[energy]', convert)
 
         if fields is not None:
             params['fields[energy]'] = str(fields)
 
-        data = []
-        windows = CreateQueryWindows(fromTs, toTs, maxQueryPeriod)
-        for period in windows:
-            requestParams = {"fromTs": int(period[0].timestamp()), "toTs": int(period[1].timestamp()), **params}
-            
-            content, rateLimits = GetRequest(url, 
-                self.__session, self.timeout, 
-                retry=self.retry, params=requestParams,
-                **kwargs)
-            self.RateLimits = rateLimits
-
-            shortData = self.__shortDataSchema.loads(content, many=True)
-            data.extend(shortData)
-
-        return data
+        windows = self.__planWindows(url, params, fromTs, toTs, maxQueryPeriod)
+        yield from self.__fetchWindows(url, windows, params,
+            self.__loads(ShortDataSchema, unit, SHORT_DATA_DECODER, columns=columns),
+            maxWorkers, **kwargs)
         
 
+    @profiled
     def firstShortEnergy(self, 
             deviceId: str, 
             filter: Union[str, Groups] = None,
@@ -283,23 +1054,21 @@ class Client:
         if filter is not None:
             params['filter'] = str(filter)
 
-        self.__shortDataSchema.context['unit'] = Energy.Joules
-        if convert is not None:
-            params['convert'] = str(convert)
-            self.__shortDataSchema.context['unit'] = str(convert)
+        unit = self.__unit(params, 'convert', convert)
 
         if fields is not None:
             params['fields'] = str(fields)
 
         content, rateLimits = GetRequest(url, 
             self.__session, self.timeout, 
-            retry=self.retry, params=params,
+            retry=self.retry, limiter=self.rateLimiter, metrics=self.metrics, params=params,
             **kwargs)
-        self.RateLimits = rateLimits
+        self.__local.RateLimits = rateLimits
 
-        shortData = self.__shortDataSchema.loads(content)
+        shortData = self.__loads(ShortDataSchema, unit, SHORT_DATA_DECODER, many=False)(content)
         return shortData
 
+    @profiled
     def latestShortEnergy(self, 
             deviceId: str, 
             filter: Union[str, Groups] = None,
@@ -313,23 +1082,21 @@ class Client:
         if filter is not None:
             params['filter[group]'] = str(filter)
 
-        self.__shortDataSchema.context['unit'] = Energy.Joules
-        if convert is not None:
-            params['convert[energy]'] = str(convert)
-            self.__shortDataSchema.context['unit'] = str(convert)
+        unit = self.__unit(params, 'convert[energy]', convert)
 
         if fields is not None:
             params['fields[energy]'] = str(fields)
 
         content, rateLimits = GetRequest(url, 
             self.__session, self.timeout, 
-            retry=self.retry, params=params,
+            retry=self.retry, limiter=self.rateLimiter, metrics=self.metrics, params=params,
             **kwargs)
-        self.RateLimits = rateLimits
+        self.__local.RateLimits = rateLimits
 
-        shortData = self.__shortDataSchema.loads(content)
+        shortData = self.__loads(ShortDataSchema, unit, SHORT_DATA_DECODER, many=False)(content)
         return shortData
 
+    @profiled
     def longEnergy(self, 
             deviceId: str, 
             fromTs: Union[int, datetime] = None,
@@ -339,57 +1106,94 @@ class Client:
             filter: Union[str, Groups] = None,
             convert: Union[str, Energy] = None,
             fields: Union[str, Energy] = None,
-            **kwargs) -> List[LongData]:
+            maxWorkers: int = None,
+            as_: Union[str, ResultFormat] = ResultFormat.Records,
+            **kwargs) -> Union[List[LongData], LongColumns]:
+        """
+        Returns long energy data for a specific device at the requested
+        granularity.
 
-        maxQueryTimeMap = {
-            Granularity.FiveMinute: (timedelta(days=7), timedelta(days=1)),
-            Granularity.FifteenMinute: (timedelta(days=14), timedelta(days=1)),
-            Granularity.HalfHourly: (timedelta(days=31), timedelta(days=1)),
-            Granularity.Hourly: (timedelta(days=90), timedelta(days=1)),
-            Granularity.Daily: (timedelta(days=360*3), timedelta(days=30)), # 3 years
-            Granularity.Weekly: (timedelta(days=360*5), timedelta(days=90)), # 5 years
-            Granularity.Monthly: (timedelta(days=360*10), timedelta(days=365)) # 10 years... approximately
-        }
+        maxWorkers : int - number of query windows to fetch in parallel, defaults to one at a time
+        as_ : str, ResultFormat - 'columns' to return numpy backed LongColumns instead of records
+        """
+        as_ = ResultFormat(as_)
+        if as_ == ResultFormat.Columns:
+            localColumns = self.__convertsColumns(convert, as_)
+            columns = LongColumns.concatenate(self.__longEnergyBatches(deviceId, fromTs, toTs, granularity,
+                timezone, filter, None if localColumns else convert, fields, maxWorkers, LongColumns, **kwargs))
+            if localColumns:
+                with Stage("conversion"):
+                    columns = Convert(columns, convert)
+            return columns
 
-        if granularity not in maxQueryTimeMap:
+        data = []
+        for longData in self.__longEnergyBatches(deviceId, fromTs, toTs, granularity,
+                timezone, filter, convert, fields, maxWorkers, **kwargs):
+            data.extend(longData)
+
+        return data
+
+    def iterLongEnergy(self, 
+            deviceId: str, 
+            fromTs: Union[int, datetime] = None,
+            toTs: Union[int, datetime] = None,
+            granularity: Union[str, Granularity] = Granularity.FifteenMinute,
+            timezone: str = None,
+            filter: Union[str, Groups] = None,
+            convert: Union[str, Energy] = None,
+            fields: Union[str, Energy] = None,
+            maxWorkers: int = None,
+            batches: bool = False,
+            **kwargs) -> Iterator[Union[LongData, List[LongData]]]:
+        """
+        Generator version of longEnergy, see iterShortEnergy.
+        """
+        for longData in self.__longEnergyBatches(deviceId, fromTs, toTs, granularity,
+                timezone, filter, convert, fields, maxWorkers, **kwargs):
+            if batches:
+                yield longData
+            else:
+                yield from longData
+
+    def __longEnergyBatches(self,
+            deviceId: str,
+            fromTs: Union[int, datetime] = None,
+            toTs: Union[int, datetime] = None,
+            granularity: Union[str, Granularity] = Granularity.FifteenMinute,
+            timezone: str = None,
+            filter: Union[str, Groups] = None,
+            convert: Union[str, Energy] = None,
+            fields: Union[str, Energy] = None,
+            maxWorkers: int = None,
+            columns: Type[LongColumns] = None,
+            **kwargs) -> Iterator[Union[List[LongData], LongColumns]]:
+
+        if granularity not in LONG_ENERGY_QUERY_PERIODS:
             raise ValueError(granularity)
         
-        maxQueryPeriod = maxQueryTimeMap[granularity][0]
-        extendPeriod = maxQueryTimeMap[granularity][1]
+        maxQueryPeriod = LONG_ENERGY_QUERY_PERIODS[granularity][0]
+        extendPeriod = LONG_ENERGY_QUERY_PERIODS[granularity][1]
         url = f"{self.endpoint}/long-energy/{deviceId}"
 
-        params = {"granularity": str(granularity), "timezone": self.timezone}
+        timezone = timezone or self.timezone
+        params = {"granularity": str(granularity), "timezone": timezone}
         fromTs, toTs = NormaliseTimestamps(fromTs, toTs, extendPeriod)
 
         if filter is not None:
             params['filter[group]'] = str(filter)
 
-        self.__longDataSchema.context['unit'] = Energy.Joules
-        if convert is not None:
-            params['convert[energy]'] = str(convert)
-            self.__longDataSchema.context['unit'] = str(convert)
+        unit = self.__unit(params, 'convert[energy]', convert)
 
         if fields is not None:
             params['fields[energy]'] = str(fields)
 
-        data = []; periods = []
-        windows = CreateQueryWindows(fromTs, toTs, maxQueryPeriod)
-        
-        # if period is longer than 12 hours then batch calls
-        for period in windows:
-            requestParams = {"fromTs": int(period[0].timestamp()), "toTs": int(period[1].timestamp()), **params}
-            
-            content, rateLimits = GetRequest(url, 
-                self.__session, self.timeout, 
-                retry=self.retry, params=requestParams,
-                **kwargs)
-            self.RateLimits = rateLimits
-            
-            longData = self.__longDataSchema.loads(content, many=True)
-            data.extend(longData)
-
-        return data
+        windows = self.__planWindows(url, params, fromTs, toTs, maxQueryPeriod,
+            granularity, self.__windowTimezone(deviceId, timezone))
+        yield from self.__fetchWindows(url, windows, params,
+            self.__loads(LongDataSchema, unit, LONG_DATA_DECODER, columns=columns),
+            maxWorkers, **kwargs)
 
+    @profiled
     def firstLongEnergy(self, 
             deviceId: str, 
             filter: Union[str, Groups] = None,
@@ -402,22 +1206,20 @@ class Client:
         if filter is not None:
             params['filter'] = str(filter)
 
-        self.__longDataSchema.context['unit'] = Energy.Joules
-        if convert is not None:
-            params['convert'] = str(convert)
-            self.__longDataSchema.context['unit'] = str(convert)
+        unit = self.__unit(params, 'convert', convert)
 
         if fields is not None:
             params['fields'] = str(fields)
 
         content, rateLimits = GetRequest(url, 
                 self.__session, self.timeout, 
-                retry=self.retry, params=params,
+                retry=self.retry, limiter=self.rateLimiter, metrics=self.metrics, params=params,
                 **kwargs)
-        self.RateLimits = rateLimits
+        self.__local.RateLimits = rateLimits
 
-        return self.__longDataSchema.loads(content)
+        return self.__loads(LongDataSchema, unit, LONG_DATA_DECODER, many=False)(content)
 
+    @profiled
     def latestLongEnergy(self, 
             deviceId: str, 
             filter: Union[str, Groups] = None,
@@ -431,47 +1233,271 @@ class Client:
         if filter is not None:
             params['filter'] = str(filter)
 
-        self.__longDataSchema.context['unit'] = Energy.Joules
-        if convert is not None:
-            params['convert'] = str(convert)
-            self.__longDataSchema.context['unit'] = str(convert)
+        unit = self.__unit(params, 'convert', convert)
 
         if fields is not None:
             params['fields'] = str(fields)
 
         content, rateLimits = GetRequest(url, 
                 self.__session, self.timeout, 
-                retry=self.retry, params=params,
+                retry=self.retry, limiter=self.rateLimiter, metrics=self.metrics, params=params,
                 **kwargs)
-        self.RateLimits = rateLimits
+        self.__local.RateLimits = rateLimits
 
-        return self.__longDataSchema.loads(content)
+        return self.__loads(LongDataSchema, unit, LONG_DATA_DECODER, many=False)(content)
 
 
+    @profiled
     def modbus(self, 
             deviceId: str, 
             fromTs: Union[int, datetime] = None,
             toTs: Union[int, datetime] = None,
-            **kwargs):
+            maxWorkers: int = None,
+            **kwargs) -> List[ModbusData]:
+        data = []
+        for modbusData in self.iterModbus(deviceId, fromTs, toTs,
+                maxWorkers, batches=True, **kwargs):
+            data.extend(modbusData)
+
+        return data
+
+    def iterModbus(self, 
+            deviceId: str, 
+            fromTs: Union[int, datetime] = None,
+            toTs: Union[int, datetime] = None,
+            maxWorkers: int = None,
+            batches: bool = False,
+            **kwargs) -> Iterator[Union[ModbusData, List[ModbusData]]]:
+        """
+        Generator version of modbus, see iterShortEnergy.
+        """
         url = f"{self.endpoint}/modbus/{deviceId}"
-        maxQueryPeriod = timedelta(days=7)
+        maxQueryPeriod = MODBUS_QUERY_PERIOD
 
         fromTs, toTs = NormaliseTimestamps(fromTs, toTs, maxQueryPeriod)
 
-        data = []
-        windows = CreateQueryWindows(fromTs, toTs, maxQueryPeriod)
-        for period in windows:
-            requestParams = {"fromTs": int(period[0].timestamp()), "toTs": int(period[1].timestamp())}
-            content, rateLimits = GetRequest(url, 
-                self.__session, self.timeout, 
-                retry=self.retry, params=requestParams,
-                **kwargs)
-            self.RateLimits = rateLimits
+        windows = self.__planWindows(url, {}, fromTs, toTs, maxQueryPeriod)
+        for modbusData in self.__fetchWindows(url, windows, {},
+                self.__loads(ModbusDataSchema, None, MODBUS_DATA_DECODER),
+                maxWorkers, **kwargs):
+            if batches:
+                yield modbusData
+            else:
+                yield from modbusData
+
+    @profiled
+    def fleetShortEnergy(self,
+            deviceIds: List[Union[str, Device]],
+            fromTs: Union[int, datetime] = None,
+            toTs: Union[int, datetime] = None,
+            filter: Union[str, Groups] = None,
+            convert: Union[str, Energy] = None,
+            fields: Union[str, Energy] = None,
+            maxWorkers: int = 4,
+            **kwargs) -> FleetResult:
+        """
+        Returns short energy data for many devices, fetching every
+        query window of every device concurrently through one pool.
 
-            data.extend(self.__modbusDataSchema.loads(content, many=True))
+        deviceIds : List[str, Device] - devices to query
+        fromTs : int, datetime - from timestamp as epoch timestamp as int or python datetime class
+        toTs : int, datetime - to timestamp epoch timestamp as int or python datetime class
+        maxWorkers : int - number of requests to keep in flight across the fleet
 
-        return data
+        return : FleetResult - ShortData keyed by device id, and the error of any device that failed
+        """
+        maxQueryPeriod = SHORT_ENERGY_QUERY_PERIOD
 
+        fromTs, toTs = NormaliseTimestamps(fromTs, toTs, maxQueryPeriod)
+        params = dict()
 
+        if filter is not None:
+            params['filter[group]'] = str(filter)
+
+        unit = self.__unit(params, 'convert[energy]', convert)
+
+        if fields is not None:
+            params['fields[energy]'] = str(fields)
 
+        queries = {}
+        for deviceId in deviceIds:
+            deviceId = _deviceId(deviceId)
+            url = f"{self.endpoint}/short-energy/{deviceId}"
+            windows = list(self.__planWindows(url, params, fromTs, toTs, maxQueryPeriod))
+            queries[deviceId] = (url, windows, params)
+
+        return self.__fetchFleet(queries,
+            self.__loads(ShortDataSchema, unit, SHORT_DATA_DECODER),
+            maxWorkers, **kwargs)
+
+    @profiled
+    def fleetLongEnergy(self,
+            deviceIds: List[Union[str, Device]],
+            fromTs: Union[int, datetime] = None,
+            toTs: Union[int, datetime] = None,
+            granularity: Union[str, Granularity] = Granularity.FifteenMinute,
+            timezone: str = None,
+            filter: Union[str, Groups] = None,
+            convert: Union[str, Energy] = None,
+            fields: Union[str, Energy] = None,
+            maxWorkers: int = 4,
+            **kwargs) -> FleetResult:
+        """
+        Returns long energy data for many devices, see fleetShortEnergy.
+
+        return : FleetResult - LongData keyed by device id, and the error of any device that failed
+        """
+
+        if granularity not in LONG_ENERGY_QUERY_PERIODS:
+            raise ValueError(granularity)
+        
+        maxQueryPeriod = LONG_ENERGY_QUERY_PERIODS[granularity][0]
+        extendPeriod = LONG_ENERGY_QUERY_PERIODS[granularity][1]
+
+        timezone = timezone or self.timezone
+        params = {"granularity": str(granularity), "timezone": timezone}
+        fromTs, toTs = NormaliseTimestamps(fromTs, toTs, extendPeriod)
+
+        if filter is not None:
+            params['filter[group]'] = str(filter)
 
+        unit = self.__unit(params, 'convert[energy]', convert)
+
+        if fields is not None:
+            params['fields[energy]'] = str(fields)
+
+        # aligned windows follow each device's own timezone
+        timezones = self.__windowTimezones(deviceIds, timezone, maxWorkers)
+        queries = {}
+        for device in deviceIds:
+            deviceId = _deviceId(device)
+            url = f"{self.endpoint}/long-energy/{deviceId}"
+            windows = list(self.__planWindows(url, params, fromTs, toTs, maxQueryPeriod,
+                granularity, timezones[deviceId]))
+            queries[deviceId] = (url, windows, params)
+
+        return self.__fetchFleet(queries,
+            self.__loads(LongDataSchema, unit, LONG_DATA_DECODER),
+            maxWorkers, **kwargs)
+
+    @profiled
+    def fleetModbus(self,
+            deviceIds: List[Union[str, Device]],
+            fromTs: Union[int, datetime] = None,
+            toTs: Union[int, datetime] = None,
+            maxWorkers: int = 4,
+            **kwargs) -> FleetResult:
+        """
+        Returns modbus data for many devices, see fleetShortEnergy.
+
+        return : FleetResult - ModbusData keyed by device id, and the error of any device that failed
+        """
+        maxQueryPeriod = MODBUS_QUERY_PERIOD
+
+        fromTs, toTs = NormaliseTimestamps(fromTs, toTs, maxQueryPeriod)
+
+        queries = {}
+        for deviceId in deviceIds:
+            deviceId = _deviceId(deviceId)
+            url = f"{self.endpoint}/modbus/{deviceId}"
+            windows = list(self.__planWindows(url, {}, fromTs, toTs, maxQueryPeriod))
+            queries[deviceId] = (url, windows, {})
+
+        return self.__fetchFleet(queries,
+            self.__loads(ModbusDataSchema, None, MODBUS_DATA_DECODER),
+            maxWorkers, **kwargs)
+
+    def __sync(self,
+            deviceId: str,
+            store: CursorStore,
+            cursorKey: str,
+            latest: Callable[[], Any],
+            first: Callable[[], Any],
+            fetch: Callable[[Union[int, datetime], int], List],
+            since: Union[int, datetime] = None) -> List:
+        cursor = store.get(deviceId, cursorKey)
+
+        # nothing newer than the cursor, so skip the range request entirely
+        latestData = latest()
+        if latestData is None or latestData.Timestamp is None:
+            return []
+        if cursor is not None and int(latestData.Timestamp.timestamp()) <= cursor:
+            return []
+
+        if cursor is not None:
+            fromTs = cursor
+        elif since is not None:
+            fromTs = since
+        else:
+            firstData = first()
+            if firstData is None or firstData.Timestamp is None:
+                return []
+            fromTs = firstData.Timestamp
+
+        # stop at the latest record rather than now, for devices that stopped reporting
+        toTs = int(latestData.Timestamp.timestamp()) + (latestData.Duration or 1)
+        data = fetch(fromTs, toTs)
+        if cursor is not None:
+            data = [d for d in data if d.Timestamp.timestamp() > cursor]
+
+        # an interval still in progress, such as the current hour or day of
+        # long energy, is left for the sync after it closes
+        data = [d for d in data if d.Timestamp.timestamp() + (d.Duration or 0) <= toTs]
+
+        if data:
+            store.set(deviceId, cursorKey, max(int(d.Timestamp.timestamp()) for d in data))
+
+        return data
+
+    @profiled
+    def syncShortEnergy(self,
+            deviceId: str,
+            store: CursorStore,
+            filter: Union[str, Groups] = None,
+            convert: Union[str, Energy] = None,
+            fields: Union[str, Energy] = None,
+            since: Union[int, datetime] = None,
+            maxWorkers: int = None,
+            **kwargs) -> List[ShortData]:
+        """
+        Returns the short energy data ingested since the last sync of
+        this device, and advances its cursor in the store. On a cold start
+        the cursor is seeded from firstShortEnergy, or from since if given.
+        Only intervals that ended by the latest record are returned, so
+        each interval is returned once, complete.
+
+        deviceId : str - device id to query
+        store : CursorStore - where the cursor of each device is kept
+        since : int, datetime - where to start a cold sync instead of the first record
+
+        return : List[ShortData] - only the records newer than the cursor
+        """
+        return self.__sync(deviceId, store, "short-energy",
+            lambda: self.latestShortEnergy(deviceId, filter, convert, fields, **kwargs),
+            lambda: self.firstShortEnergy(deviceId, filter, convert, fields, **kwargs),
+            lambda fromTs, toTs: self.shortEnergy(deviceId, fromTs, toTs,
+                filter, convert, fields, maxWorkers, **kwargs),
+            since)
+
+    @profiled
+    def syncLongEnergy(self,
+            deviceId: str,
+            store: CursorStore,
+            granularity: Union[str, Granularity] = Granularity.FifteenMinute,
+            filter: Union[str, Groups] = None,
+            convert: Union[str, Energy] = None,
+            fields: Union[str, Energy] = None,
+            since: Union[int, datetime] = None,
+            maxWorkers: int = None,
+            **kwargs) -> List[LongData]:
+        """
+        Returns the long energy data ingested since the last sync of
+        this device at this granularity, see syncShortEnergy. The interval
+        in progress is returned by the first sync after it has closed.
+        """
+        return self.__sync(deviceId, store, f"long-energy/{granularity}",
+            lambda: self.latestLongEnergy(deviceId, filter, convert, fields, **kwargs),
+            lambda: self.firstLongEnergy(deviceId, filter, convert, fields, **kwargs),
+            lambda fromTs, toTs: self.longEnergy(deviceId, fromTs, toTs, granularity,
+                None, filter, convert, fields, maxWorkers, **kwargs),
+            since)
@@ -0,0 +1,287 @@
+from dataclasses import dataclass, fields, replace
+from datetime import datetime
+from typing import Optional, List, Iterable, Union, Any, Dict, Tuple
+from .models import ShortData, LongData
+
+try:
+    import numpy as np
+except ImportError: # pragma: no cover - optional dependency
+    np = None
+
+__all__ = [
+    "ShortColumns",
+    "LongColumns"
+]
+
+
+def _requireNumpy():
+    if np is None:
+        raise ImportError("columnar results require the numpy package")
+
+
+def _timestamp(value: Union[datetime, int, None]) -> int:
+    if value is None:
+        return 0
+    if isinstance(value, datetime):
+        return int(value.timestamp())
+
+    return int(value)
+
+
+def _matrix(rows: List[Optional[List[float]]]) -> Optional["np.ndarray"]:
+    """
+    Packs per interval channel lists into a 2-D [interval, channel] array.
+    Intervals missing the measurement are filled with NaN.
+    """
+    try:
+        # rectangular and complete, numpy converts the nested lists in one pass
+        matrix = np.array(rows, dtype=np.float64)
+        if matrix.ndim == 2:
+            return matrix
+    except (ValueError, TypeError):
+        pass
+
+    width = max([len(row) for row in rows if row is not None], default=None)
+    if width is None:
+        return None
+
+    matrix = np.full((len(rows), width), np.nan, dtype=np.float64)
+    for idx, row in enumerate(rows):
+        if row is not None:
+            matrix[idx, :len(row)] = row
+
+    return matrix
+
+
+def _column(rows: List[Dict[str, Any]], keys: Tuple[str, ...]) -> List[Any]:
+    if not keys:
+        return [None] * len(rows)
+    if len(keys) == 1:
+        key = keys[0]
+        return [row.get(key) for row in rows]
+
+    preferred, key = keys
+    return [row[preferred] if preferred in row else row.get(key) for row in rows]
+
+
+def _vector(values: List[Any], dtype) -> "np.ndarray":
+    if None not in values:
+        return np.array(values, dtype=dtype)
+    if dtype is np.int64:
+        return np.array([0 if v is None else v for v in values], dtype=dtype)
+
+    return np.array([np.nan if v is None else v for v in values], dtype=dtype)
+
+
+@dataclass
+class _Columns:
+    """
+    Columnar energy data. Timestamp is an int64 array of epoch seconds,
+    and every measurement is a float64 [interval, channel] array, or None
+    when the measurement was not requested.
+
+    Slicing by time or channel returns views, no data is copied.
+    """
+    MEASUREMENTS = ()
+    VECTORS = ()
+    RECORD = None
+
+    Timestamp: "np.ndarray"
+    Duration: "np.ndarray"
+    Unit: str = None
+
+    def __len__(self):
+        return len(self.Timestamp)
+
+    def __getitem__(self, index: slice) -> "_Columns":
+        if not isinstance(index, slice):
+            raise TypeError("columns can only be sliced, use toRecords() for single intervals")
+
+        values = {}
+        for f in fields(self):
+            value = getattr(self, f.name)
+            values[f.name] = value[index] if isinstance(value, np.ndarray) else value
+
+        return replace(self, **values)
+
+    @property
+    def ChannelCount(self) -> int:
+        for name in self.MEASUREMENTS:
+            value = getattr(self, name)
+            if value is not None:
+                return value.shape[1]
+
+        return 0
+
+    def between(self, fromTs: Union[int, datetime] = None, toTs: Union[int, datetime] = None) -> "_Columns":
+        """
+        Returns the intervals where fromTs <= Timestamp < toTs.
+        """
+        start = 0 if fromTs is None else \
+            int(np.searchsorted(self.Timestamp, _timestamp(fromTs), side='left'))
+        end = len(self) if toTs is None else \
+            int(np.searchsorted(self.Timestamp, _timestamp(toTs), side='left'))
+
+        return self[start:end]
+
+    def channel(self, index: Union[int, slice]) -> "_Columns":
+        """
+        Returns the given channel, or slice of channels, keeping the
+        measurements two dimensional.
+        """
+        if isinstance(index, int):
+            index = slice(index, index + 1 if index != -1 else None)
+
+        values = {}
+        for name in self.MEASUREMENTS:
+            value = getattr(self, name)
+            values[name] = None if value is None else value[:, index]
+
+        return replace(self, **values)
+
+    def toRecords(self) -> List[Any]:
+        """
+        Converts back to a list of record dataclasses.
+        """
+        columns = {}
+        for f in fields(self):
+            value = getattr(self, f.name)
+            columns[f.name] = value.tolist() if isinstance(value, np.ndarray) else value
+
+        records = []
+        for idx in range(len(self)):
+            record = {}
+            for name, value in columns.items():
+                if name == 'Timestamp':
+                    record[name] = datetime.fromtimestamp(value[idx])
+                elif name in self.VECTORS:
+                    # NaN marks an interval without the value
+                    record[name] = None if value[idx] != value[idx] else value[idx]
+                elif isinstance(value, list):
+                    record[name] = value[idx]
+                else:
+                    record[name] = value
+            records.append(self.RECORD(**record))
+
+        return records
+
+    @classmethod
+    def fromRecords(cls, records: Iterable[Any]) -> "_Columns":
+        """
+        Packs a sequence of record dataclasses into columns.
+        """
+        _requireNumpy()
+        records = list(records)
+
+        values = {}
+        for f in fields(cls):
+            column = [getattr(r, f.name) for r in records]
+            if f.name == 'Timestamp':
+                values[f.name] = np.array([_timestamp(v) for v in column], dtype=np.int64)
+            elif f.name == 'Duration':
+                values[f.name] = _vector(column, np.int64)
+            elif f.name in cls.MEASUREMENTS:
+                values[f.name] = _matrix(column)
+            elif f.name in cls.VECTORS:
+                values[f.name] = _vector(column, np.float64)
+            else:
+                values[f.name] = column[0] if column else None
+
+        return cls(**values)
+
+    @classmethod
+    def fromRows(cls, rows: List[Dict[str, Any]], keys: Dict[str, Tuple[str, ...]], unit: str = None) -> "_Columns":
+        """
+        Packs parsed json rows into columns without building a record per
+        row. keys maps each field to its json key, or to a preferred key
+        and the key used by rows without it.
+        """
+        _requireNumpy()
+
+        values = {}
+        for f in fields(cls):
+            if f.name == 'Unit':
+                values[f.name] = unit
+                continue
+
+            column = _column(rows, keys.get(f.name, ()))
+            if f.name in ('Timestamp', 'Duration'):
+                values[f.name] = _vector(column, np.int64)
+            elif f.name in cls.MEASUREMENTS:
+                values[f.name] = _matrix(column)
+            elif f.name in cls.VECTORS:
+                values[f.name] = _vector(column, np.float64)
+            else:
+                values[f.name] = column[0] if column else None
+
+        return cls(**values)
+
+    @classmethod
+    def concatenate(cls, batches: Iterable["_Columns"]) -> "_Columns":
+        """
+        Joins batches, such as one per query window, into one set of columns.
+        """
+        _requireNumpy()
+        batches = [b for b in batches if len(b)]
+        if not batches:
+            return cls.fromRecords([])
+        if len(batches) == 1:
+            return batches[0]
+
+        values = {}
+        for f in fields(cls):
+            column = [getattr(b, f.name) for b in batches]
+            if f.name in cls.MEASUREMENTS:
+                width = max([c.shape[1] for c in column if c is not None], default=None)
+                if width is None:
+                    values[f.name] = None
+                    continue
+
+                padded = []
+                for batch, c in zip(batches, column):
+                    if c is None or c.shape[1] != width:
+                        p = np.full((len(batch), width), np.nan, dtype=np.float64)
+                        if c is not None:
+                            p[:, :c.shape[1]] = c
+                        c = p
+                    padded.append(c)
+                values[f.name] = np.concatenate(padded)
+            elif isinstance(column[0], np.ndarray):
+                values[f.name] = np.concatenate(column)
+            else:
+                values[f.name] = column[0]
+
+        return cls(**values)
+
+
+@dataclass
+class ShortColumns(_Columns):
+    MEASUREMENTS = ('Real', 'Reactive', 'VoltageRMS', 'CurrentRMS')
+    VECTORS = ('Frequency',)
+    RECORD = ShortData
+
+    Frequency: "np.ndarray" = None
+    GroupedBy: Optional[str] = None
+    Real: Optional["np.ndarray"] = None
+    Reactive: Optional["np.ndarray"] = None
+    VoltageRMS: Optional["np.ndarray"] = None
+    CurrentRMS: Optional["np.ndarray"] = None
+
+
+@dataclass
+class LongColumns(_Columns):
+    MEASUREMENTS = ('Real', 'RealNegative', 'RealPositive',
+        'Reactive', 'ReactiveNegative', 'ReactivePositive',
+        'VoltageRMSMin', 'VoltageRMSMax', 'CurrentRMSMin', 'CurrentRMSMax')
+    RECORD = LongData
+
+    Real: Optional["np.ndarray"] = None
+    RealNegative: Optional["np.ndarray"] = None
+    RealPositive: Optional["np.ndarray"] = None
+    Reactive: Optional["np.ndarray"] = None
+    ReactiveNegative: Optional["np.ndarray"] = None
+    ReactivePositive: Optional["np.ndarray"] = None
+    VoltageRMSMin: Optional["np.ndarray"] = None
+    VoltageRMSMax: Optional["np.ndarray"] = None
+    CurrentRMSMin: Optional["np.ndarray"] = None
+    CurrentRMSMax: Optional["np.ndarray"] = None
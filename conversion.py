@@ -0,0 +1,148 @@
+from dataclasses import replace
+from typing import Optional, List, Iterable, Union, Any
+from .enums import Energy
+from .columns import ShortColumns, LongColumns, _Columns, _requireNumpy
+
+try:
+    import numpy as np
+except ImportError: # pragma: no cover - optional dependency
+    np = None
+
+__all__ = [
+    "Convert",
+    "PowerFactor",
+    "IsLocalUnit"
+]
+
+JOULES_PER_KWH = 3.6e6
+# units derived from joules and the interval duration alone
+LOCAL_UNITS = (str(Energy.Joules), str(Energy.KillowattHours), str(Energy.Killowatts))
+# energy fields converted between units, RMS fields are left as they are
+ENERGY_FIELDS = ('Real', 'RealNegative', 'RealPositive',
+    'Reactive', 'ReactiveNegative', 'ReactivePositive')
+
+
+def IsLocalUnit(unit: Union[str, Energy, None]) -> bool:
+    """
+    return : bool - the unit can be converted to locally from joules
+    """
+    return unit is not None and str(unit) in LOCAL_UNITS
+
+
+def _unit(unit: Union[str, Energy, None]) -> str:
+    unit = str(Energy.Joules) if unit is None else str(unit)
+    if unit not in LOCAL_UNITS:
+        raise ValueError(f"cannot convert energy in {unit}, only {', '.join(LOCAL_UNITS)}")
+
+    return unit
+
+
+def _factor(unit: str, duration):
+    """
+    Multiplier from joules to the unit, duration is in seconds.
+    """
+    if unit == str(Energy.KillowattHours):
+        return 1 / JOULES_PER_KWH
+    if unit == str(Energy.Killowatts):
+        return 1 / (duration * 1000)
+
+    return 1
+
+
+def _convertRecord(record: Any, fromUnit: str, toUnit: str):
+    """
+    Converts the energy fields of a record in place.
+    """
+    # a missing duration leaves kW undefined
+    factor = None
+    if record.Duration or str(Energy.Killowatts) not in (fromUnit, toUnit):
+        factor = _factor(toUnit, record.Duration) / _factor(fromUnit, record.Duration)
+
+    for name in ENERGY_FIELDS:
+        values = getattr(record, name, None)
+        if values is None:
+            continue
+
+        setattr(record, name, [None if v is None or factor is None else v * factor for v in values])
+
+    record.Unit = toUnit
+
+
+def _convertColumns(columns: _Columns, fromUnit: str, toUnit: str) -> _Columns:
+    duration = columns.Duration.astype(np.float64)
+    # a missing duration leaves kW undefined
+    duration = np.where(duration > 0, duration, np.nan)[:, None]
+    factor = _factor(toUnit, duration) / _factor(fromUnit, duration)
+
+    values = {}
+    for name in ENERGY_FIELDS:
+        value = getattr(columns, name, None)
+        if value is not None:
+            values[name] = value * factor
+
+    return replace(columns, Unit=toUnit, **values)
+
+
+def Convert(
+        data: Union[ShortColumns, LongColumns, Iterable[Any]],
+        unit: Union[str, Energy]) -> Union[ShortColumns, LongColumns, List[Any]]:
+    """
+    Converts short or long energy between J, kWh and kW locally, so one
+    fetch in joules serves every unit. kW is the average power over each
+    interval, from its Duration. Columns are converted in bulk with numpy.
+
+    data : ShortColumns, LongColumns, List[ShortData], List[LongData] - energy in the unit given by Unit, joules when not set
+    unit : str, Energy - J, kWh or kW
+
+    return : ShortColumns, LongColumns, List[ShortData], List[LongData] - converted copies
+    """
+    toUnit = _unit(unit)
+
+    if isinstance(data, _Columns):
+        _requireNumpy()
+        fromUnit = _unit(data.Unit)
+        if fromUnit == toUnit:
+            return data
+        return _convertColumns(data, fromUnit, toUnit)
+
+    records = []
+    for record in data:
+        record = replace(record)
+        fromUnit = _unit(record.Unit)
+        if fromUnit != toUnit:
+            _convertRecord(record, fromUnit, toUnit)
+        records.append(record)
+
+    return records
+
+
+def PowerFactor(data: Union[ShortColumns, LongColumns, Iterable[Any]]) -> Union["np.ndarray", List[Optional[List[float]]]]:
+    """
+    Power factor of each interval and channel, real over apparent energy
+    from the Real and Reactive fields. Negative while exporting, and NaN
+    or None when an interval has no energy. Any energy unit will do, the
+    ratio does not depend on it.
+
+    return : np.ndarray, List[List[float]] - a [interval, channel] array for columns, lists for records
+    """
+    if isinstance(data, _Columns):
+        _requireNumpy()
+        if data.Real is None or data.Reactive is None:
+            raise ValueError("power factor requires both Real and Reactive energy")
+        apparent = np.hypot(data.Real, data.Reactive)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(apparent > 0, data.Real / apparent, np.nan)
+
+    factors = []
+    for record in data:
+        if record.Real is None or record.Reactive is None:
+            factors.append(None)
+            continue
+
+        row = []
+        for real, reactive in zip(record.Real, record.Reactive):
+            apparent = None if real is None or reactive is None else (real * real + reactive * reactive) ** 0.5
+            row.append(real / apparent if apparent else None)
+        factors.append(row)
+
+    return factors
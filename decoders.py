@@ -0,0 +1,137 @@
+import marshmallow
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Tuple, Type, Union
+from .enums import Energy
+from .utilities import JsonLoads
+from .profiling import Stage
+from .models import (
+    TimeStamp, ShortData, ShortDataSchema,
+    LongData, LongDataSchema, ModbusData, ModbusDataSchema)
+
+__all__ = [
+    "FastDecoder",
+    "SHORT_DATA_DECODER",
+    "LONG_DATA_DECODER",
+    "MODBUS_DATA_DECODER"
+]
+
+
+def _converter(field: marshmallow.fields.Field) -> Callable:
+    """
+    Returns the plain python equivalent of a marshmallow field's
+    deserialisation for the field types used by the data models.
+    """
+    if isinstance(field, TimeStamp):
+        return datetime.fromtimestamp
+    if isinstance(field, marshmallow.fields.Integer):
+        return int
+    if isinstance(field, marshmallow.fields.Float):
+        return float
+    if isinstance(field, marshmallow.fields.List):
+        inner = _converter(field.inner)
+        if inner is None:
+            return list
+
+        return lambda values: [inner(v) for v in values]
+
+    # strings and anything else are passed through unchanged
+    return None
+
+
+class FastDecoder:
+    """
+    Decodes energy and modbus payloads straight into the model
+    dataclasses, bypassing marshmallow.
+
+    The decoding plan is derived from the marshmallow schema itself, so
+    keys, types and unit handling stay identical to the schema path,
+    including the *Kw/*Kwh key substitution done by BaseSchema.pre_load.
+    Payloads are assumed to be valid, no validation errors are raised.
+    """
+
+    def __init__(self, dataClass: Type, schemaClass: Type[marshmallow.Schema]):
+        self.dataClass = dataClass
+        self._unitName = None
+
+        plan = []
+        for name, field in schemaClass().load_fields.items():
+            dataKey = field.data_key or name
+            if dataKey == 'unit':
+                self._unitName = name
+            else:
+                plan.append((name, dataKey, _converter(field)))
+
+        # BaseSchema.pre_load copies e<Name>Kw / e<Name>Kwh over e<Name>
+        self._plans: Dict[str, List[Tuple[str, str, str, Callable]]] = {
+            str(Energy.Killowatts): [(n, k, 'e' + k[1:] + 'Kw', c) for n, k, c in plan],
+            str(Energy.KillowattHours): [(n, k, 'e' + k[1:] + 'Kwh', c) for n, k, c in plan],
+        }
+        self._plan = [(n, k, None, c) for n, k, c in plan]
+
+    def _record(self, row: Dict[str, Any], plan, unit: str):
+        values = {}
+        for name, dataKey, unitKey, convert in plan:
+            if unitKey is not None and unitKey in row:
+                value = row[unitKey]
+            elif dataKey in row:
+                value = row[dataKey]
+            else:
+                continue
+
+            values[name] = value if value is None or convert is None else convert(value)
+
+        if self._unitName is not None and unit is not None:
+            values[self._unitName] = unit
+
+        return self.dataClass(**values)
+
+    def load(self, data: Union[Dict, List[Dict]], unit: Union[str, Energy] = None, many: bool = False):
+        """
+        Builds model instances from already parsed json.
+
+        unit : str, Energy - unit the data was requested in, as set in the schema context
+        """
+        unit = None if unit is None else str(unit)
+        plan = self._plans.get(unit, self._plan)
+
+        if many:
+            return [self._record(row, plan, unit) for row in data]
+
+        return self._record(data, plan, unit)
+
+    def loads(self, content: Union[bytes, str], unit: Union[str, Energy] = None, many: bool = False):
+        """
+        Parses and builds model instances from a json response body.
+        """
+        with Stage("json"):
+            data = JsonLoads(content)
+        with Stage("construction"):
+            return self.load(data, unit, many)
+
+    def loadColumns(self, data: List[Dict], columnsClass: Type, unit: Union[str, Energy] = None):
+        """
+        Builds columns from already parsed json, without a model instance
+        per row.
+
+        columnsClass : Type - ShortColumns or LongColumns
+        """
+        unit = None if unit is None else str(unit)
+        keys = {}
+        for name, dataKey, unitKey, _ in self._plans.get(unit, self._plan):
+            keys[name] = (dataKey,) if unitKey is None else (unitKey, dataKey)
+
+        return columnsClass.fromRows(data, keys, unit if self._unitName is not None else None)
+
+    def loadsColumns(self, content: Union[bytes, str], columnsClass: Type, unit: Union[str, Energy] = None):
+        """
+        Parses and builds columns from a json response body.
+        """
+        with Stage("json"):
+            data = JsonLoads(content)
+        with Stage("construction"):
+            return self.loadColumns(data, columnsClass, unit)
+
+
+SHORT_DATA_DECODER = FastDecoder(ShortData, ShortDataSchema)
+LONG_DATA_DECODER = FastDecoder(LongData, LongDataSchema)
+MODBUS_DATA_DECODER = FastDecoder(ModbusData, ModbusDataSchema)
@@ -39,3 +39,9 @@ class Granularity(BaseEnum):
     Daily = 'day'
     Weekly = 'week'
     Monthly = 'month'
+
+
+@unique
+class ResultFormat(BaseEnum):
+    Records = 'records'
+    Columns = 'columns'
@@ -19,4 +19,17 @@ class UnprocessableEntityError(Exception):
         self.errors = errors['errors']
 
     def __str__(self):
-        return ",".join([f"{error['title']}: {error['detail']}" for error in self.errors])
\ No newline at end of file
+        return ",".join([f"{error['title']}: {error['detail']}" for error in self.errors])
+
+class RetryError(Exception):
+    """
+    Raised when a request still fails once its retries, or the retry
+    budget of the client, have run out.
+    """
+
+    def __init__(self, attempts: int, lastError: Exception):
+        self.Attempts: int = attempts
+        self.LastError: Exception = lastError
+
+    def __str__(self):
+        return f'gave up after {self.Attempts} attempts, {type(self.LastError).__name__}: {self.LastError}'
@@ -0,0 +1,376 @@
+import csv
+import os
+import queue
+import threading
+from dataclasses import dataclass, field, fields
+from datetime import datetime, timezone as dtTimezone
+from typing import Optional, List, Dict, Union, Tuple, Any, get_args
+from zoneinfo import ZoneInfo
+from . import logger
+from .client import Client
+from .models import Device
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError: # pragma: no cover - optional dependency
+    pa = None
+
+__all__ = [
+    "Export",
+    "ExportResult",
+    "PartitionWriter",
+    "CsvWriter",
+    "ParquetWriter",
+    "ArrowWriter",
+    "EXPORTS"
+]
+
+# client generator behind each exportable endpoint
+EXPORTS = {
+    "short-energy": "iterShortEnergy",
+    "long-energy": "iterLongEnergy",
+    "modbus": "iterModbus",
+}
+
+# marks the end of a device in the write queue
+_DEVICE_DONE = object()
+
+
+def _requirePyarrow(writer: str):
+    if pa is None:
+        raise ImportError(f"{writer} requires the pyarrow package")
+
+
+def _scalarType(annotation) -> type:
+    """
+    Python type of a record field, or of each channel of a list field.
+    """
+    while get_args(annotation):
+        # Optional[x] and List[x]
+        annotation = next(a for a in get_args(annotation) if a is not type(None))
+
+    # channels are measurements, which local conversion can turn into floats
+    return annotation if annotation in (datetime, str, bool) else float
+
+
+def _columns(records: List[Any]) -> Tuple[Dict[str, list], Dict[str, type]]:
+    """
+    Flattens a batch of records into columns. Timestamps become epoch
+    seconds and every channel of a list field gets its own column, such
+    as Real_0, Real_1.
+
+    return : Tuple[Dict[str, list], Dict[str, type]] - the columns, and the python type of each
+    """
+    columns = {}
+    types = {}
+    for f in fields(records[0]):
+        values = [getattr(r, f.name) for r in records]
+        name = f.name.lstrip('_')
+        kind = _scalarType(f.type)
+        if f.name == 'Timestamp':
+            columns[name] = [None if v is None else int(v.timestamp()) for v in values]
+            types[name] = datetime
+        elif any(isinstance(v, list) for v in values):
+            width = max(len(v) for v in values if v is not None)
+            for channel in range(width):
+                columns[f"{name}_{channel}"] = [
+                    v[channel] if v is not None and channel < len(v) else None for v in values]
+                types[f"{name}_{channel}"] = kind
+        else:
+            columns[name] = values
+            # Duration is the only integer field
+            types[name] = int if f.name == 'Duration' else kind
+
+    return columns, types
+
+
+@dataclass
+class ExportResult:
+    Rows: int = 0
+    Files: List[str] = field(default_factory=list)
+    # device id to the error that stopped its export
+    Errors: Dict[str, Exception] = field(default_factory=dict)
+
+
+class PartitionWriter:
+    """
+    Writes batches of records to one file per device and date, under
+    <root>/<data>/device=<id>/date=<yyyy-mm-dd>/. Records arrive in time
+    order, so each device keeps only its current partition open and
+    memory holds no more than the batch being written.
+
+    Subclasses implement _open, _append and _close for a file format.
+    """
+    EXTENSION = None
+
+    def __init__(self, root: str, timezone: str = None):
+        """
+        root : str - directory the partitions are written under
+        timezone : str - IANA timezone the partition dates follow, defaults to UTC
+        """
+        self.root = root
+        self.timezone = ZoneInfo(timezone) if timezone else dtTimezone.utc
+        self.Files: List[str] = []
+        self.Rows = 0
+
+        # device id to (partition, column names, path, handle) of its open file
+        self._handles: Dict[str, Tuple] = {}
+        self._paths = set()
+
+    def _date(self, ts: Optional[int]) -> str:
+        if ts is None:
+            return "unknown"
+
+        return datetime.fromtimestamp(ts, self.timezone).date().isoformat()
+
+    def _path(self, data: str, deviceId: str, date: str) -> str:
+        directory = os.path.join(self.root, data, f"device={deviceId}", f"date={date}")
+        os.makedirs(directory, exist_ok=True)
+
+        # a partition reopened in the same export, such as after a channel change, gets a new part
+        part = 0
+        path = os.path.join(directory, f"part-{part}.{self.EXTENSION}")
+        while path in self._paths:
+            part += 1
+            path = os.path.join(directory, f"part-{part}.{self.EXTENSION}")
+
+        self._paths.add(path)
+        return path
+
+    def write(self, data: str, deviceId: str, records: List[Any]):
+        """
+        Appends a batch of records, split across the partitions it spans.
+        """
+        if not records:
+            return
+
+        columns, types = _columns(records)
+        dates = [self._date(ts) for ts in columns['Timestamp']]
+
+        start = 0
+        for end in range(1, len(dates) + 1):
+            if end < len(dates) and dates[end] == dates[start]:
+                continue
+
+            chunk = {name: values[start:end] for name, values in columns.items()}
+            self._writeChunk(data, deviceId, dates[start], chunk, types)
+            start = end
+
+        self.Rows += len(records)
+
+    def _writeChunk(self, data: str, deviceId: str, date: str, columns: Dict[str, list], types: Dict[str, type]):
+        names = tuple(columns)
+        current = self._handles.get(deviceId)
+        if current is not None and current[:2] != ((data, date), names):
+            self.closeDevice(deviceId)
+            current = None
+
+        if current is None:
+            path = self._path(data, deviceId, date)
+            current = ((data, date), names, path, self._open(path, types))
+            self._handles[deviceId] = current
+            self.Files.append(path)
+
+        self._append(current[3], columns)
+
+    def closeDevice(self, deviceId: str):
+        """
+        Closes the open partition of a device once all its data is written.
+        """
+        current = self._handles.pop(deviceId, None)
+        if current is not None:
+            self._close(current[3])
+
+    def close(self):
+        for deviceId in list(self._handles):
+            self.closeDevice(deviceId)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _open(self, path: str, types: Dict[str, type]) -> Any:
+        """
+        types : Dict[str, type] - python type of each column, in column order
+        """
+        raise NotImplementedError
+
+    def _append(self, handle: Any, columns: Dict[str, list]):
+        raise NotImplementedError
+
+    def _close(self, handle: Any):
+        raise NotImplementedError
+
+
+class CsvWriter(PartitionWriter):
+    """
+    CSV partitions with a header row, timestamps in ISO 8601 UTC.
+    """
+    EXTENSION = "csv"
+
+    def _open(self, path: str, types: Dict[str, type]) -> Any:
+        file = open(path, "w", newline="")
+        writer = csv.writer(file)
+        writer.writerow(types.keys())
+        return (file, writer)
+
+    def _append(self, handle: Any, columns: Dict[str, list]):
+        timestamps = [None if ts is None else datetime.fromtimestamp(ts, dtTimezone.utc).isoformat()
+            for ts in columns['Timestamp']]
+        values = [timestamps if name == 'Timestamp' else column for name, column in columns.items()]
+        handle[1].writerows(zip(*values))
+
+    def _close(self, handle: Any):
+        handle[0].close()
+
+
+def _schema(types: Dict[str, type]) -> "pa.Schema":
+    # from the record fields rather than the values, which may all be None in a batch
+    arrowTypes = {
+        datetime: pa.timestamp('s', tz='UTC'),
+        int: pa.int64(),
+        float: pa.float64(),
+        str: pa.string(),
+        bool: pa.bool_(),
+    }
+    return pa.schema([(name, arrowTypes[kind]) for name, kind in types.items()])
+
+
+def _recordBatch(columns: Dict[str, list], schema: "pa.Schema") -> "pa.RecordBatch":
+    return pa.RecordBatch.from_pydict(columns, schema=schema)
+
+
+class ParquetWriter(PartitionWriter):
+    """
+    Parquet partitions, each batch written as a row group. Requires pyarrow.
+    """
+    EXTENSION = "parquet"
+
+    def __init__(self, root: str, timezone: str = None, compression: str = "zstd"):
+        """
+        compression : str - parquet codec, such as zstd, snappy or none
+        """
+        _requirePyarrow("ParquetWriter")
+        super().__init__(root, timezone)
+        self.compression = compression
+
+    def _open(self, path: str, types: Dict[str, type]) -> Any:
+        schema = _schema(types)
+        return (pa.parquet.ParquetWriter(path, schema, compression=self.compression), schema)
+
+    def _append(self, handle: Any, columns: Dict[str, list]):
+        handle[0].write_batch(_recordBatch(columns, handle[1]))
+
+    def _close(self, handle: Any):
+        handle[0].close()
+
+
+class ArrowWriter(PartitionWriter):
+    """
+    Arrow IPC file partitions, each batch written as a record batch. Requires pyarrow.
+    """
+    EXTENSION = "arrow"
+
+    def __init__(self, root: str, timezone: str = None):
+        _requirePyarrow("ArrowWriter")
+        super().__init__(root, timezone)
+
+    def _open(self, path: str, types: Dict[str, type]) -> Any:
+        schema = _schema(types)
+        sink = pa.OSFile(path, "wb")
+        return (sink, pa.ipc.new_file(sink, schema), schema)
+
+    def _append(self, handle: Any, columns: Dict[str, list]):
+        handle[1].write_batch(_recordBatch(columns, handle[2]))
+
+    def _close(self, handle: Any):
+        handle[1].close()
+        handle[0].close()
+
+
+def Export(
+        client: Client,
+        data: str,
+        deviceIds: List[Union[str, Device]],
+        writer: PartitionWriter,
+        fromTs: Union[int, datetime] = None,
+        toTs: Union[int, datetime] = None,
+        maxWorkers: int = None,
+        queueSize: int = 8,
+        **kwargs) -> ExportResult:
+    """
+    Streams the data of each device to the writer one query window at a
+    time. Windows are fetched on the calling thread and written on
+    another, so writing overlaps fetching, and at most queueSize windows
+    wait to be written, keeping memory bounded however long the range.
+    A device that fails is logged and skipped, its partial data kept.
+
+    data : str - short-energy, long-energy or modbus
+    deviceIds : List[str, Device] - devices to export, one after another
+    writer : PartitionWriter - CsvWriter, ParquetWriter or ArrowWriter, closed when done
+    maxWorkers : int - query windows of a device to fetch in parallel
+    queueSize : int - fetched windows that may wait for the writer
+    kwargs - passed to the client generator, such as granularity or convert
+
+    return : ExportResult - rows and files written, and the error of any device that failed
+    """
+    if data not in EXPORTS:
+        raise ValueError(f"cannot export {data}, only {', '.join(EXPORTS)}")
+
+    fetch = getattr(client, EXPORTS[data])
+    pending = queue.Queue(maxsize=queueSize)
+    writeErrors = []
+
+    def write():
+        while True:
+            item = pending.get()
+            if item is None:
+                return
+            # after a write error the queue is still drained so the fetching thread never blocks
+            if writeErrors:
+                continue
+
+            try:
+                deviceId, batch = item
+                if batch is _DEVICE_DONE:
+                    writer.closeDevice(deviceId)
+                else:
+                    writer.write(data, deviceId, batch)
+            except Exception as e:
+                writeErrors.append(e)
+
+    thread = threading.Thread(target=write, name="wattwatchers-export", daemon=True)
+    thread.start()
+
+    result = ExportResult()
+    try:
+        for device in deviceIds:
+            deviceId = device.Id if isinstance(device, Device) else device
+            try:
+                for batch in fetch(deviceId, fromTs=fromTs, toTs=toTs,
+                        maxWorkers=maxWorkers, batches=True, **kwargs):
+                    pending.put((deviceId, batch))
+                    if writeErrors:
+                        break
+            except Exception as e:
+                logger.warning(f"{deviceId} failed to export: {e}")
+                result.Errors[deviceId] = e
+            pending.put((deviceId, _DEVICE_DONE))
+
+            if writeErrors:
+                break
+    finally:
+        pending.put(None)
+        thread.join()
+        writer.close()
+
+    if writeErrors:
+        raise writeErrors[0]
+
+    result.Rows = writer.Rows
+    result.Files = list(writer.Files)
+    return result
@@ -0,0 +1,202 @@
+import threading
+from bisect import bisect_left
+from typing import Dict, List, Tuple
+from urllib.parse import urlparse
+
+__all__ = [
+    "MetricsSink",
+    "Metrics",
+    "EndpointLabel"
+]
+
+# seconds, from a cached window to a slow long range request
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# endpoints whose second path segment is a device id
+_DEVICE_ROUTES = ("short-energy", "long-energy", "modbus")
+
+
+def EndpointLabel(url: str) -> str:
+    """
+    Reduces a request url to its endpoint, without the device id, so
+    metrics of every device are aggregated together.
+
+    e.g. https://api-v3.wattwatchers.com.au/long-energy/D123/latest -> long-energy/latest
+    """
+    parts = [p for p in urlparse(url).path.split('/') if p]
+    if not parts:
+        return '/'
+    if parts[0] in _DEVICE_ROUTES:
+        return '/'.join([parts[0], *parts[2:]])
+    if parts[0] == 'devices' and len(parts) > 1 and parts[1] not in ('channel-categories', 'models'):
+        return 'device'
+
+    return '/'.join(parts)
+
+
+def _number(value: float) -> str:
+    """
+    Formats a sample value at full precision, large counters included.
+    """
+    if isinstance(value, int):
+        return str(value)
+
+    value = float(value)
+    if value != value:
+        return 'NaN'
+    if value in (float('inf'), float('-inf')):
+        return '+Inf' if value > 0 else '-Inf'
+
+    return repr(value)
+
+
+class MetricsSink:
+    """
+    Receives the measurements of a client. The base sink discards
+    them, subclass it to forward them to another metrics library.
+
+    Names are Prometheus style, counters end in _total and durations
+    are in seconds, labels are passed as keyword arguments.
+    """
+
+    def increment(self, name: str, value: float = 1, **labels):
+        pass
+
+    def observe(self, name: str, value: float, **labels):
+        """
+        Adds a sample to a histogram.
+        """
+        pass
+
+    def gauge(self, name: str, value: float, **labels):
+        pass
+
+
+class Metrics(MetricsSink):
+    """
+    Thread safe in-memory sink, exported in the Prometheus text
+    exposition format with prometheus().
+
+    Client metrics, labelled by endpoint:
+        request_seconds - histogram of each attempt, labelled by status
+        response_bytes_total - response body bytes received on the wire, before decompression
+        retries_total - retries, labelled by reason
+        throttled_total - 429 responses
+        backoff_seconds_total - time slept between retries
+        ratelimit_wait_seconds_total - time the rate limiter held requests back
+        decode_seconds - histogram of response decoding
+        rows_total - records decoded
+        ratelimit_remaining - requests left this second and day, labelled by period
+    """
+
+    def __init__(self, prefix: str = 'wattwatchers_', buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.prefix = prefix
+        self.buckets = tuple(sorted(buckets))
+
+        self._counters: Dict[Tuple[str, Tuple], float] = {}
+        self._gauges: Dict[Tuple[str, Tuple], float] = {}
+        # bucket counts, sum and count of each histogram
+        self._histograms: Dict[Tuple[str, Tuple], List] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(name: str, labels: Dict[str, str]) -> Tuple[str, Tuple]:
+        return (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+
+    def increment(self, name: str, value: float = 1, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [[0] * len(self.buckets), 0.0, 0]
+            index = bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                histogram[0][index] += 1
+            histogram[1] += value
+            histogram[2] += 1
+
+    def gauge(self, name: str, value: float, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self._gauges[key] = value
+
+    def value(self, name: str, **labels) -> float:
+        """
+        return : float - a counter or gauge, or the sum of a histogram, 0 when never recorded
+        """
+        key = self._key(name, labels)
+        with self._lock:
+            if key in self._counters:
+                return self._counters[key]
+            if key in self._gauges:
+                return self._gauges[key]
+            if key in self._histograms:
+                return self._histograms[key][1]
+
+        return 0
+
+    def total(self, name: str) -> float:
+        """
+        return : float - a counter or histogram sum added up across every label
+        """
+        with self._lock:
+            return sum(v for (n, _), v in self._counters.items() if n == name) + \
+                sum(h[1] for (n, _), h in self._histograms.items() if n == name)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+
+    @staticmethod
+    def _labels(labels: Tuple, extra: Tuple = ()) -> str:
+        pairs = [*labels, *extra]
+        if not pairs:
+            return ''
+        escape = lambda v: v.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        return '{' + ','.join(f'{k}="{escape(v)}"' for k, v in pairs) + '}'
+
+    def prometheus(self) -> str:
+        """
+        return : str - every metric in the Prometheus text exposition format
+        """
+        with self._lock:
+            counters = sorted(self._counters.items())
+            gauges = sorted(self._gauges.items())
+            histograms = sorted((k, (list(h[0]), h[1], h[2])) for k, h in self._histograms.items())
+
+        lines = []
+        typed = set()
+        def header(name: str, kind: str):
+            if name not in typed:
+                typed.add(name)
+                lines.append(f'# TYPE {name} {kind}')
+
+        for (name, labels), value in counters:
+            name = self.prefix + name
+            header(name, 'counter')
+            lines.append(f'{name}{self._labels(labels)} {_number(value)}')
+
+        for (name, labels), value in gauges:
+            name = self.prefix + name
+            header(name, 'gauge')
+            lines.append(f'{name}{self._labels(labels)} {_number(value)}')
+
+        for (name, labels), (counts, total, count) in histograms:
+            name = self.prefix + name
+            header(name, 'histogram')
+            cumulative = 0
+            for bound, bucketCount in zip(self.buckets, counts):
+                cumulative += bucketCount
+                lines.append(f'{name}_bucket{self._labels(labels, (("le", f"{bound:g}"),))} {cumulative}')
+            lines.append(f'{name}_bucket{self._labels(labels, (("le", "+Inf"),))} {count}')
+            lines.append(f'{name}_sum{self._labels(labels)} {_number(total)}')
+            lines.append(f'{name}_count{self._labels(labels)} {count}')
+
+        return '\n'.join(lines) + '\n'
@@ -1,10 +1,11 @@
-from dataclasses import dataclass, field, InitVar, fields
+from dataclasses import field, InitVar, fields
 import marshmallow
 import inspect
 from marshmallow_dataclass import class_schema
 from typing import Optional, List, Dict, Union, Tuple, Any
 from .enums import Energy
-from .utilities import SignalQuality
+from .utilities import SignalQuality, JsonLoads, Slotted
+from .profiling import Stage
 from datetime import datetime
 
 class TimeStamp(marshmallow.fields.DateTime):
@@ -28,6 +29,10 @@ class BaseSchema(marshmallow.Schema):
     
     @marshmallow.pre_load
     def pre_load(self, data, **kwargs):
+        with Stage("pre_load"):
+            return self._preLoad(data)
+
+    def _preLoad(self, data):
         if 'client' in self.context:
             data['_client'] = self.context['client']
 
@@ -49,12 +54,53 @@ class BaseSchema(marshmallow.Schema):
         
         return data
 
+    def loads(self, json_data, *, many=None, partial=None, unknown=None, **kwargs):
+        # parse with the configured json backend instead of the render module,
+        # unless there are parser options that only the render module takes
+        with Stage("json"):
+            if kwargs:
+                data = self.opts.render_module.loads(json_data, **kwargs)
+            else:
+                data = JsonLoads(json_data)
+        with Stage("construction"):
+            return self.load(data, many=many, partial=partial, unknown=unknown)
+
     def on_bind_field(self, field_name, field_obj):
         name = field_obj.data_key or field_name
         field_obj.data_key = name[0].lower() + name[1:]
 
 
-@dataclass
+class DirtyTracking:
+    """
+    Records assignments to public fields in _dirtyFields once the
+    instance has been initialised, so changes can be sent with
+    Device.update. Reads are plain slot lookups and pay nothing.
+
+    Fields can also be set by their api name, e.g. label for Label.
+    """
+    __slots__ = ('_dirtyFields',)
+
+    def __setattr__(self, name, value):
+        fieldNames = type(self).__dataclass_fields__
+        if name not in fieldNames and name[:1].upper() + name[1:] in fieldNames:
+            name = name[:1].upper() + name[1:]
+
+        # set first, so a name that is not a field is never sent as a change
+        object.__setattr__(self, name, value)
+        if '_' not in name and name != 'Id' and hasattr(self, '_dirtyFields'):
+            self._dirtyFields[name] = value
+
+
+class LazyLoading(DirtyTracking):
+    """
+    A partial instance leaves its public fields unset, so only the
+    first read of one misses the slot and falls through to __getattr__
+    to load the full record. Every other read is a plain slot lookup.
+    """
+    __slots__ = ('_isPartial',)
+
+
+@Slotted
 class RateLimits:
     TotalPerDay: int = field(metadata=dict(data_key='X-RateLimit-TpdLimit'), default=None)
     RemainingPerDay: int = field(metadata=dict(data_key='X-RateLimit-TpdRemaining'), default=None)
@@ -70,7 +116,7 @@ class RateLimits:
 RateLimitsSchema = class_schema(RateLimits)
 
 
-@dataclass
+@Slotted
 class ChannelCategory:
     Id: int
     Label: str
@@ -82,7 +128,7 @@ class ChannelCategory:
 ChannelCategorySchema = class_schema(ChannelCategory, base_schema=BaseSchema)
 
 
-@dataclass
+@Slotted
 class DeviceModel:
     Code: str = None
     DisplayName: str = None
@@ -96,14 +142,14 @@ class DeviceModel:
 DeviceModelSchema = class_schema(DeviceModel, base_schema=BaseSchema)
 
 
-@dataclass
+@Slotted
 class DevicePending:
     ShortEnergyReportingInterval: int = None
     CtRating: int = None
     State: str = None
 
 
-@dataclass
+@Slotted
 class DeviceComms:
     Type: str = None
     LastHeardAt: datetime = None
@@ -130,8 +176,8 @@ class DeviceComms:
 DeviceCommsSchema = class_schema(DeviceComms, base_schema=BaseSchema)
 
 
-@dataclass
-class ChannelAttribute:
+@Slotted
+class ChannelAttribute(DirtyTracking):
     Id: str = None
     CtRating: int = None
     Label: str = None
@@ -142,19 +188,13 @@ class ChannelAttribute:
     def __post_init__(self):
         self._dirtyFields = {}
 
-    def __setattr__(self, name, value):
-        if '_' not in name and name != 'Id' and hasattr(self, '_dirtyFields'):
-            object.__getattribute__(self, '_dirtyFields')[name] = value
-            
-        object.__setattr__(self, name, value)
-
     class Meta:
         unknown = marshmallow.EXCLUDE
 
 ChannelAttributeSchema = class_schema(ChannelAttribute, base_schema=BaseSchema)
 
 
-@dataclass
+@Slotted
 class ChannelGrouping:
     Included: List[str] = field(default_factory=list)
 
@@ -164,28 +204,22 @@ class ChannelGrouping:
 ChannelGroupingSchema = class_schema(ChannelGrouping, base_schema=BaseSchema)
 
 
-@dataclass
-class PhaseConfiguration:
+@Slotted
+class PhaseConfiguration(DirtyTracking):
     Count: int = None
     Grouping: List[ChannelGrouping] = field(default_factory=list)
     
     def __post_init__(self):
         self._dirtyFields = {}
 
-    def __setattr__(self, name, value):
-        if '_' not in name and name != 'Id' and hasattr(self, '_dirtyFields'):
-            object.__getattribute__(self, '_dirtyFields')[name] = value
-            
-        object.__setattr__(self, name, value)
-
     class Meta:
         unknown = marshmallow.EXCLUDE
 
 PhaseConfigurationSchema = class_schema(PhaseConfiguration, base_schema=BaseSchema)
 
 
-@dataclass
-class SwitchAttribute:
+@Slotted
+class SwitchAttribute(DirtyTracking):
     Id: str = None
     State: str = None
     Label: str = None
@@ -197,19 +231,13 @@ class SwitchAttribute:
     def __post_init__(self):
         self._dirtyFields = {}
 
-    def __setattr__(self, name, value):
-        if '_' not in name and name != 'Id' and hasattr(self, '_dirtyFields'):
-            object.__getattribute__(self, '_dirtyFields')[name] = value
-            
-        object.__setattr__(self, name, value)
-
     class Meta:
         unknown = marshmallow.EXCLUDE
 
 SwitchAttributeSchema = class_schema(SwitchAttribute, base_schema=BaseSchema)
 
 
-@dataclass
+@Slotted
 class ShortData:
     Timestamp: datetime = None
     Duration: int = None
@@ -227,7 +255,7 @@ class ShortData:
 ShortDataSchema = class_schema(ShortData, base_schema=BaseSchema)
 
 
-@dataclass
+@Slotted
 class LongData:
     Timestamp: datetime = None
     Duration: int = None
@@ -249,7 +277,7 @@ class LongData:
 LongDataSchema = class_schema(LongData, base_schema=BaseSchema)
 
 
-@dataclass
+@Slotted
 class ModbusData:
     _Ia: float = None
     _Ib: float = None
@@ -282,8 +310,38 @@ class ModbusData:
 ModbusDataSchema = class_schema(ModbusData, base_schema=BaseSchema)
 
 
-@dataclass
-class Device:
+@Slotted
+class FleetResult:
+    """
+    Results of a fleet wide query, keyed by device id. Devices that
+    failed are listed in Errors with the exception that stopped them.
+    """
+    Data: Dict[str, List[Any]] = field(default_factory=dict)
+    Errors: Dict[str, Exception] = field(default_factory=dict)
+
+    def __getitem__(self, deviceId: str) -> List[Any]:
+        return self.Data[deviceId]
+
+    def __iter__(self):
+        return iter(self.Data.items())
+
+    def __len__(self):
+        return len(self.Data)
+
+
+@Slotted
+class PoolStats:
+    """
+    Connection pool usage of a client.
+    """
+    Requests: int = 0
+    Hits: int = 0
+    Misses: int = 0
+    IdleConnections: int = 0
+
+
+@Slotted
+class Device(LazyLoading):
     Id: str
     Label: str = None
     Timezone: str = None
@@ -299,11 +357,13 @@ class Device:
 
     _client: Optional[Any] = None
 
-    _dirtyFields = {}
-    _isPartial = False
-
     def __post_init__(self, *args, **kwargs):
-        self._isPartial = self.Model == None
+        self._isPartial = self.Model is None and self._client is not None
+        if self._isPartial:
+            for name in _DEVICE_FIELDS:
+                object.__delattr__(self, name)
+
+        self._dirtyFields = {}
 
     def update(self):
         if self.Phases._dirtyFields != {}:
@@ -330,7 +390,20 @@ class Device:
             schema = SwitchAttributeSchema()
             self._dirtyFields['switches'] = [schema.dump(s) for s in dirtySwitches]
 
-        self._client.updateDevice(self.Id, self._dirtyFields)
+        result = self._client.updateDevice(self.Id, self._dirtyFields)
+        if inspect.isawaitable(result):
+            # AsyncClient returns a coroutine, keep the changes until it succeeds
+            return self._awaitUpdate(result, dirtyChannels, dirtySwitches)
+
+        self._clearDirty(dirtyChannels, dirtySwitches)
+        return result
+
+    async def _awaitUpdate(self, result, dirtyChannels, dirtySwitches):
+        result = await result
+        self._clearDirty(dirtyChannels, dirtySwitches)
+        return result
+
+    def _clearDirty(self, dirtyChannels, dirtySwitches):
         if 'phases' in self._dirtyFields:
             self.Phases._dirtyFields = {}
         
@@ -338,28 +411,30 @@ class Device:
             c._dirtyFields = {}
         
         for s in dirtySwitches:
-            c._dirtyFields = {}
+            s._dirtyFields = {}
 
         self._dirtyFields = {}
 
-    def __setattr__(self, name, value):
-        if '_' not in name and name != 'Id':
-            object.__getattribute__(self, '_dirtyFields')[name] = value
-            
-        object.__setattr__(self, name, value)
+    def _hydrate(self, device: "Device"):
+        """
+        Fills a partial device from a full device record, without marking
+        any fields as dirty or triggering another lazy load.
+        """
+        for dname in _DEVICE_FIELDS:
+            object.__setattr__(self, dname, getattr(device, dname))
 
-    def __getattribute__(self, name):
+        self._isPartial = False
+        self._dirtyFields = {}
 
-        if name != 'Id' and '_' not in name and object.__getattribute__(self, '_isPartial'):
-            device = self._client.device(self.Id)
-            members = fields(Device)
-            for dname in [n.name for n in members if '_' not in n.name]:
-                setattr(self, dname, getattr(device, dname))
+    def __getattr__(self, name):
+        # only reached when a slot is unset, i.e. the first read of a partial device
+        if '_' not in name and self._isPartial:
+            if inspect.iscoroutinefunction(self._client.device):
+                raise AttributeError(f"{name} of {self.Id} is not loaded, await hydrate() on the AsyncClient first")
+            self._hydrate(self._client.device(self.Id))
+            return object.__getattribute__(self, name)
 
-            self._isPartial = False
-            self._dirtyFields = {}
-        
-        return object.__getattribute__(self, name)
+        raise AttributeError(name)
 
     def __str__(self):
         return '<Device(Id:{device_id})>'.format(device_id=self.Id)
@@ -370,4 +445,7 @@ class Device:
     class Meta:
         unknown = marshmallow.EXCLUDE
 
-DeviceSchema = class_schema(Device, base_schema=BaseSchema)
\ No newline at end of file
+DeviceSchema = class_schema(Device, base_schema=BaseSchema)
+
+# public fields filled in when a partial device is loaded
+_DEVICE_FIELDS = tuple(f.name for f in fields(Device) if '_' not in f.name and f.name != 'Id')
@@ -0,0 +1,126 @@
+import threading
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Optional, Dict, Tuple
+from urllib.parse import urlencode
+
+__all__ = [
+    "WindowPlanner",
+    "WindowStats"
+]
+
+
+@dataclass
+class WindowStats:
+    """
+    Smoothed cost of one second of queried range for a device endpoint.
+    """
+    BytesPerSecond: float = 0.0
+    LatencyPerSecond: float = 0.0
+    Samples: int = 0
+    TimeoutPeriod: Optional[timedelta] = None
+
+
+class WindowPlanner:
+    """
+    Sizes query windows from the response size and latency observed
+    for each device and endpoint.
+
+    Windows start at the api maximum, which is a hard ceiling, and are
+    halved until a window is expected to stay under targetBytes and
+    targetLatency, so dense or slow devices are split into smaller
+    requests that do not time out while sparse devices keep the fewest
+    round trips. Sizes are always the api maximum divided by a power of
+    two, so windows of the same size line up between calls.
+    """
+
+    def __init__(self,
+            targetBytes: int = 4 * 1024 * 1024,
+            targetLatency: float = 10.0,
+            minPeriod: timedelta = timedelta(minutes=30),
+            smoothing: float = 0.3):
+        """
+        targetBytes : int - largest response body a window should return
+        targetLatency : float - seconds a window request should take
+        minPeriod : timedelta - smallest window the planner will shrink to
+        smoothing : float - weight of each new sample in the moving averages
+        """
+        self.targetBytes = targetBytes
+        self.targetLatency = targetLatency
+        self.minPeriod = minPeriod
+        self.smoothing = smoothing
+
+        self._stats: Dict[Tuple[str, str], WindowStats] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(url: str, params: Dict[str, str]) -> Tuple[str, str]:
+        # the timezone does not change the size of a response
+        return (url, urlencode(sorted((k, str(v)) for k, v in params.items()
+            if v is not None and k != 'timezone')))
+
+    def stats(self, url: str, params: Dict[str, str]) -> Optional[WindowStats]:
+        with self._lock:
+            return self._stats.get(self._key(url, params))
+
+    def period(self, url: str, params: Dict[str, str], maxQueryPeriod: timedelta) -> timedelta:
+        """
+        return : timedelta - window to request next, never more than maxQueryPeriod
+        """
+        stats = self.stats(url, params)
+        if stats is None:
+            return maxQueryPeriod
+
+        seconds = maxQueryPeriod.total_seconds()
+        if stats.BytesPerSecond > 0:
+            seconds = min(seconds, self.targetBytes / stats.BytesPerSecond)
+        if stats.LatencyPerSecond > 0:
+            seconds = min(seconds, self.targetLatency / stats.LatencyPerSecond)
+        if stats.TimeoutPeriod is not None:
+            seconds = min(seconds, stats.TimeoutPeriod.total_seconds() / 2)
+
+        period = maxQueryPeriod
+        while period.total_seconds() > seconds and period / 2 >= self.minPeriod:
+            period /= 2
+
+        return period
+
+    def record(self, url: str, params: Dict[str, str], period: timedelta, size: int, latency: float):
+        """
+        Adds the size in bytes and latency in seconds of a window response.
+        """
+        seconds = period.total_seconds()
+        if seconds <= 0:
+            return
+
+        bytesPerSecond = size / seconds
+        latencyPerSecond = latency / seconds
+        with self._lock:
+            stats = self._stats.setdefault(self._key(url, params), WindowStats())
+            if stats.Samples == 0:
+                stats.BytesPerSecond = bytesPerSecond
+                stats.LatencyPerSecond = latencyPerSecond
+            else:
+                stats.BytesPerSecond += self.smoothing * (bytesPerSecond - stats.BytesPerSecond)
+                stats.LatencyPerSecond += self.smoothing * (latencyPerSecond - stats.LatencyPerSecond)
+            stats.Samples += 1
+
+    def timeout(self, url: str, params: Dict[str, str], period: timedelta):
+        """
+        Records a window that timed out, so later windows are at most half its size.
+        """
+        with self._lock:
+            stats = self._stats.setdefault(self._key(url, params), WindowStats())
+            if stats.TimeoutPeriod is None or period < stats.TimeoutPeriod:
+                stats.TimeoutPeriod = period
+
+    def reset(self, url: str = None):
+        """
+        Forgets what was learnt, for one url or every url.
+        """
+        with self._lock:
+            if url is None:
+                self._stats.clear()
+            else:
+                for key in [k for k in self._stats if k[0] == url]:
+                    del self._stats[key]
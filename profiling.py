@@ -0,0 +1,242 @@
+import threading
+import tracemalloc
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import wraps
+from time import perf_counter
+from typing import Callable, Deque, Dict, Optional
+from . import logger
+from .utilities import Slotted
+
+__all__ = [
+    "Profiler",
+    "CallProfile",
+    "StageSummary",
+    "StageStats",
+    "Stage",
+    "profiled"
+]
+
+# stages in the order a fetch passes through them
+STAGES = ("planning", "wait", "http", "json", "pre_load", "construction", "conversion")
+
+
+@Slotted
+class StageStats:
+    Seconds: float = 0.0
+    # net bytes allocated and still held when the stage ended
+    Allocated: int = 0
+    Calls: int = 0
+
+
+@Slotted
+class StageSummary:
+    """
+    A stage of one method summed over every profiled call of it.
+    """
+    Count: int = 0
+    Seconds: float = 0.0
+    MaxSeconds: float = 0.0
+    Allocated: int = 0
+
+    def add(self, seconds: float, allocated: int):
+        self.Count += 1
+        self.Seconds += seconds
+        self.MaxSeconds = max(self.MaxSeconds, seconds)
+        self.Allocated += allocated
+
+
+@dataclass
+class CallProfile:
+    """
+    Time and allocations of one client call, split by stage. Stage
+    times exclude nested stages, and are summed across worker threads
+    so they can add up to more than the wall time of a parallel fetch.
+    """
+    Method: str
+    Wall: float = 0.0
+    # peak traced memory during the call, None without tracemalloc
+    Peak: Optional[int] = None
+    Stages: Dict[str, StageStats] = field(default_factory=dict)
+
+    def __str__(self) -> str:
+        lines = [f"{self.Method} {self.Wall * 1000:.1f} ms" +
+            (f", peak {self.Peak / 1024:.0f} KiB" if self.Peak is not None else "")]
+        names = [s for s in STAGES if s in self.Stages] + [s for s in self.Stages if s not in STAGES]
+        for name in names:
+            stats = self.Stages[name]
+            lines.append(f"  {name:<14}{stats.Seconds * 1000:>10.1f} ms{stats.Allocated / 1024:>10.0f} KiB{stats.Calls:>8} calls")
+
+        return "\n".join(lines)
+
+
+class _Call:
+    """
+    Collects the stages of a call from every thread working on it.
+    """
+
+    def __init__(self, method: str, tracing: bool):
+        self.profile = CallProfile(method)
+        self.tracing = tracing
+        self.lock = threading.Lock()
+        # open stages of each thread, for exclusive times
+        self.local = threading.local()
+
+    def add(self, name: str, seconds: float, allocated: int):
+        with self.lock:
+            stats = self.profile.Stages.get(name)
+            if stats is None:
+                stats = self.profile.Stages[name] = StageStats()
+            stats.Seconds += seconds
+            stats.Allocated += allocated
+            stats.Calls += 1
+
+
+# the call being profiled, copied into worker threads with the context
+_CALL: ContextVar[Optional[_Call]] = ContextVar("wattwatchersProfile", default=None)
+
+
+class _NoStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+_NO_STAGE = _NoStage()
+
+
+class _Stage:
+    __slots__ = ('call', 'name', 'frame')
+
+    def __init__(self, call: _Call, name: str):
+        self.call = call
+        self.name = name
+
+    def __enter__(self):
+        stack = getattr(self.call.local, 'stack', None)
+        if stack is None:
+            stack = self.call.local.stack = []
+        memory = tracemalloc.get_traced_memory()[0] if self.call.tracing else 0
+        # start, memory at start, time and memory of nested stages
+        self.frame = [perf_counter(), memory, 0.0, 0]
+        stack.append(self.frame)
+        return self
+
+    def __exit__(self, *args):
+        elapsed = perf_counter() - self.frame[0]
+        allocated = tracemalloc.get_traced_memory()[0] - self.frame[1] if self.call.tracing else 0
+
+        stack = self.call.local.stack
+        stack.pop()
+        if stack:
+            stack[-1][2] += elapsed
+            stack[-1][3] += allocated
+
+        self.call.add(self.name, elapsed - self.frame[2], allocated - self.frame[3])
+        return False
+
+
+def Stage(name: str):
+    """
+    Context manager timing a stage of the call being profiled, does
+    nothing outside a profiled call.
+    """
+    call = _CALL.get()
+    if call is None:
+        return _NO_STAGE
+
+    return _Stage(call, name)
+
+
+def profiled(method: Callable) -> Callable:
+    """
+    Decorates a Client method so each call is profiled while the client
+    has an active profiler. Calls made by another profiled call, such as
+    device() from devices(hydrate=True), are part of the outer call.
+    """
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        profiler = self.profiler
+        if profiler is None or _CALL.get() is not None:
+            return method(self, *args, **kwargs)
+
+        return profiler._run(method.__name__, lambda: method(self, *args, **kwargs))
+
+    return wrapper
+
+
+class Profiler:
+    """
+    Breaks each client call down into time and allocations spent on
+    window planning, rate limit and backoff waits, http, json parsing,
+    BaseSchema.pre_load, construction of the results and local unit
+    conversion. Allocations are traced with tracemalloc, which slows
+    decoding considerably, and are approximate while other threads
+    allocate.
+
+    Use through Client.profile(), a report is passed to output after
+    every call. The most recent reports are kept in Calls, and every
+    call is summed into Summary, by method then stage, with the wall
+    time of the calls under "wall", so memory stays flat however long
+    profiling runs.
+    """
+
+    def __init__(self,
+            output: Callable[[CallProfile], None] = None,
+            trackAllocations: bool = True,
+            keepCalls: Optional[int] = 100):
+        """
+        output : Callable[[CallProfile], None] - receives each report, logged at info level by default
+        trackAllocations : bool - trace allocations with tracemalloc
+        keepCalls : int - number of recent reports kept in Calls, None to keep all of them
+        """
+        self.output = output or (lambda profile: logger.info(f"profile {profile}"))
+        self.trackAllocations = trackAllocations
+        self.Calls: Deque[CallProfile] = deque(maxlen=keepCalls)
+        self.Summary: Dict[str, Dict[str, StageSummary]] = {}
+
+        self._startedTracing = False
+        self._lock = threading.Lock()
+
+    def start(self):
+        if self.trackAllocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._startedTracing = True
+
+    def stop(self):
+        if self._startedTracing:
+            tracemalloc.stop()
+            self._startedTracing = False
+
+    def _run(self, method: str, func: Callable):
+        tracing = tracemalloc.is_tracing()
+        call = _Call(method, tracing)
+        if tracing:
+            tracemalloc.reset_peak()
+            startMemory = tracemalloc.get_traced_memory()[0]
+
+        token = _CALL.set(call)
+        started = perf_counter()
+        try:
+            return func()
+        finally:
+            call.profile.Wall = perf_counter() - started
+            _CALL.reset(token)
+            if tracing:
+                call.profile.Peak = tracemalloc.get_traced_memory()[1] - startMemory
+
+            self.Calls.append(call.profile)
+            self._summarise(call.profile)
+            self.output(call.profile)
+
+    def _summarise(self, profile: CallProfile):
+        # calls finish on the threads that made them
+        with self._lock:
+            stages = self.Summary.setdefault(profile.Method, {})
+            stages.setdefault("wall", StageSummary()).add(profile.Wall, 0)
+            for name, stats in profile.Stages.items():
+                stages.setdefault(name, StageSummary()).add(stats.Seconds, stats.Allocated)
@@ -0,0 +1,147 @@
+import threading
+from time import monotonic, sleep
+from dataclasses import fields, replace
+from typing import Optional
+from .models import RateLimits
+
+__all__ = [
+    "RateLimiter"
+]
+
+
+class RateLimiter:
+    """
+    Client side token bucket that paces outgoing requests from the
+    X-RateLimit headers of each response, so requests wait locally
+    rather than being rejected with a 429.
+
+    The bucket holds TotalPerSecond tokens and refills at that rate.
+    Every response narrows the bucket to the RemainingPerSecond the
+    server reports, and an exhausted second blocks all callers until
+    TotalPerSecondResetCounter has elapsed. Safe to share between
+    threads, and between clients using the same api key.
+
+    RateLimits combines every response of the current rate limit
+    windows, the lowest remaining and the latest reset, since parallel
+    responses arrive out of order and the last one to arrive is not
+    necessarily the most recent count.
+    """
+
+    def __init__(self, perSecond: Optional[int] = None):
+        self.perSecond = perSecond
+        self.RateLimits: Optional[RateLimits] = None
+
+        self._lock = threading.Lock()
+        self._tokens = float(perSecond or 0)
+        self._updatedAt = monotonic()
+        self._blockedUntil = 0.0
+        # monotonic times the per second and per day windows of RateLimits reset
+        self._secondResetAt = 0.0
+        self._dayResetAt = 0.0
+
+    def _refill(self, now: float):
+        elapsed = now - self._updatedAt
+        self._updatedAt = now
+        if self.perSecond:
+            self._tokens = min(float(self.perSecond),
+                self._tokens + elapsed * self.perSecond)
+
+    def reserve(self) -> float:
+        """
+        Takes a token from the bucket.
+
+        return : float - seconds the caller must wait before sending
+        """
+        with self._lock:
+            now = monotonic()
+            blocked = max(0.0, self._blockedUntil - now)
+
+            # nothing to pace against until the first response arrives
+            if not self.perSecond:
+                return blocked
+
+            self._refill(now)
+            self._tokens -= 1
+            wait = -self._tokens / self.perSecond if self._tokens < 0 else 0.0
+
+            return max(wait, blocked)
+
+    def acquire(self):
+        """
+        Blocks the calling thread until a request may be sent.
+        """
+        delay = self.reserve()
+        if delay > 0:
+            sleep(delay)
+
+    def block(self, seconds: float):
+        """
+        Holds every request for the given time, such as after a 429.
+        """
+        with self._lock:
+            self._blockedUntil = max(self._blockedUntil, monotonic() + seconds)
+
+    def update(self, rateLimits: RateLimits):
+        """
+        Synchronises the bucket with the rate limits of a response.
+        """
+        if rateLimits is None:
+            return
+
+        with self._lock:
+            now = monotonic()
+            self.RateLimits = self._combine(now, rateLimits)
+
+            if rateLimits.TotalPerSecond:
+                if not self.perSecond:
+                    self._tokens = float(rateLimits.TotalPerSecond)
+                self.perSecond = rateLimits.TotalPerSecond
+
+            self._refill(now)
+
+            remaining = rateLimits.RemainingPerSecond
+            if remaining is not None:
+                self._tokens = min(self._tokens, float(remaining))
+
+                if remaining <= 0 and rateLimits.TotalPerSecondResetCounter is not None:
+                    self._blockedUntil = max(self._blockedUntil,
+                        now + rateLimits.TotalPerSecondResetCounter)
+
+    def _combine(self, now: float, rateLimits: RateLimits) -> RateLimits:
+        """
+        Merges a response into RateLimits, keeping the lowest remaining
+        and the latest reset of responses in the same window.
+        """
+        current = self.RateLimits
+        if current is None:
+            current = rateLimits
+        # headers missing from this response keep their last known value
+        known = {f.name: getattr(rateLimits, f.name) for f in fields(rateLimits)
+            if getattr(rateLimits, f.name) is not None}
+        combined = replace(current, **known)
+        combined.RetryAfter = rateLimits.RetryAfter
+
+        secondResetAt = now + (rateLimits.TotalPerSecondResetCounter or 0)
+        if now < self._secondResetAt:
+            combined.RemainingPerSecond = _lowest(current.RemainingPerSecond, rateLimits.RemainingPerSecond)
+            secondResetAt = max(secondResetAt, self._secondResetAt)
+            if rateLimits.TotalPerSecondResetCounter is not None:
+                combined.TotalPerSecondResetCounter = secondResetAt - now
+        self._secondResetAt = secondResetAt
+
+        dayResetAt = now + (rateLimits.TotalPerDayResetCounter or 0)
+        if now < self._dayResetAt:
+            combined.RemainingPerDay = _lowest(current.RemainingPerDay, rateLimits.RemainingPerDay)
+            dayResetAt = max(dayResetAt, self._dayResetAt)
+            if rateLimits.TotalPerDayResetCounter is not None:
+                combined.TotalPerDayResetCounter = round(dayResetAt - now)
+        self._dayResetAt = dayResetAt
+
+        return combined
+
+
+def _lowest(a: Optional[int], b: Optional[int]) -> Optional[int]:
+    if a is None or b is None:
+        return b if a is None else a
+
+    return min(a, b)
@@ -0,0 +1,123 @@
+import random
+import threading
+from typing import Optional, Tuple
+from .models import RateLimits
+
+__all__ = [
+    "RetryPolicy",
+    "RETRY_STATUSES"
+]
+
+# request timeout, too many requests and the transient server errors
+RETRY_STATUSES = (408, 429, 500, 502, 503, 504)
+TOO_MANY_REQUESTS = 429
+
+
+class RetryPolicy:
+    """
+    Decides whether and when a failed request is sent again.
+
+    Retries back off exponentially with full jitter, a random delay
+    between zero and backoff * 2^attempt, so clients that failed together
+    do not retry together. A Retry-After header, or the rate limit reset
+    of a 429, is waited out first.
+
+    A policy is shared by every request of a client, and retries of
+    failures draw on a common budget: each request adds budget retries
+    to it, up to budgetReserve, and each retry takes one. While the api
+    is failing this stops retries from multiplying the load on it.
+
+    A 429 is not a failure, so it counts towards neither retries nor the
+    budget. It is retried once the rate limit resets, for as long as the
+    daily quota lasts unless throttleRetries is set.
+    """
+
+    def __init__(self,
+            retries: int = 3,
+            backoff: float = 0.5,
+            maxBackoff: float = 30.0,
+            statuses: Tuple[int, ...] = RETRY_STATUSES,
+            budget: Optional[float] = 0.2,
+            budgetReserve: int = 10,
+            throttleRetries: Optional[int] = None):
+        """
+        retries : int - attempts after the first before giving up
+        backoff : float - longest wait before the first retry, doubling with each attempt
+        maxBackoff : float - upper bound of the backoff before jitter
+        statuses : Tuple[int] - http statuses worth retrying, connection errors and timeouts always are
+        budget : float - retries earned by each request, None for no budget
+        budgetReserve : int - retries available before any have been earned
+        throttleRetries : int - retries of a 429 before giving up, None for no limit
+        """
+        self.retries = retries
+        self.backoff = backoff
+        self.maxBackoff = maxBackoff
+        self.statuses = statuses
+        self.budget = budget
+        self.budgetReserve = budgetReserve
+        self.throttleRetries = throttleRetries
+        self.Retries = 0
+        self.Throttled = 0
+        self.Exhausted = 0
+
+        self._tokens = float(budgetReserve)
+        self._lock = threading.Lock()
+
+    def isRetryable(self, status: int, rateLimits: RateLimits = None) -> bool:
+        if status == TOO_MANY_REQUESTS and rateLimits is not None \
+                and rateLimits.RemainingPerDay is not None and rateLimits.RemainingPerDay <= 0:
+            # the daily quota will not come back within any sensible backoff
+            return False
+
+        return status in self.statuses
+
+    def delay(self, attempt: int, retryAfter: float = None) -> float:
+        """
+        attempt : int - retries already made for this request
+        retryAfter : float - seconds the server asked to wait
+
+        return : float - seconds to sleep before the next attempt
+        """
+        if retryAfter is not None:
+            return retryAfter + random.uniform(0, self.backoff)
+
+        return random.uniform(0, min(self.maxBackoff, self.backoff * 2 ** attempt))
+
+    def deposit(self):
+        """
+        Called for every request, earning a share of a retry.
+        """
+        if self.budget is None:
+            return
+
+        with self._lock:
+            self._tokens = min(float(self.budgetReserve), self._tokens + self.budget)
+
+    def withdraw(self, attempt: int, throttled: bool = False) -> bool:
+        """
+        attempt : int - retries already made for this request, counting
+            429s and failures separately
+        throttled : bool - the request was rejected with a 429, which is
+            paced by the rate limit rather than retries and the budget
+
+        return : bool - True when this request may be retried again
+        """
+        if throttled:
+            if self.throttleRetries is not None and attempt >= self.throttleRetries:
+                return False
+            with self._lock:
+                self.Throttled += 1
+            return True
+
+        if attempt >= self.retries:
+            return False
+
+        with self._lock:
+            if self.budget is not None:
+                if self._tokens < 1:
+                    self.Exhausted += 1
+                    return False
+                self._tokens -= 1
+            self.Retries += 1
+
+        return True
@@ -0,0 +1,611 @@
+import hashlib
+import json
+import math
+import random
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone as dtTimezone
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import monotonic, sleep, time
+from typing import Optional, Dict, List, Tuple, Any
+from urllib.parse import urlparse, parse_qsl
+import requests
+from requests.adapters import BaseAdapter
+from .enums import Energy, Granularity
+from .utilities import AlignTimestamp
+from .client import SHORT_ENERGY_QUERY_PERIOD, MODBUS_QUERY_PERIOD, LONG_ENERGY_QUERY_PERIODS
+
+__all__ = [
+    "Simulator",
+    "SimulatorAdapter",
+    "SimulatedResponse",
+    "Serve"
+]
+
+# model code, display name and channel count
+MODELS = (("3W+", "Auditor 3W+", 3), ("6W+", "Auditor 6W+", 6), ("6M", "Auditor 6M", 6))
+TIMEZONES = ("Australia/Sydney", "Australia/Brisbane", "Australia/Adelaide",
+    "Australia/Perth", "Pacific/Auckland")
+CHANNEL_CATEGORIES = [
+    {"id": 1, "label": "Grid", "description": "Supply from the grid"},
+    {"id": 2, "label": "Solar", "description": "Solar generation"},
+    {"id": 3, "label": "Load", "description": "General load"},
+    {"id": 4, "label": "Hot water", "description": "Hot water system"},
+]
+MODBUS_INTERVAL = 300
+DAY = 86400
+
+
+@dataclass
+class SimulatedDevice:
+    Id: str
+    Model: str
+    Channels: int
+    Timezone: str
+    Interval: int
+    Since: int
+    Seed: int
+    Base: List[float] = field(default_factory=list)
+    Phase: List[float] = field(default_factory=list)
+    Record: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class SimulatedResponse:
+    Status: int
+    Headers: Dict[str, str]
+    Body: bytes
+    Delay: float = 0.0
+    # 'timeout' or 'reset' when the request fails before a response
+    Fault: Optional[str] = None
+
+
+class Simulator:
+    """
+    Local stand in for the Watt Watchers api, serving /devices,
+    /short-energy, /long-energy and /modbus for a synthetic fleet.
+
+    Every device and reading is derived from seed and the device index,
+    so any fleet size is reproducible and the same range always returns
+    the same data. Ranges include both fromTs and toTs, and longer
+    ranges than the api allows are rejected with a 422.
+
+    Requests are counted per api key against perSecond and perDay, with
+    the X-RateLimit headers and 429 responses of the real api. Latency,
+    jitter, a bandwidth limit and injected errors, timeouts and
+    connection resets make the transport behave like a real network.
+    Mount it with SimulatorAdapter, or run it as a server with Serve.
+    """
+
+    def __init__(self,
+            devices: int = 10,
+            seed: int = 0,
+            perSecond: int = 5,
+            perDay: int = 50000,
+            latency: float = 0.0,
+            jitter: float = 0.0,
+            bandwidth: float = None,
+            errorRate: float = 0.0,
+            timeoutRate: float = 0.0,
+            resetRate: float = 0.0,
+            history: timedelta = timedelta(days=365),
+            now: float = None,
+            cacheSize: int = 256):
+        """
+        devices : int - fleet size
+        seed : int - seed of the fleet and its readings
+        perSecond : int - requests allowed per second for each api key, None for no limit
+        perDay : int - requests allowed per day for each api key, None for no limit
+        latency : float - seconds before each response
+        jitter : float - latency varies uniformly by up to this many seconds either way
+        bandwidth : float - bytes per second a response body is sent at, None for instant
+        errorRate : float - fraction of requests answered with a 500, 502 or 503
+        timeoutRate : float - fraction of requests that time out
+        resetRate : float - fraction of requests whose connection is reset
+        history : timedelta - how long before now devices started reporting
+        now : float - fixed epoch time of the fleet's latest reading, defaults to the current time
+        cacheSize : int - range responses kept, bodies are deterministic so repeats are served from memory
+        """
+        self.devices = devices
+        self.seed = seed
+        self.perSecond = perSecond
+        self.perDay = perDay
+        self.latency = latency
+        self.jitter = jitter
+        self.bandwidth = bandwidth
+        self.errorRate = errorRate
+        self.timeoutRate = timeoutRate
+        self.resetRate = resetRate
+        self.history = history
+        self.fixedNow = now
+        self.cacheSize = cacheSize
+
+        self.Requests = 0
+        self.Throttled = 0
+        self.Faults = 0
+        self.Bytes = 0
+
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+        self._devices: Dict[str, SimulatedDevice] = {}
+        self._limits: Dict[str, List[float]] = {}
+        self._bodies: "OrderedDict[Tuple, bytes]" = OrderedDict()
+        self._started = time() if now is None else now
+
+    def now(self) -> int:
+        return int(time() if self.fixedNow is None else self.fixedNow)
+
+    def deviceIds(self) -> List[str]:
+        return [f"D{100000 + index}" for index in range(self.devices)]
+
+    def device(self, deviceId: str) -> Optional[SimulatedDevice]:
+        with self._lock:
+            device = self._devices.get(deviceId)
+        if device is not None:
+            return device
+
+        try:
+            index = int(deviceId[1:]) - 100000
+        except ValueError:
+            return None
+        if not deviceId.startswith('D') or not 0 <= index < self.devices:
+            return None
+
+        rng = random.Random(self.seed * 1_000_003 + index)
+        code, _, channels = MODELS[index % len(MODELS)]
+        timezone = TIMEZONES[index % len(TIMEZONES)]
+        # the first channel of every fourth device measures solar generation
+        base = [rng.uniform(200, 3000) for _ in range(channels)]
+        if index % 4 == 0:
+            base[0] = -rng.uniform(1000, 5000)
+
+        since = int(self._started - self.history.total_seconds() * rng.uniform(0.5, 1.0))
+        device = SimulatedDevice(deviceId, code, channels, timezone, 30,
+            since - since % DAY, rng.randrange(2 ** 31), base,
+            [rng.uniform(0, 2 * math.pi) for _ in range(channels)])
+        device.Record = {
+            "id": deviceId,
+            "label": f"Site {index}",
+            "timezone": timezone,
+            "model": code,
+            "firmwareVersion": "3.4.1",
+            "latestStatus": 1,
+            "shortEnergyReportingInterval": device.Interval,
+            "comms": {"type": "cellular", "lastHeardAt": self.now(), "signalQualityDbm": -70 - index % 30},
+            "channels": [{"id": f"{deviceId}_{c + 1}", "label": "Solar" if base[c] < 0 else f"Load {c + 1}",
+                "ctRating": 60, "categoryId": 2 if base[c] < 0 else 3,
+                "categoryLabel": "Solar" if base[c] < 0 else "Load"} for c in range(channels)],
+            "phases": {"count": 1 if channels == 3 else 3, "grouping": []},
+            "switches": [],
+        }
+
+        with self._lock:
+            return self._devices.setdefault(deviceId, device)
+
+    # readings
+
+    def _noise(self, device: SimulatedDevice, ts: int, channel: int) -> float:
+        # cheap deterministic hash of the reading, in [-1, 1)
+        return ((ts * 2654435761 + device.Seed + channel * 97) % 2000) / 1000 - 1
+
+    def _watts(self, device: SimulatedDevice, ts: int, channel: int) -> float:
+        base = device.Base[channel]
+        cycle = 0.55 + 0.45 * math.sin(2 * math.pi * ts / DAY + device.Phase[channel])
+        if base < 0:
+            # solar only generates through the middle of the day
+            cycle = max(0.0, math.sin(2 * math.pi * ((ts % DAY) / DAY - 0.25)))
+        return base * cycle * (1 + 0.1 * self._noise(device, ts, channel))
+
+    def _units(self, row: Dict[str, Any], keys: Tuple[str, ...], unit: str, duration: int):
+        # the api adds converted values alongside joules, BaseSchema.pre_load picks them up
+        if unit == str(Energy.Killowatts):
+            for key in keys:
+                row[key + "Kw"] = [round(v / duration / 1000, 5) for v in row[key]]
+        elif unit == str(Energy.KillowattHours):
+            for key in keys:
+                row[key + "Kwh"] = [round(v / 3.6e6, 6) for v in row[key]]
+
+    def _shortRow(self, device: SimulatedDevice, ts: int, unit: str = None) -> Dict[str, Any]:
+        d = device.Interval
+        watts = [self._watts(device, ts, c) for c in range(device.Channels)]
+        volts = [round(240 + 5 * self._noise(device, ts, c + 50), 2) for c in range(device.Channels)]
+        row = {
+            "timestamp": ts,
+            "duration": d,
+            "frequency": round(50 + 0.05 * self._noise(device, ts, 99), 3),
+            "eReal": [round(w * d, 1) for w in watts],
+            "eReactive": [round(abs(w) * d * 0.2, 1) for w in watts],
+            "vRMS": volts,
+            "iRMS": [round(abs(w) / v, 3) for w, v in zip(watts, volts)],
+        }
+        self._units(row, ("eReal", "eReactive"), unit, d)
+        return row
+
+    def _longRow(self, device: SimulatedDevice, ts: int, duration: int, unit: str = None) -> Dict[str, Any]:
+        middle = ts + duration // 2
+        energy = [self._watts(device, middle, c) * duration for c in range(device.Channels)]
+        volts = [240 + 5 * self._noise(device, middle, c + 50) for c in range(device.Channels)]
+        row = {
+            "timestamp": ts,
+            "duration": duration,
+            "eReal": [int(e) for e in energy],
+            "eRealNegative": [int(max(0.0, -e)) for e in energy],
+            "eRealPositive": [int(max(0.0, e)) for e in energy],
+            "eReactive": [int(abs(e) * 0.2) for e in energy],
+            "eReactiveNegative": [0] * device.Channels,
+            "eReactivePositive": [int(abs(e) * 0.2) for e in energy],
+            "vRMSMin": [round(v - 6, 2) for v in volts],
+            "vRMSMax": [round(v + 6, 2) for v in volts],
+            "iRMSMin": [round(abs(e) / duration / v * 0.5, 3) for e, v in zip(energy, volts)],
+            "iRMSMax": [round(abs(e) / duration / v * 1.5, 3) for e, v in zip(energy, volts)],
+        }
+        self._units(row, ("eReal", "eRealNegative", "eRealPositive",
+            "eReactive", "eReactiveNegative", "eReactivePositive"), unit, duration)
+        return row
+
+    def _modbusRow(self, device: SimulatedDevice, ts: int) -> Dict[str, Any]:
+        hours = (ts - device.Since) / 3600
+        row = {"timestamp": ts, "model": "DTSU666"}
+        for idx, key in enumerate(("_Ia", "_Ib", "_Ic")):
+            row[key] = round(abs(self._watts(device, ts, idx % device.Channels)) / 240, 3)
+        for idx, key in enumerate(("_PFa", "_PFb", "_PFc")):
+            row[key] = round(0.95 + 0.04 * self._noise(device, ts, idx + 10), 3)
+        for idx, key in enumerate(("_Uan", "_Ubn", "_Ucn")):
+            row[key] = round(240 + 5 * self._noise(device, ts, idx + 20), 2)
+        for idx, key in enumerate(("kVAh", "kWh_Exp", "kWh_Imp", "kWh_Net", "kWh_Tot",
+                "kvarh_Q1", "kvarh_Q2", "kvarh_Q3", "kvarh_Q4",
+                "kvarh_Exp", "kvarh_Imp", "kvarh_Net", "kvarh_Tot")):
+            row[key] = int(hours * (idx + 1))
+        return row
+
+    def _buckets(self, device: SimulatedDevice, fromTs: int, toTs: int, granularity: Granularity):
+        """
+        Yields (timestamp, duration) of each long energy interval in the
+        device's timezone starting within [fromTs, toTs].
+        """
+        tz = device.Timezone
+        current = AlignTimestamp(datetime.fromtimestamp(fromTs, dtTimezone.utc), granularity, tz)
+        while True:
+            if granularity in (Granularity.Daily, Granularity.Weekly, Granularity.Monthly):
+                if granularity == Granularity.Monthly:
+                    following = current.replace(year=current.year + current.month // 12,
+                        month=current.month % 12 + 1)
+                else:
+                    following = current + timedelta(days=7 if granularity == Granularity.Weekly else 1)
+                # realign on the wall clock across daylight saving changes
+                following = AlignTimestamp(following.replace(hour=12), granularity, tz)
+            else:
+                # fixed length intervals step in utc so daylight saving cannot stretch them
+                following = current.astimezone(dtTimezone.utc) + timedelta(seconds=_GRANULARITY_SECONDS[granularity])
+
+            start = int(current.timestamp())
+            if start > toTs:
+                return
+            if start >= fromTs:
+                yield start, int(following.timestamp()) - start
+            current = following
+
+    # routing
+
+    def _json(self, status: int, content: Any, headers: Dict[str, str] = None) -> SimulatedResponse:
+        return SimulatedResponse(status, {"Content-Type": "application/json", **(headers or {})},
+            json.dumps(content).encode())
+
+    def _error(self, status: int, code: str, message: str) -> SimulatedResponse:
+        return self._json(status, {"code": code, "httpCode": status, "message": message})
+
+    def _invalid(self, detail: str) -> SimulatedResponse:
+        return self._json(422, {"errors": [{"title": "Invalid parameter", "detail": detail}]})
+
+    def _range(self, device: SimulatedDevice, query: Dict[str, str], maxPeriod: timedelta):
+        try:
+            fromTs = int(query["fromTs"])
+            toTs = int(query["toTs"])
+        except (KeyError, ValueError):
+            return None, self._invalid("fromTs and toTs are required epoch timestamps")
+
+        if toTs < fromTs:
+            return None, self._invalid("toTs is before fromTs")
+        if toTs - fromTs > maxPeriod.total_seconds():
+            return None, self._invalid(f"range is longer than {maxPeriod}")
+
+        return (max(fromTs, device.Since), min(toTs, self.now())), None
+
+    def _cached(self, key: Tuple, build) -> bytes:
+        with self._lock:
+            body = self._bodies.get(key)
+            if body is not None:
+                self._bodies.move_to_end(key)
+                return body
+
+        body = json.dumps(build()).encode()
+        if self.cacheSize:
+            with self._lock:
+                self._bodies[key] = body
+                while len(self._bodies) > self.cacheSize:
+                    self._bodies.popitem(last=False)
+
+        return body
+
+    def _route(self, method: str, path: str, query: Dict[str, str], headers: Dict[str, str], body: bytes) -> SimulatedResponse:
+        parts = [p for p in path.split('/') if p]
+        if not parts:
+            return self._error(404, "NotFound", path)
+
+        if parts[0] == "devices":
+            if len(parts) == 1:
+                return self._json(200, self.deviceIds())
+            if parts[1] == "channel-categories":
+                return self._json(200, CHANNEL_CATEGORIES)
+            if parts[1] == "models":
+                return self._json(200, [{"code": code, "displayName": name, "channelsCount": channels,
+                    "switchesCount": 0, "communications": "cellular"} for code, name, channels in MODELS])
+
+            device = self.device(parts[1])
+            if device is None:
+                return self._error(404, "DeviceNotFound", f"{parts[1]} not found")
+
+            if method == "PATCH":
+                update = json.loads(body or b'{}')
+                with self._lock:
+                    for key in ("label", "timezone", "phases"):
+                        if key in update:
+                            device.Record[key] = update[key]
+                    for channel in update.get("channels", []):
+                        for existing in device.Record["channels"]:
+                            if existing["id"] == channel.get("id"):
+                                existing.update(channel)
+                return self._json(200, device.Record)
+
+            content = json.dumps(device.Record).encode()
+            etag = '"' + hashlib.md5(content).hexdigest() + '"'
+            if headers.get("If-None-Match") == etag:
+                return SimulatedResponse(304, {"ETag": etag}, b'')
+            return SimulatedResponse(200, {"Content-Type": "application/json", "ETag": etag}, content)
+
+        if len(parts) < 2 or parts[0] not in ("short-energy", "long-energy", "modbus"):
+            return self._error(404, "NotFound", path)
+
+        device = self.device(parts[1])
+        if device is None:
+            return self._error(404, "DeviceNotFound", f"{parts[1]} not found")
+
+        unit = query.get("convert[energy]", query.get("convert"))
+        if parts[0] == "short-energy" and len(parts) == 3:
+            # first and latest
+            ts = device.Since if parts[2] == "first" else self.now() - self.now() % device.Interval
+            return self._json(200, self._shortRow(device, ts, unit))
+
+        if parts[0] == "long-energy" and len(parts) == 3:
+            ts = device.Since if parts[2] == "first" else self.now() - self.now() % 900
+            return self._json(200, self._longRow(device, ts, 900, unit))
+
+        if parts[0] == "short-energy":
+            window, error = self._range(device, query, SHORT_ENERGY_QUERY_PERIOD)
+            if error:
+                return error
+            fromTs, toTs = window
+            start = fromTs + (-fromTs % device.Interval)
+            content = self._cached(("short", device.Id, start, toTs, unit),
+                lambda: [self._shortRow(device, ts, unit) for ts in range(start, toTs + 1, device.Interval)])
+
+        elif parts[0] == "long-energy":
+            try:
+                granularity = Granularity(query.get("granularity", str(Granularity.FifteenMinute)))
+            except ValueError:
+                return self._invalid(f"unknown granularity {query.get('granularity')}")
+            window, error = self._range(device, query, LONG_ENERGY_QUERY_PERIODS[granularity][0])
+            if error:
+                return error
+            fromTs, toTs = window
+            content = self._cached(("long", device.Id, fromTs, toTs, str(granularity), unit),
+                lambda: [self._longRow(device, ts, duration, unit)
+                    for ts, duration in self._buckets(device, fromTs, toTs, granularity)])
+
+        else:
+            window, error = self._range(device, query, MODBUS_QUERY_PERIOD)
+            if error:
+                return error
+            fromTs, toTs = window
+            start = fromTs + (-fromTs % MODBUS_INTERVAL)
+            content = self._cached(("modbus", device.Id, start, toTs),
+                lambda: [self._modbusRow(device, ts) for ts in range(start, toTs + 1, MODBUS_INTERVAL)])
+
+        return SimulatedResponse(200, {"Content-Type": "application/json"}, content)
+
+    def _rateLimit(self, apiKey: str) -> Tuple[bool, Dict[str, str]]:
+        """
+        Counts a request against the key's limits.
+
+        return : Tuple[bool, Dict] - whether it is allowed, and the X-RateLimit headers
+        """
+        now = monotonic()
+        wall = time()
+        with self._lock:
+            second, perSecond, day, perDay = self._limits.setdefault(apiKey, [now, 0, wall - wall % DAY, 0])
+            if now - second >= 1:
+                second, perSecond = now, 0
+            if wall - day >= DAY:
+                day, perDay = wall - wall % DAY, 0
+
+            allowed = (self.perDay is None or perDay < self.perDay) and \
+                (self.perSecond is None or perSecond < self.perSecond)
+            if allowed:
+                perSecond += 1
+                perDay += 1
+            self._limits[apiKey] = [second, perSecond, day, perDay]
+
+        # an unlimited simulator leaves out the headers of that limit
+        resetSecond = max(0.0, 1 - (now - second))
+        headers = {}
+        if self.perDay is not None:
+            headers["X-RateLimit-TpdLimit"] = str(self.perDay)
+            headers["X-RateLimit-TpdRemaining"] = str(max(0, self.perDay - perDay))
+            headers["X-RateLimit-TpdReset"] = str(int(day + DAY - wall))
+        if self.perSecond is not None:
+            headers["X-RateLimit-TpsLimit"] = str(self.perSecond)
+            headers["X-RateLimit-TpsRemaining"] = str(max(0, self.perSecond - perSecond))
+            headers["X-RateLimit-TpsReset"] = f"{resetSecond:.3f}"
+        if not allowed:
+            daily = self.perDay is not None and perDay >= self.perDay
+            headers["Retry-After"] = str(int(day + DAY - wall) if daily else math.ceil(resetSecond))
+
+        return allowed, headers
+
+    def handle(self, method: str, url: str, headers: Dict[str, str] = None, body: bytes = None) -> SimulatedResponse:
+        """
+        Answers one request.
+
+        url : str - request url, only the path and query are used
+        """
+        headers = headers or {}
+        parsed = urlparse(url)
+        query = dict(parse_qsl(parsed.query))
+
+        with self._lock:
+            self.Requests += 1
+            roll = self._random.random()
+            delay = max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+            status = self._random.choice((500, 502, 503))
+
+        # faults happen before the request reaches the rate limiter
+        if roll < self.timeoutRate + self.resetRate + self.errorRate:
+            with self._lock:
+                self.Faults += 1
+            if roll < self.timeoutRate:
+                return SimulatedResponse(0, {}, b'', delay, 'timeout')
+            if roll < self.timeoutRate + self.resetRate:
+                return SimulatedResponse(0, {}, b'', delay, 'reset')
+
+        allowed, limitHeaders = self._rateLimit(headers.get("Authorization", ""))
+        if not allowed:
+            with self._lock:
+                self.Throttled += 1
+            response = self._error(429, "TooManyRequests", "Rate limit exceeded")
+        elif roll < self.timeoutRate + self.resetRate + self.errorRate:
+            response = self._error(status, "ServerError", "Simulated failure")
+        else:
+            response = self._route(method.upper(), parsed.path, query, headers, body)
+
+        response.Headers.update(limitHeaders)
+        response.Delay = delay
+        if self.bandwidth:
+            response.Delay += len(response.Body) / self.bandwidth
+        with self._lock:
+            self.Bytes += len(response.Body)
+
+        return response
+
+
+_GRANULARITY_SECONDS = {
+    Granularity.FiveMinute: 300,
+    Granularity.FifteenMinute: 900,
+    Granularity.HalfHourly: 1800,
+    Granularity.Hourly: 3600
+}
+
+
+def _readTimeout(timeout) -> Optional[float]:
+    if isinstance(timeout, tuple):
+        return timeout[1]
+
+    return timeout
+
+
+class SimulatorAdapter(BaseAdapter):
+    """
+    requests transport answering from a Simulator, for
+    Client(adapter=SimulatorAdapter(simulator)).
+
+    Responses slower than the request's read timeout raise ReadTimeout
+    after the timeout has passed, as they would over a network.
+    """
+
+    def __init__(self, simulator: Simulator, sleep: bool = True):
+        """
+        sleep : bool - wait out simulated latency, False to only report it in response.elapsed
+        """
+        super().__init__()
+        self.simulator = simulator
+        self.sleep = sleep
+
+    def _wait(self, seconds: float):
+        if self.sleep and seconds > 0:
+            sleep(seconds)
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        body = request.body.encode() if isinstance(request.body, str) else request.body
+        simulated = self.simulator.handle(request.method, request.url, dict(request.headers), body)
+
+        readTimeout = _readTimeout(timeout)
+        if simulated.Fault == 'timeout' or (readTimeout is not None and simulated.Delay > readTimeout):
+            self._wait(simulated.Delay if readTimeout is None else min(simulated.Delay, readTimeout))
+            raise requests.exceptions.ReadTimeout(f"simulated timeout for {request.url}", request=request)
+
+        self._wait(simulated.Delay)
+        if simulated.Fault == 'reset':
+            raise requests.exceptions.ConnectionError(
+                ConnectionResetError(104, "Connection reset by peer"), request=request)
+
+        response = requests.Response()
+        response.status_code = simulated.Status
+        response.reason = HTTPStatus(simulated.Status).phrase
+        response.headers.update(simulated.Headers)
+        response._content = simulated.Body
+        response.url = request.url
+        response.request = request
+        response.elapsed = timedelta(seconds=simulated.Delay)
+        response.encoding = 'utf-8'
+        return response
+
+    def close(self):
+        pass
+
+
+def Serve(simulator: Simulator, host: str = '127.0.0.1', port: int = 0, timeoutDelay: float = 60.0) -> ThreadingHTTPServer:
+    """
+    Serves a simulator over http from a background thread, for clients
+    that cannot mount an adapter such as AsyncClient or other processes.
+    A timeout fault holds the connection for timeoutDelay seconds and a
+    reset fault closes it without a response. Call shutdown() when done.
+
+    port : int - 0 picks a free port, see server_port
+
+    return : ThreadingHTTPServer - endpoint is http://<host>:<server_port>
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _handle(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            body = self.rfile.read(length) if length else None
+            simulated = simulator.handle(self.command, self.path, dict(self.headers), body)
+
+            if simulated.Fault == 'timeout':
+                sleep(timeoutDelay)
+            else:
+                sleep(simulated.Delay)
+            if simulated.Fault is not None:
+                self.close_connection = True
+                return
+
+            self.send_response(simulated.Status)
+            for key, value in simulated.Headers.items():
+                self.send_header(key, value)
+            self.send_header("Content-Length", str(len(simulated.Body)))
+            self.end_headers()
+            self.wfile.write(simulated.Body)
+
+        do_GET = _handle
+        do_PATCH = _handle
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
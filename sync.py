@@ -0,0 +1,103 @@
+import sqlite3
+import threading
+from typing import Optional, Dict, Tuple
+
+__all__ = [
+    "CursorStore",
+    "MemoryCursorStore",
+    "SqliteCursorStore"
+]
+
+
+class CursorStore:
+    """
+    Remembers the timestamp of the last record ingested for each
+    device and endpoint, so a sync only requests newer data.
+    """
+
+    def get(self, deviceId: str, endpoint: str) -> Optional[int]:
+        """
+        return : int - epoch timestamp of the last ingested record, or None on a cold start
+        """
+        raise NotImplementedError()
+
+    def set(self, deviceId: str, endpoint: str, timestamp: int):
+        raise NotImplementedError()
+
+    def reset(self, deviceId: str, endpoint: str = None):
+        """
+        Forgets the cursor of a device, for one or every endpoint.
+        """
+        raise NotImplementedError()
+
+
+class MemoryCursorStore(CursorStore):
+    """
+    Cursor store kept in memory for the life of the process.
+    """
+
+    def __init__(self):
+        self._cursors: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, deviceId: str, endpoint: str) -> Optional[int]:
+        with self._lock:
+            return self._cursors.get((deviceId, endpoint))
+
+    def set(self, deviceId: str, endpoint: str, timestamp: int):
+        with self._lock:
+            self._cursors[(deviceId, endpoint)] = int(timestamp)
+
+    def reset(self, deviceId: str, endpoint: str = None):
+        with self._lock:
+            for key in [k for k in self._cursors if k[0] == deviceId]:
+                if endpoint is None or key[1] == endpoint:
+                    del self._cursors[key]
+
+
+class SqliteCursorStore(CursorStore):
+    """
+    Cursor store persisted to a SQLite database, so pollers resume
+    where they left off after a restart.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute("""
+                CREATE TABLE IF NOT EXISTS cursors (
+                    deviceId TEXT NOT NULL,
+                    endpoint TEXT NOT NULL,
+                    timestamp INTEGER NOT NULL,
+                    PRIMARY KEY (deviceId, endpoint)
+                )""")
+
+    def get(self, deviceId: str, endpoint: str) -> Optional[int]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT timestamp FROM cursors WHERE deviceId = ? AND endpoint = ?",
+                (deviceId, endpoint)).fetchone()
+
+        return None if row is None else row[0]
+
+    def set(self, deviceId: str, endpoint: str, timestamp: int):
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO cursors VALUES (?, ?, ?)",
+                (deviceId, endpoint, int(timestamp)))
+
+    def reset(self, deviceId: str, endpoint: str = None):
+        with self._lock, self._connection:
+            if endpoint is None:
+                self._connection.execute(
+                    "DELETE FROM cursors WHERE deviceId = ?", (deviceId,))
+            else:
+                self._connection.execute(
+                    "DELETE FROM cursors WHERE deviceId = ? AND endpoint = ?",
+                    (deviceId, endpoint))
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
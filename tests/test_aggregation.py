@@ -0,0 +1,147 @@
+"""
+Aggregate against hand built short energy, in UTC and local time.
+"""
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+import numpy as np
+import pytest
+from ..aggregation import Aggregate
+from ..columns import ShortColumns, LongColumns
+from ..enums import Granularity
+from ..models import ShortData, LongData
+
+
+def _epoch(*args, tz=timezone.utc) -> int:
+    return int(datetime(*args, tzinfo=tz).timestamp())
+
+
+def _columns(timestamps, real, duration=300, unit="J", **kwargs) -> ShortColumns:
+    real = np.array(real, dtype=np.float64).reshape(len(timestamps), -1 if timestamps else 1)
+    return ShortColumns(Timestamp=np.array(timestamps, dtype=np.int64),
+        Duration=np.full(len(timestamps), duration, dtype=np.int64), Unit=unit, Real=real, **kwargs)
+
+
+def test_hourly_sums_energy_and_splits_direction():
+    start = _epoch(2021, 1, 1)
+    timestamps = [start, start + 300, start + 3600, start + 3900]
+    columns = _columns(timestamps, [[10, -1], [-4, -2], [7, 3], [1, 0]],
+        VoltageRMS=np.array([[240], [236], [np.nan], [244]], dtype=np.float64))
+    long = Aggregate(columns, Granularity.Hourly)
+
+    assert long.Timestamp.tolist() == [start, start + 3600]
+    assert long.Duration.tolist() == [600, 600]
+    np.testing.assert_array_equal(long.Real, [[6, -3], [8, 3]])
+    np.testing.assert_array_equal(long.RealPositive, [[10, 0], [8, 3]])
+    np.testing.assert_array_equal(long.RealNegative, [[4, 3], [0, 0]])
+    np.testing.assert_array_equal(long.VoltageRMSMin, [[236], [244]])
+    np.testing.assert_array_equal(long.VoltageRMSMax, [[240], [244]])
+    assert long.Reactive is None
+
+
+def test_unsorted_input_is_bucketed_in_order():
+    start = _epoch(2021, 1, 1)
+    long = Aggregate(_columns([start + 3600, start, start + 300], [1, 2, 4]), Granularity.Hourly)
+
+    assert long.Timestamp.tolist() == [start, start + 3600]
+    np.testing.assert_array_equal(long.Real, [[6], [1]])
+
+
+def test_power_is_averaged_by_duration():
+    start = _epoch(2021, 1, 1)
+    columns = _columns([start, start + 300], [2, 5], unit="kW")
+    columns.Duration[:] = [300, 600]
+    long = Aggregate(columns, Granularity.Hourly)
+
+    np.testing.assert_allclose(long.Real, [[(2 * 300 + 5 * 600) / 900]])
+
+
+def test_missing_values_are_skipped():
+    start = _epoch(2021, 1, 1)
+    long = Aggregate(_columns([start, start + 300, start + 3600], [3, np.nan, np.nan]), Granularity.Hourly)
+
+    assert long.Real[0, 0] == 3
+    assert np.isnan(long.Real[1, 0])
+
+
+def test_days_follow_the_local_clock():
+    sydney = "Australia/Sydney"
+    tz = ZoneInfo(sydney)
+    # 23:00 and 01:00 in Sydney fall on different local days, but the same utc day
+    timestamps = [_epoch(2021, 1, 1, 23, tz=tz), _epoch(2021, 1, 2, 1, tz=tz)]
+    long = Aggregate(_columns(timestamps, [1, 2]), Granularity.Daily, sydney)
+
+    assert long.Timestamp.tolist() == [_epoch(2021, 1, 1, tz=tz), _epoch(2021, 1, 2, tz=tz)]
+    assert Aggregate(_columns(timestamps, [1, 2]), Granularity.Daily).Timestamp.tolist() == \
+        [_epoch(2021, 1, 1)]
+
+
+def test_half_hour_offsets_bucket_on_local_hours():
+    adelaide = "Australia/Adelaide"
+    tz = ZoneInfo(adelaide)
+    timestamps = [_epoch(2021, 1, 1, 10, 20, tz=tz), _epoch(2021, 1, 1, 10, 40, tz=tz)]
+    long = Aggregate(_columns(timestamps, [1, 2]), Granularity.Hourly, adelaide)
+
+    assert long.Timestamp.tolist() == [_epoch(2021, 1, 1, 10, tz=tz)]
+
+
+@pytest.mark.parametrize("day, hours", [
+    # clocks go forward an hour, then back an hour
+    (datetime(2021, 3, 28), 23),
+    (datetime(2021, 10, 31), 25),
+])
+def test_dst_days_hold_every_interval_of_the_local_day(day, hours):
+    london = "Europe/London"
+    tz = ZoneInfo(london)
+    start = int(day.replace(tzinfo=tz).timestamp())
+    end = int((day + timedelta(days=1)).replace(tzinfo=tz).timestamp())
+    timestamps = list(range(start - 3600, end + 3600, 3600))
+    long = Aggregate(_columns(timestamps, [1] * len(timestamps), duration=3600), Granularity.Daily, london)
+
+    assert long.Timestamp.tolist() == [start - 86400, start, end]
+    assert long.Duration.tolist() == [3600, hours * 3600, 3600]
+    np.testing.assert_array_equal(long.Real[:, 0], [1, hours, 1])
+
+
+def test_weeks_start_on_monday():
+    # 2021-01-03 was a Sunday
+    timestamps = [_epoch(2021, 1, 3, 12), _epoch(2021, 1, 4), _epoch(2021, 1, 10, 23)]
+    long = Aggregate(_columns(timestamps, [1, 2, 4]), Granularity.Weekly)
+
+    assert long.Timestamp.tolist() == [_epoch(2020, 12, 28), _epoch(2021, 1, 4)]
+    np.testing.assert_array_equal(long.Real[:, 0], [1, 6])
+
+
+def test_months_start_on_the_local_first():
+    auckland = "Pacific/Auckland"
+    tz = ZoneInfo(auckland)
+    # the first of February in Auckland is still January in utc
+    timestamps = [_epoch(2021, 1, 31, 12, tz=tz), _epoch(2021, 2, 1, 6, tz=tz), _epoch(2021, 3, 15, tz=tz)]
+    long = Aggregate(_columns(timestamps, [1, 2, 4]), Granularity.Monthly, auckland)
+
+    assert long.Timestamp.tolist() == [_epoch(2021, m, 1, tz=tz) for m in (1, 2, 3)]
+    np.testing.assert_array_equal(long.Real[:, 0], [1, 2, 4])
+
+
+def test_empty_input():
+    long = Aggregate(_columns([], []), Granularity.Daily)
+
+    assert isinstance(long, LongColumns)
+    assert len(long) == 0
+    assert Aggregate([], Granularity.Daily) == []
+
+
+def test_records_give_records():
+    start = datetime(2021, 1, 1, tzinfo=timezone.utc)
+    records = [ShortData(Timestamp=start + timedelta(minutes=5 * i), Duration=300, Unit="J",
+        Real=[1.0, -1.0]) for i in range(3)]
+    long = Aggregate(records, Granularity.FifteenMinute)
+
+    assert len(long) == 1
+    assert isinstance(long[0], LongData)
+    assert long[0].Real == [3, -3]
+    assert long[0].Duration == 900
+
+
+def test_units_without_a_sum_or_mean_are_rejected():
+    with pytest.raises(ValueError):
+        Aggregate(_columns([0], [1], unit="+pf"), Granularity.Hourly)
@@ -0,0 +1,66 @@
+"""
+AsyncClient devices and hydrate against the simulator served over http.
+"""
+import asyncio
+import pytest
+from ..asyncclient import AsyncClient
+from ..simulator import Simulator, Serve
+
+pytest.importorskip("aiohttp")
+
+
+@pytest.fixture
+def endpoint():
+    simulator = Simulator(devices=6, perSecond=None, perDay=None)
+    server = Serve(simulator)
+    yield simulator, f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def _run(endpoint, call):
+    async def main():
+        async with AsyncClient("test", endpoint=endpoint) as client:
+            return await call(client)
+
+    return asyncio.run(main())
+
+
+def test_devices_are_partial_until_hydrated(endpoint):
+    simulator, url = endpoint
+    devices = _run(url, lambda client: client.devices())
+
+    assert [d.Id for d in devices] == simulator.deviceIds()
+    assert all(d._isPartial for d in devices)
+    with pytest.raises(AttributeError, match="hydrate"):
+        devices[0].Label
+
+
+def test_hydrated_devices_hold_their_records(endpoint):
+    simulator, url = endpoint
+
+    async def call(client):
+        return await client.devices(hydrate=True, maxWorkers=2), \
+            await client.device(simulator.deviceIds()[0])
+
+    devices, first = _run(url, call)
+
+    assert not any(d._isPartial for d in devices)
+    assert devices[0].Label == first.Label
+    assert devices[0].Timezone == first.Timezone
+    assert devices[0].Channels == first.Channels
+    assert devices[0]._dirtyFields == {}
+
+
+def test_hydrate_leaves_unknown_devices_partial(endpoint):
+    simulator, url = endpoint
+
+    async def call(client):
+        devices = await client.devices()
+        devices[1] = type(devices[0])("D999999", _client=client)
+        return await client.hydrate(devices)
+
+    devices = _run(url, call)
+
+    assert devices[1]._isPartial
+    assert not devices[0]._isPartial
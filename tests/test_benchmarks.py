@@ -0,0 +1,22 @@
+"""
+Compare flags regressions against relative and zero baselines.
+"""
+from ..benchmarks.__main__ import Compare
+
+
+def test_relative_regression():
+    baseline = {"decode rows/s": 100.0, "Device bytes/object": 1000.0}
+    results = {"decode rows/s": 70.0, "Device bytes/object": 1100.0}
+
+    assert [r[0] for r in Compare(results, baseline, 0.2)] == ["decode rows/s"]
+
+
+def test_zero_baseline_uses_absolute_threshold():
+    baseline = {"fleet 429 responses": 0, "fleet retries": 0}
+    results = {"fleet 429 responses": 12, "fleet retries": 1}
+
+    assert Compare(results, baseline, 0.2, absolute=1.0) == [("fleet 429 responses", 0, 12, -12)]
+
+
+def test_metrics_missing_from_baseline_are_skipped():
+    assert Compare({"new rows/s": 1.0}, {}, 0.2) == []
@@ -0,0 +1,137 @@
+"""
+WindowCache of closed query windows, and TTLCache of device metadata
+revalidated with the simulator's ETags.
+"""
+from datetime import datetime, timedelta, timezone
+from time import time
+import pytest
+from ..cache import WindowCache, TTLCache
+from ..client import Client
+from ..simulator import Simulator, SimulatorAdapter
+
+NOW = datetime(2021, 3, 1, tzinfo=timezone.utc)
+DEVICE = "D100000"
+
+
+def _client(**kwargs):
+    simulator = Simulator(devices=1, perSecond=None, perDay=None, now=NOW.timestamp(), history=timedelta(days=30))
+    return simulator, Client("test", endpoint="http://test.invalid",
+        adapter=SimulatorAdapter(simulator, sleep=False), **kwargs)
+
+
+def test_repeated_range_is_served_from_the_cache():
+    cache = WindowCache()
+    simulator, client = _client(cache=cache, fastDecode=True)
+    fromTs, toTs = NOW - timedelta(days=3, hours=1), NOW - timedelta(hours=2)
+
+    first = client.shortEnergy(DEVICE, fromTs, toTs)
+    requests = simulator.Requests
+    assert requests == cache.Misses == 7
+
+    again = client.shortEnergy(DEVICE, fromTs, toTs)
+    assert simulator.Requests == requests
+    assert cache.Hits == requests
+    assert again == first
+
+
+def test_shifted_range_only_fetches_its_new_edges():
+    cache = WindowCache()
+    simulator, client = _client(cache=cache, fastDecode=True)
+    fromTs, toTs = NOW - timedelta(days=3, hours=1), NOW - timedelta(hours=2)
+    client.shortEnergy(DEVICE, fromTs, toTs)
+    requests = simulator.Requests
+
+    shift = timedelta(minutes=30)
+    shifted = client.shortEnergy(DEVICE, fromTs + shift, toTs + shift)
+
+    # the inner windows sit on the same grid, only the first and last are new
+    assert simulator.Requests - requests == 2
+    assert cache.Hits == 5
+    _, uncached = _client(fastDecode=True)
+    assert shifted == uncached.shortEnergy(DEVICE, fromTs + shift, toTs + shift)
+
+
+def test_open_windows_are_not_stored():
+    cache = WindowCache(settlePeriod=timedelta(hours=1))
+    now = datetime.fromtimestamp(time(), timezone.utc)
+    period = (now - timedelta(hours=2), now - timedelta(minutes=30))
+    cache.set("url", {}, period, b"[]")
+
+    assert cache.get("url", {}, period) is None
+    assert cache.Misses == 0
+
+
+def test_windows_are_keyed_by_params_and_period(tmp_path):
+    path = str(tmp_path / "windows.db")
+    cache = WindowCache(path)
+    period = (NOW - timedelta(days=1), NOW)
+    cache.set("url", {"convert": "kWh", "fields": None}, period, b"[1]")
+    cache.close()
+
+    cache = WindowCache(path)
+    assert cache.get("url", {"convert": "kWh"}, period) == b"[1]"
+    assert cache.get("url", {"convert": "J"}, period) is None
+    assert cache.get("url", {"convert": "kWh"}, (period[0], period[1] - timedelta(seconds=1))) is None
+    assert (cache.Hits, cache.Misses) == (1, 2)
+
+    cache.clear("url")
+    assert cache.get("url", {"convert": "kWh"}, period) is None
+    cache.close()
+
+
+def test_fresh_metadata_makes_no_request():
+    cache = TTLCache(ttl=300)
+    simulator, client = _client(metadataCache=cache)
+    first = client.device(DEVICE)
+    second = client.device(DEVICE)
+
+    assert simulator.Requests == 1
+    assert (cache.Hits, cache.Misses, cache.Revalidations) == (1, 1, 0)
+    assert second.Label == first.Label
+
+
+def test_expired_metadata_is_revalidated_with_its_etag():
+    cache = TTLCache(ttl=0)
+    simulator, client = _client(metadataCache=cache)
+    first = client.device(DEVICE)
+    etag = cache.lookup(f"http://test.invalid/devices/{DEVICE}").ETag
+    assert etag
+
+    second = client.device(DEVICE)
+
+    # the simulator answered 304, so the cached body was reused
+    assert simulator.Requests == 2
+    assert cache.Revalidations == 1
+    assert second.Label == first.Label
+
+
+def test_changed_metadata_is_fetched_again():
+    cache = TTLCache(ttl=0)
+    simulator, client = _client(metadataCache=cache)
+    client.device(DEVICE)
+    # changed behind the client's back, so the entry is not invalidated
+    simulator.device(DEVICE).Record["label"] = "renamed"
+
+    assert client.device(DEVICE).Label == "renamed"
+    assert cache.Revalidations == 0
+
+
+def test_update_invalidates_metadata():
+    cache = TTLCache(ttl=300)
+    simulator, client = _client(metadataCache=cache)
+    client.device(DEVICE)
+    client.updateDevice(DEVICE, {"Label": "renamed"})
+
+    assert client.device(DEVICE).Label == "renamed"
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = TTLCache(maxSize=2)
+    cache.set("a", b"a")
+    cache.set("b", b"b")
+    cache.lookup("a")
+    cache.set("c", b"c")
+
+    assert cache.lookup("b") is None
+    assert cache.lookup("a").Content == b"a"
+    assert cache.lookup("c").Content == b"c"
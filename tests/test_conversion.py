@@ -0,0 +1,113 @@
+"""
+Convert and PowerFactor against values worked out by hand.
+"""
+from datetime import datetime, timezone
+import math
+import numpy as np
+import pytest
+from ..columns import ShortColumns, LongColumns
+from ..conversion import Convert, PowerFactor, IsLocalUnit
+from ..models import ShortData, LongData
+
+START = datetime(2021, 1, 1, tzinfo=timezone.utc)
+
+
+def _columns(real, reactive=None, duration=(300,), unit="J") -> LongColumns:
+    return LongColumns(Timestamp=np.arange(len(duration), dtype=np.int64),
+        Duration=np.array(duration, dtype=np.int64), Unit=unit,
+        Real=np.array(real, dtype=np.float64),
+        Reactive=None if reactive is None else np.array(reactive, dtype=np.float64))
+
+
+def test_joules_to_kwh_and_kw():
+    # 3.6 MJ is 1 kWh, and over 300 s it is 12 kW on average
+    columns = _columns([[3.6e6, -1.8e6]])
+
+    np.testing.assert_allclose(Convert(columns, "kWh").Real, [[1, -0.5]])
+    np.testing.assert_allclose(Convert(columns, "kW").Real, [[12, -6]])
+
+
+def test_kw_to_kwh_uses_each_duration():
+    # 6 kW for 10 minutes is 1 kWh, for an hour 6 kWh
+    columns = _columns([[6], [6]], duration=(600, 3600), unit="kW")
+
+    np.testing.assert_allclose(Convert(columns, "kWh").Real, [[1], [6]])
+    np.testing.assert_allclose(Convert(columns, "J").Real, [[3.6e6], [21.6e6]])
+
+
+def test_columns_round_trip_and_same_unit():
+    columns = _columns([[1234.5]], [[-10.0]])
+
+    assert Convert(columns, "J") is columns
+    back = Convert(Convert(Convert(columns, "kW"), "kWh"), "J")
+    np.testing.assert_allclose(back.Real, columns.Real)
+    np.testing.assert_allclose(back.Reactive, columns.Reactive)
+    assert back.Unit == "J"
+
+
+def test_zero_duration_leaves_kw_undefined():
+    columns = _columns([[100], [100]], duration=(0, 100))
+    kw = Convert(columns, "kW").Real
+
+    assert np.isnan(kw[0, 0])
+    assert kw[1, 0] == pytest.approx(0.001)
+
+
+def test_records_are_converted_as_copies():
+    record = ShortData(Timestamp=START, Duration=5, Unit=None, Real=[5000.0, None], Reactive=[-2500.0, 0.0])
+    converted, = Convert([record], "kW")
+
+    assert converted.Real == [1.0, None]
+    assert converted.Reactive == [-0.5, 0.0]
+    assert converted.Unit == "kW"
+    assert record.Real == [5000.0, None]
+
+
+def test_record_without_duration_has_no_kw():
+    record = LongData(Timestamp=START, Duration=None, Unit="J", Real=[3.6e6])
+
+    assert Convert([record], "kWh")[0].Real == [pytest.approx(1.0)]
+    assert Convert([record], "kW")[0].Real == [None]
+
+
+def test_unknown_units_are_rejected():
+    assert IsLocalUnit("kWh")
+    assert not IsLocalUnit("+pf")
+    assert not IsLocalUnit(None)
+    with pytest.raises(ValueError):
+        Convert(_columns([[1]]), "+pf")
+    with pytest.raises(ValueError):
+        Convert(_columns([[1]], unit="+pf"), "J")
+
+
+def test_power_factor_of_columns():
+    # a 3-4-5 triangle, exporting, purely reactive and no energy at all
+    columns = _columns([[3, -3, 0, 0]], [[4, 4, 5, 0]])
+    factors = PowerFactor(columns)
+
+    np.testing.assert_allclose(factors[0, :3], [0.6, -0.6, 0])
+    assert np.isnan(factors[0, 3])
+
+
+def test_power_factor_does_not_depend_on_unit():
+    columns = _columns([[3.6e6]], [[3.6e6]])
+
+    np.testing.assert_allclose(PowerFactor(Convert(columns, "kWh")), [[1 / math.sqrt(2)]])
+
+
+def test_power_factor_of_records():
+    records = [
+        ShortData(Timestamp=START, Duration=5, Real=[3.0, 0.0, None], Reactive=[-4.0, 0.0, 1.0]),
+        ShortData(Timestamp=START, Duration=5, Real=[1.0]),
+    ]
+    factors = PowerFactor(records)
+
+    assert factors[0][0] == pytest.approx(0.6)
+    assert factors[0][1:] == [None, None]
+    assert factors[1] is None
+
+
+def test_power_factor_needs_reactive_columns():
+    with pytest.raises(ValueError):
+        PowerFactor(ShortColumns(Timestamp=np.zeros(1, dtype=np.int64),
+            Duration=np.ones(1, dtype=np.int64), Real=np.ones((1, 1))))
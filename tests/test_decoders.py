@@ -0,0 +1,97 @@
+"""
+FastDecoder must build exactly the records the marshmallow schemas do.
+"""
+import dataclasses
+import json
+import pytest
+from ..enums import Energy
+from ..models import ShortDataSchema, LongDataSchema, ModbusDataSchema
+from ..columns import ShortColumns, LongColumns
+from ..decoders import SHORT_DATA_DECODER, LONG_DATA_DECODER, MODBUS_DATA_DECODER
+from ..benchmarks.payloads import ShortEnergyRows, LongEnergyRows, ModbusRows, Encode
+
+UNITS = (None, Energy.Joules, Energy.Killowatts, Energy.KillowattHours, Energy.PowerFactor)
+
+
+def _schema(schemaClass, unit):
+    schema = schemaClass()
+    if unit is not None:
+        schema.context['unit'] = str(unit)
+    return schema
+
+
+def _sparse(rows):
+    # rows as returned with fields[energy] and filter[group], or with gaps
+    rows = [dict(row) for row in rows]
+    for idx, row in enumerate(rows):
+        row["groupedBy"] = "phases"
+        if idx % 3 == 0:
+            row.pop("eReactive", None)
+            row.pop("eReactiveKw", None)
+        if idx % 5 == 0:
+            row["frequency"] = None
+    return rows
+
+
+def _assertRecordsEqual(actual, expected):
+    assert len(actual) == len(expected)
+    for idx, (a, e) in enumerate(zip(actual, expected)):
+        assert type(a) is type(e)
+        for f in dataclasses.fields(e):
+            assert getattr(a, f.name) == getattr(e, f.name), f"row {idx} {f.name}"
+
+
+CASES = [
+    ("short", ShortDataSchema, SHORT_DATA_DECODER, ShortEnergyRows(40)),
+    ("short sparse", ShortDataSchema, SHORT_DATA_DECODER, _sparse(ShortEnergyRows(40, channels=3))),
+    ("long", LongDataSchema, LONG_DATA_DECODER, LongEnergyRows(40)),
+    ("long 12ch", LongDataSchema, LONG_DATA_DECODER, LongEnergyRows(40, channels=12)),
+    ("modbus", ModbusDataSchema, MODBUS_DATA_DECODER, ModbusRows(40)),
+]
+
+
+@pytest.mark.parametrize("unit", UNITS, ids=str)
+@pytest.mark.parametrize("name,schemaClass,decoder,rows", CASES, ids=[c[0] for c in CASES])
+def test_loads_matches_schema(name, schemaClass, decoder, rows, unit):
+    content = Encode(rows)
+    expected = _schema(schemaClass, unit).loads(content, many=True)
+    actual = decoder.loads(content, unit, many=True)
+
+    _assertRecordsEqual(actual, expected)
+
+
+@pytest.mark.parametrize("unit", UNITS, ids=str)
+@pytest.mark.parametrize("name,schemaClass,decoder,rows", CASES, ids=[c[0] for c in CASES])
+def test_single_record_matches_schema(name, schemaClass, decoder, rows, unit):
+    content = json.dumps(rows[0]).encode()
+    expected = _schema(schemaClass, unit).loads(content)
+    actual = decoder.loads(content, unit)
+
+    _assertRecordsEqual([actual], [expected])
+
+
+@pytest.mark.parametrize("unit", UNITS, ids=str)
+@pytest.mark.parametrize("name,schemaClass,decoder,rows,columnsClass", [
+    ("short", ShortDataSchema, SHORT_DATA_DECODER, ShortEnergyRows(40), ShortColumns),
+    ("short sparse", ShortDataSchema, SHORT_DATA_DECODER, _sparse(ShortEnergyRows(40, channels=3)), ShortColumns),
+    ("long", LongDataSchema, LONG_DATA_DECODER, LongEnergyRows(40), LongColumns),
+], ids=["short", "short sparse", "long"])
+def test_columns_match_schema(name, schemaClass, decoder, rows, columnsClass, unit):
+    np = pytest.importorskip("numpy")
+    content = Encode(rows)
+    expected = columnsClass.fromRecords(_schema(schemaClass, unit).loads(content, many=True))
+    actual = decoder.loadsColumns(content, columnsClass, unit)
+
+    for f in dataclasses.fields(columnsClass):
+        a, e = getattr(actual, f.name), getattr(expected, f.name)
+        if isinstance(e, np.ndarray):
+            assert a.dtype == e.dtype, f.name
+            # the schema truncates LongData.Real to int, the columns keep the float
+            np.testing.assert_allclose(a, e, atol=1 if f.name == 'Real' else 0, err_msg=f.name)
+        else:
+            assert a == e, f.name
+
+
+def test_empty_payload():
+    assert SHORT_DATA_DECODER.loads(b"[]", Energy.Joules, many=True) == []
+    assert len(SHORT_DATA_DECODER.loadsColumns(b"[]", ShortColumns, Energy.Joules)) == 0
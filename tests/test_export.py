@@ -0,0 +1,125 @@
+"""
+Partition writers, and Export of simulated devices through them.
+"""
+import csv
+import os
+from datetime import datetime, timedelta, timezone
+import pytest
+from ..client import Client
+from ..enums import Granularity
+from ..export import Export, CsvWriter, ParquetWriter, ArrowWriter
+from ..models import LongData
+from ..simulator import Simulator, SimulatorAdapter
+
+START = datetime(2021, 2, 1, 22, tzinfo=timezone.utc)
+
+
+def _records(hours: int, channels: int = 2):
+    return [LongData(Timestamp=START + timedelta(hours=h), Duration=3600, Unit="J",
+        Real=[float(h + c) for c in range(channels)]) for h in range(hours)]
+
+
+def _relative(root, files):
+    return [os.path.relpath(f, root).replace(os.sep, "/") for f in files]
+
+
+def test_csv_partitions_by_device_and_date(tmp_path):
+    with CsvWriter(str(tmp_path)) as writer:
+        writer.write("long-energy", "D1", _records(4))
+        writer.write("long-energy", "D2", _records(1))
+
+    assert _relative(tmp_path, writer.Files) == [
+        "long-energy/device=D1/date=2021-02-01/part-0.csv",
+        "long-energy/device=D1/date=2021-02-02/part-0.csv",
+        "long-energy/device=D2/date=2021-02-01/part-0.csv",
+    ]
+    assert writer.Rows == 5
+
+    with open(writer.Files[1], newline="") as file:
+        rows = list(csv.DictReader(file))
+    assert [r["Timestamp"] for r in rows] == ["2021-02-02T00:00:00+00:00", "2021-02-02T01:00:00+00:00"]
+    assert [r["Real_1"] for r in rows] == ["3.0", "4.0"]
+    assert rows[0]["Duration"] == "3600"
+
+
+def test_partition_dates_follow_the_timezone(tmp_path):
+    # 22:00 utc is already the next morning in Sydney
+    with CsvWriter(str(tmp_path), timezone="Australia/Sydney") as writer:
+        writer.write("long-energy", "D1", _records(4))
+
+    assert _relative(tmp_path, writer.Files) == ["long-energy/device=D1/date=2021-02-02/part-0.csv"]
+
+
+def test_a_new_channel_starts_a_new_part(tmp_path):
+    with CsvWriter(str(tmp_path)) as writer:
+        writer.write("long-energy", "D1", _records(1))
+        writer.write("long-energy", "D1", _records(1, channels=3))
+
+    assert _relative(tmp_path, writer.Files) == [
+        "long-energy/device=D1/date=2021-02-01/part-0.csv",
+        "long-energy/device=D1/date=2021-02-01/part-1.csv",
+    ]
+
+
+@pytest.mark.parametrize("writerClass", [ParquetWriter, ArrowWriter])
+def test_arrow_formats_round_trip(writerClass, tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.ipc
+    import pyarrow.parquet
+
+    with writerClass(str(tmp_path)) as writer:
+        # batches of one partition are appended to the same file
+        writer.write("long-energy", "D1", _records(1))
+        writer.write("long-energy", "D1", _records(2)[1:])
+
+    path, = writer.Files
+    if writerClass is ParquetWriter:
+        table = pa.parquet.read_table(path)
+    else:
+        with pa.OSFile(path, "rb") as source:
+            table = pa.ipc.open_file(source).read_all()
+
+    assert table.num_rows == 2
+    # parquet has no second resolution, so reads back in milliseconds
+    assert pa.types.is_timestamp(table.schema.field("Timestamp").type)
+    assert table.schema.field("Timestamp").type.tz == "UTC"
+    assert table.schema.field("Duration").type == pa.int64()
+    assert table.schema.field("Real_0").type == pa.float64()
+    # fields that were never requested are typed from the record, not their None values
+    assert table.schema.field("VoltageRMSMin").type == pa.float64()
+    assert table.column("Real_1").to_pylist() == [1.0, 2.0]
+    assert [t.timestamp() for t in table.column("Timestamp").to_pylist()] == \
+        [START.timestamp(), (START + timedelta(hours=1)).timestamp()]
+
+
+def _client():
+    simulator = Simulator(devices=2, perSecond=None, perDay=None,
+        now=datetime(2021, 3, 1, tzinfo=timezone.utc).timestamp(), history=timedelta(days=30))
+    return simulator, Client("test", endpoint="http://test.invalid",
+        adapter=SimulatorAdapter(simulator, sleep=False))
+
+
+def test_export_writes_every_device(tmp_path):
+    simulator, client = _client()
+    deviceIds = simulator.deviceIds()
+    fromTs, toTs = datetime(2021, 2, 10, tzinfo=timezone.utc), datetime(2021, 2, 12, 12, tzinfo=timezone.utc)
+
+    result = Export(client, "long-energy", deviceIds + ["D999999"], CsvWriter(str(tmp_path)),
+        fromTs, toTs, granularity=Granularity.Hourly)
+
+    expected = sum(len(client.longEnergy(d, fromTs, toTs, Granularity.Hourly)) for d in deviceIds)
+    assert result.Rows == expected
+    assert len(result.Files) == 3 * len(deviceIds)
+    assert list(result.Errors) == ["D999999"]
+
+    rows = 0
+    for path in result.Files:
+        with open(path, newline="") as file:
+            rows += sum(1 for _ in csv.DictReader(file))
+    assert rows == expected
+
+
+def test_export_rejects_unknown_data(tmp_path):
+    _, client = _client()
+    with pytest.raises(ValueError):
+        Export(client, "devices", [], CsvWriter(str(tmp_path)))
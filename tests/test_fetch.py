@@ -0,0 +1,63 @@
+"""
+Query windows fetched in parallel come back in order, without the
+records repeated on the edges windows share.
+"""
+from datetime import datetime, timedelta, timezone
+import pytest
+from ..client import Client
+from ..enums import Granularity
+from ..simulator import Simulator, SimulatorAdapter
+
+NOW = datetime(2021, 3, 1, tzinfo=timezone.utc)
+DEVICE = "D100000"
+# whole hours so window edges land on readings, which both windows return
+FROM_TS = NOW - timedelta(days=3)
+TO_TS = NOW - timedelta(hours=1)
+
+
+@pytest.fixture
+def client():
+    # jitter larger than the latency makes later windows finish first
+    simulator = Simulator(devices=1, perSecond=None, perDay=None, latency=0.01, jitter=0.01,
+        now=NOW.timestamp(), history=timedelta(days=30))
+    return Client("test", endpoint="http://test.invalid", adapter=SimulatorAdapter(simulator), fastDecode=True)
+
+
+def _timestamps(data):
+    return [int(d.Timestamp.timestamp()) for d in data]
+
+
+@pytest.mark.parametrize("maxWorkers", [2, 4, 16])
+def test_parallel_short_energy_matches_serial(client, maxWorkers):
+    serial = client.shortEnergy(DEVICE, FROM_TS, TO_TS)
+    parallel = client.shortEnergy(DEVICE, FROM_TS, TO_TS, maxWorkers=maxWorkers)
+
+    timestamps = _timestamps(parallel)
+    assert timestamps == sorted(set(timestamps))
+    assert parallel == serial
+
+
+def test_parallel_long_energy_matches_serial(client):
+    serial = client.longEnergy(DEVICE, FROM_TS - timedelta(days=20), TO_TS, Granularity.FiveMinute)
+    parallel = client.longEnergy(DEVICE, FROM_TS - timedelta(days=20), TO_TS, Granularity.FiveMinute, maxWorkers=4)
+
+    timestamps = _timestamps(parallel)
+    assert timestamps == sorted(set(timestamps))
+    assert parallel == serial
+
+
+def test_parallel_batches_arrive_in_window_order(client):
+    batches = list(client.iterShortEnergy(DEVICE, FROM_TS, TO_TS, maxWorkers=4, batches=True))
+    timestamps = [_timestamps(batch) for batch in batches]
+
+    assert len(batches) > 4
+    for previous, batch in zip(timestamps, timestamps[1:]):
+        assert previous[-1] < batch[0]
+
+
+def test_parallel_columns_match_serial(client):
+    serial = client.shortEnergy(DEVICE, FROM_TS, TO_TS, as_="columns")
+    parallel = client.shortEnergy(DEVICE, FROM_TS, TO_TS, maxWorkers=4, as_="columns")
+
+    assert parallel.Timestamp.tolist() == serial.Timestamp.tolist()
+    assert (parallel.Timestamp[1:] > parallel.Timestamp[:-1]).all()
@@ -0,0 +1,21 @@
+"""
+Metrics.prometheus keeps full precision.
+"""
+from ..metrics import Metrics
+
+
+def _sample(text: str, name: str) -> str:
+    return next(line.split(' ')[1] for line in text.splitlines() if line.startswith(name + '{'))
+
+
+def test_large_counters_keep_every_digit():
+    metrics = Metrics()
+    metrics.increment("response_bytes_total", 1163190, endpoint="short-energy")
+    metrics.increment("backoff_seconds_total", 123456.789, endpoint="short-energy")
+    metrics.observe("request_seconds", 2345678.5, endpoint="short-energy")
+
+    text = metrics.prometheus()
+
+    assert _sample(text, "wattwatchers_response_bytes_total") == "1163190"
+    assert float(_sample(text, "wattwatchers_backoff_seconds_total")) == 123456.789
+    assert float(_sample(text, "wattwatchers_request_seconds_sum")) == 2345678.5
@@ -0,0 +1,49 @@
+"""
+Dirty tracking of device changes sent by Device.update.
+"""
+import pytest
+from ..models import Device, ChannelAttribute, PhaseConfiguration
+
+
+class _Client:
+    def __init__(self):
+        self.updates = []
+
+    def updateDevice(self, deviceId, updateFields):
+        self.updates.append((deviceId, dict(updateFields)))
+
+
+def _device() -> Device:
+    return Device("D1", Label="meter", Model="3W+", Phases=PhaseConfiguration(), _client=_Client())
+
+
+def test_api_names_set_the_field():
+    device = _device()
+    device.label = "new"
+
+    assert device.Label == "new"
+    assert device._dirtyFields == {"Label": "new"}
+
+
+def test_unknown_field_is_not_recorded():
+    device = _device()
+    with pytest.raises(AttributeError):
+        device.bogus = 1
+
+    assert device._dirtyFields == {}
+
+
+def test_update_sends_and_clears_changes():
+    device = _device()
+    device.Label = "new"
+    device.update()
+
+    assert device._client.updates == [("D1", {"Label": "new"})]
+    assert device._dirtyFields == {}
+
+
+def test_channel_changes():
+    channel = ChannelAttribute(Id="c1", Label="load")
+    channel.label = "solar"
+
+    assert channel._dirtyFields == {"Label": "solar"}
@@ -0,0 +1,92 @@
+"""
+WindowPlanner sizing, and planned windows fetched by the client.
+"""
+from datetime import datetime, timedelta, timezone
+import pytest
+from ..client import Client
+from ..planner import WindowPlanner
+from ..simulator import Simulator, SimulatorAdapter
+
+URL = "http://test.invalid/short-energy/D1"
+HOURS_12 = timedelta(hours=12)
+
+
+def test_unknown_endpoints_get_the_api_maximum():
+    assert WindowPlanner().period(URL, {}, HOURS_12) == HOURS_12
+
+
+def test_dense_responses_halve_the_window():
+    planner = WindowPlanner(targetBytes=1000)
+    # 12 hours returned 5000 bytes, so a window of 2.4 hours stays under the target
+    planner.record(URL, {}, HOURS_12, 5000, 0.1)
+
+    assert planner.period(URL, {}, HOURS_12) == HOURS_12 / 8
+
+
+def test_slow_responses_halve_the_window():
+    planner = WindowPlanner(targetLatency=1.0)
+    planner.record(URL, {}, HOURS_12, 10, 3.0)
+
+    assert planner.period(URL, {}, HOURS_12) == HOURS_12 / 4
+
+
+def test_windows_never_shrink_below_min_period():
+    planner = WindowPlanner(targetBytes=1, minPeriod=timedelta(hours=1))
+    planner.record(URL, {}, HOURS_12, 10 ** 9, 0.1)
+
+    assert planner.period(URL, {}, HOURS_12) == HOURS_12 / 8
+
+
+def test_windows_merge_back_once_responses_shrink():
+    planner = WindowPlanner(targetBytes=1000, smoothing=0.5)
+    planner.record(URL, {}, HOURS_12, 4000, 0.1)
+    assert planner.period(URL, {}, HOURS_12) == HOURS_12 / 4
+
+    # sparse responses pull the moving average down, and halves join back up
+    periods = []
+    for _ in range(4):
+        planner.record(URL, {}, HOURS_12 / 4, 10, 0.1)
+        periods.append(planner.period(URL, {}, HOURS_12))
+
+    assert periods == sorted(periods)
+    assert periods[-1] == HOURS_12
+
+
+def test_timeouts_cap_later_windows_at_half():
+    planner = WindowPlanner()
+    planner.timeout(URL, {}, HOURS_12 / 2)
+    planner.timeout(URL, {}, HOURS_12)
+
+    assert planner.period(URL, {}, HOURS_12) == HOURS_12 / 4
+
+
+def test_stats_are_kept_per_params_but_not_timezone():
+    planner = WindowPlanner(targetBytes=1000)
+    planner.record(URL, {"granularity": "5m", "timezone": "UTC"}, HOURS_12, 5000, 0.1)
+
+    assert planner.stats(URL, {"granularity": "5m", "timezone": "Australia/Sydney"}).Samples == 1
+    assert planner.stats(URL, {"granularity": "hour"}) is None
+
+    planner.reset(URL)
+    assert planner.stats(URL, {"granularity": "5m"}) is None
+
+
+def _client(**kwargs):
+    simulator = Simulator(devices=1, perSecond=None, perDay=None,
+        now=datetime(2021, 3, 1, tzinfo=timezone.utc).timestamp(), history=timedelta(days=30))
+    return simulator, Client("test", endpoint="http://test.invalid",
+        adapter=SimulatorAdapter(simulator, sleep=False), fastDecode=True, **kwargs)
+
+
+@pytest.mark.parametrize("alignWindows", [False, True])
+def test_planned_windows_return_the_same_data(alignWindows):
+    fromTs = datetime(2021, 2, 20, 3, 17, tzinfo=timezone.utc)
+    toTs = fromTs + timedelta(days=1, hours=5)
+    _, unplanned = _client()
+    # a target small enough that every window after the first is split
+    simulator, planned = _client(planner=WindowPlanner(targetBytes=200 * 1024), alignWindows=alignWindows)
+
+    data = planned.shortEnergy("D100000", fromTs, toTs)
+
+    assert simulator.Requests > 3
+    assert data == unplanned.shortEnergy("D100000", fromTs, toTs)
@@ -0,0 +1,23 @@
+"""
+Profiler keeps memory bounded however many calls it profiles.
+"""
+from ..profiling import Profiler, Stage
+
+
+def _call(profiler: Profiler):
+    def work():
+        with Stage("json"):
+            pass
+    profiler._run("shortEnergy", work)
+
+
+def test_calls_are_bounded_and_summarised():
+    profiler = Profiler(output=lambda profile: None, trackAllocations=False, keepCalls=3)
+    for _ in range(10):
+        _call(profiler)
+
+    assert len(profiler.Calls) == 3
+    summary = profiler.Summary["shortEnergy"]
+    assert summary["wall"].Count == 10
+    assert summary["json"].Count == 10
+    assert summary["json"].MaxSeconds <= summary["json"].Seconds
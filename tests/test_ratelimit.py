@@ -0,0 +1,38 @@
+"""
+RateLimiter.RateLimits combines responses that arrive out of order.
+"""
+from ..models import RateLimits
+from ..ratelimit import RateLimiter
+
+
+def _limits(remaining: int, reset: float, remainingPerDay: int = 1000):
+    return RateLimits(TotalPerSecond=10, RemainingPerSecond=remaining, TotalPerSecondResetCounter=reset,
+        TotalPerDay=5000, RemainingPerDay=remainingPerDay, TotalPerDayResetCounter=3600)
+
+
+def test_keeps_lowest_remaining_in_window():
+    limiter = RateLimiter()
+    limiter.update(_limits(3, 0.5, 990))
+    # an earlier response of the same window arriving late
+    limiter.update(_limits(7, 0.4, 994))
+
+    assert limiter.RateLimits.RemainingPerSecond == 3
+    assert limiter.RateLimits.RemainingPerDay == 990
+    assert limiter.RateLimits.TotalPerSecondResetCounter >= 0.45
+
+
+def test_new_window_replaces_remaining():
+    limiter = RateLimiter()
+    limiter.update(_limits(0, 0.0))
+    limiter.update(_limits(9, 1.0))
+
+    assert limiter.RateLimits.RemainingPerSecond == 9
+
+
+def test_missing_headers_keep_known_values():
+    limiter = RateLimiter()
+    limiter.update(_limits(4, 0.5))
+    limiter.update(RateLimits())
+
+    assert limiter.RateLimits.RemainingPerSecond == 4
+    assert limiter.RateLimits.TotalPerSecond == 10
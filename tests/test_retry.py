@@ -0,0 +1,75 @@
+"""
+RetryPolicy keeps 429s apart from the retries and budget of failures.
+"""
+import pytest
+import requests
+from .. import client
+from ..client import ApiRequest
+from ..exceptions import RetryError
+from ..ratelimit import RateLimiter
+from ..retry import RetryPolicy
+
+
+def _response(status: int, headers: dict = None) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status
+    response.headers.update(headers or {})
+    response._content = b'{}'
+    return response
+
+
+def _requests(*responses):
+    responses = iter(responses)
+    return lambda: next(responses)
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    slept = []
+    monkeypatch.setattr(client, "sleep", slept.append)
+    return slept
+
+
+def test_throttles_do_not_use_retries_or_budget():
+    policy = RetryPolicy(retries=1, budget=0.0, budgetReserve=0)
+
+    assert all(policy.withdraw(attempt, throttled=True) for attempt in range(50))
+    assert not policy.withdraw(0)
+    assert policy.Throttled == 50
+
+
+def test_throttle_retries_cap():
+    policy = RetryPolicy(throttleRetries=2)
+
+    assert policy.withdraw(1, throttled=True)
+    assert not policy.withdraw(2, throttled=True)
+
+
+def test_429s_outlast_retries(sleeps):
+    throttled = _response(429, {"X-RateLimit-TpsReset": "0.5", "X-RateLimit-TpdRemaining": "100"})
+    requestFunc = _requests(*[throttled] * 5, _response(200))
+
+    content, _ = ApiRequest(requestFunc, RetryPolicy(retries=1, backoff=0.0))
+
+    assert content == b'{}'
+    assert sleeps == [0.5] * 5
+
+
+def test_429_with_limiter_waits_once(sleeps):
+    throttled = _response(429, {"X-RateLimit-TpsRemaining": "0", "X-RateLimit-TpsReset": "1",
+        "X-RateLimit-TpdRemaining": "100", "Retry-After": "1"})
+    limiter = RateLimiter()
+
+    ApiRequest(_requests(throttled, _response(200)), RetryPolicy(backoff=0.0), limiter)
+
+    assert len(sleeps) == 1
+    assert sleeps[0] == pytest.approx(1.0, abs=0.05)
+
+
+def test_failures_use_retries(sleeps):
+    requestFunc = _requests(*[_response(503)] * 3)
+
+    with pytest.raises(RetryError) as e:
+        ApiRequest(requestFunc, RetryPolicy(retries=2, budget=None))
+
+    assert e.value.Attempts == 3
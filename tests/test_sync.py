@@ -0,0 +1,127 @@
+"""
+syncShortEnergy and syncLongEnergy against the simulator, moving its
+clock between syncs.
+"""
+from datetime import datetime, timedelta, timezone
+import pytest
+from ..client import Client
+from ..enums import Granularity
+from ..simulator import Simulator, SimulatorAdapter
+from ..sync import MemoryCursorStore, SqliteCursorStore
+
+NOW = datetime(2021, 3, 1, 10, 30, tzinfo=timezone.utc).timestamp()
+DEVICE = "D100000"
+
+
+@pytest.fixture
+def simulator():
+    return Simulator(devices=1, perSecond=None, perDay=None, now=NOW, history=timedelta(hours=6))
+
+
+@pytest.fixture
+def client(simulator):
+    return Client("test", endpoint="http://test.invalid", adapter=SimulatorAdapter(simulator, sleep=False))
+
+
+def _timestamps(data):
+    return [int(d.Timestamp.timestamp()) for d in data]
+
+
+def test_cold_start_reads_from_the_first_record(simulator, client):
+    store = MemoryCursorStore()
+    data = client.syncShortEnergy(DEVICE, store)
+
+    timestamps = _timestamps(data)
+    assert timestamps == sorted(set(timestamps))
+    assert timestamps[0] == simulator.device(DEVICE).Since
+    assert store.get(DEVICE, "short-energy") == timestamps[-1]
+
+
+def test_cold_start_from_since(simulator, client):
+    store = MemoryCursorStore()
+    since = int(NOW) - 3600
+    data = client.syncShortEnergy(DEVICE, store, since=since)
+
+    assert min(_timestamps(data)) >= since
+
+
+def test_incremental_sync_returns_only_new_records(simulator, client):
+    store = MemoryCursorStore()
+    first = _timestamps(client.syncShortEnergy(DEVICE, store))
+
+    assert client.syncShortEnergy(DEVICE, store) == []
+
+    simulator.fixedNow = NOW + 600
+    second = _timestamps(client.syncShortEnergy(DEVICE, store))
+
+    assert second
+    assert min(second) > max(first)
+    assert store.get(DEVICE, "short-energy") == max(second)
+
+    # together the two syncs hold exactly the records of one full read
+    expected = _timestamps(client.shortEnergy(DEVICE, simulator.device(DEVICE).Since, max(second)))
+    assert first + second == expected
+
+
+def test_partial_bucket_is_returned_once_it_closes(simulator, client):
+    store = MemoryCursorStore()
+    first = client.syncLongEnergy(DEVICE, store, Granularity.Hourly)
+
+    # the hour in progress at 10:30 is held back, not stored part filled
+    assert first
+    assert all(d.Timestamp.timestamp() + d.Duration <= NOW + 900 for d in first)
+    pending = max(_timestamps(first)) + 3600
+    assert pending not in _timestamps(first)
+
+    simulator.fixedNow = NOW + 3600
+    second = client.syncLongEnergy(DEVICE, store, Granularity.Hourly)
+
+    assert _timestamps(second)[0] == pending
+    assert second[0].Duration == 3600
+    assert not set(_timestamps(first)) & set(_timestamps(second))
+
+
+def test_cursors_are_kept_per_endpoint(client):
+    store = MemoryCursorStore()
+    client.syncLongEnergy(DEVICE, store, Granularity.Hourly)
+
+    assert store.get(DEVICE, "long-energy/hour") is not None
+    assert store.get(DEVICE, "long-energy/15m") is None
+    assert store.get(DEVICE, "short-energy") is None
+
+
+@pytest.mark.parametrize("store", ["memory", "sqlite"])
+def test_cursor_store_round_trip(store, tmp_path):
+    if store == "memory":
+        store = MemoryCursorStore()
+    else:
+        store = SqliteCursorStore(str(tmp_path / "cursors.db"))
+
+    assert store.get("D1", "short-energy") is None
+
+    store.set("D1", "short-energy", 100)
+    store.set("D1", "long-energy/hour", 200)
+    store.set("D2", "short-energy", 300)
+    store.set("D1", "short-energy", 150.0)
+
+    assert store.get("D1", "short-energy") == 150
+    assert store.get("D1", "long-energy/hour") == 200
+
+    store.reset("D1", "short-energy")
+    assert store.get("D1", "short-energy") is None
+    assert store.get("D1", "long-energy/hour") == 200
+
+    store.reset("D1")
+    assert store.get("D1", "long-energy/hour") is None
+    assert store.get("D2", "short-energy") == 300
+
+
+def test_sqlite_cursors_survive_a_restart(tmp_path):
+    path = str(tmp_path / "cursors.db")
+    store = SqliteCursorStore(path)
+    store.set("D1", "short-energy", 100)
+    store.close()
+
+    store = SqliteCursorStore(path)
+    assert store.get("D1", "short-energy") == 100
+    store.close()
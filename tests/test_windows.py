@@ -0,0 +1,140 @@
+"""
+CreateAlignedQueryWindows edges and bounds, and _dedupeBatches across
+the edges windows share.
+"""
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+import numpy as np
+import pytest
+from ..client import Client, _dedupeBatches
+from ..columns import ShortColumns
+from ..enums import Granularity
+from ..models import ShortData
+from ..planner import WindowPlanner
+from ..simulator import Simulator, SimulatorAdapter
+from ..utilities import CreateAlignedQueryWindows, AlignTimestamp
+
+LORD_HOWE = "Australia/Lord_Howe"
+
+
+def _hours(window) -> float:
+    return (window[1].timestamp() - window[0].timestamp()) / 3600
+
+
+def _assertContiguous(windows, fromTs, toTs):
+    assert windows[0][0] == fromTs
+    assert windows[-1][1] == toTs
+    for (_, end), (start, _) in zip(windows, windows[1:]):
+        assert end == start
+
+
+@pytest.mark.parametrize("zone, fromTs, toTs", [
+    # clocks go back half an hour, and forward again in October
+    (LORD_HOWE, datetime(2019, 4, 6, 12), datetime(2019, 4, 8)),
+    (LORD_HOWE, datetime(2019, 10, 5, 12), datetime(2019, 10, 7)),
+    ("Europe/London", datetime(2021, 10, 30), datetime(2021, 11, 1)),
+])
+def test_windows_never_exceed_max_period_across_dst(zone, fromTs, toTs):
+    tz = ZoneInfo(zone)
+    fromTs, toTs = fromTs.replace(tzinfo=tz), toTs.replace(tzinfo=tz)
+    windows = CreateAlignedQueryWindows(fromTs, toTs, timedelta(hours=12), None, zone)
+
+    _assertContiguous(windows, fromTs, toTs)
+    assert max(_hours(w) for w in windows) <= 12
+
+
+def test_lord_howe_window_is_cut_at_twelve_hours():
+    tz = ZoneInfo(LORD_HOWE)
+    fromTs = datetime(2019, 4, 7, tzinfo=tz)
+    windows = CreateAlignedQueryWindows(fromTs, fromTs + timedelta(days=1), timedelta(hours=12), None, LORD_HOWE)
+
+    # a wall clock grid would give 00:00+11:00 to 12:00+10:30, 12.5 hours
+    assert windows[0] == (fromTs, datetime(2019, 4, 7, 11, 30, tzinfo=tz))
+    assert _hours(windows[0]) == 12
+
+
+@pytest.mark.parametrize("granularity, maxQueryPeriod", [
+    (Granularity.FiveMinute, timedelta(hours=12)),
+    (Granularity.Hourly, timedelta(days=7)),
+    (Granularity.Daily, timedelta(days=30)),
+    (Granularity.Weekly, timedelta(days=90)),
+    (Granularity.Monthly, timedelta(days=365)),
+])
+@pytest.mark.parametrize("zone", [None, LORD_HOWE, "America/New_York"])
+def test_inner_edges_are_aligned_and_bounded(granularity, maxQueryPeriod, zone):
+    fromTs = datetime(2019, 1, 3, 7, 13, tzinfo=timezone.utc)
+    toTs = fromTs + 3 * maxQueryPeriod + timedelta(hours=5)
+    windows = CreateAlignedQueryWindows(fromTs, toTs, maxQueryPeriod, granularity, zone)
+
+    _assertContiguous(windows, fromTs, toTs)
+    assert len(windows) >= 4
+    assert max(_hours(w) for w in windows) <= maxQueryPeriod.total_seconds() / 3600
+    for _, edge in windows[:-1]:
+        assert AlignTimestamp(edge, granularity, zone) == edge
+
+
+def test_inner_windows_repeat_between_calls():
+    fromTs = datetime(2021, 1, 1, 3, tzinfo=timezone.utc)
+    first = CreateAlignedQueryWindows(fromTs, fromTs + timedelta(days=3), timedelta(hours=12), Granularity.Hourly)
+    later = CreateAlignedQueryWindows(fromTs + timedelta(hours=5), fromTs + timedelta(days=3),
+        timedelta(hours=12), Granularity.Hourly)
+
+    assert first[1:] == later[1:]
+
+
+def test_empty_range_is_one_window():
+    fromTs = datetime(2021, 1, 1, tzinfo=timezone.utc)
+
+    assert CreateAlignedQueryWindows(fromTs, fromTs, timedelta(hours=12)) == [(fromTs, fromTs)]
+
+
+def _records(*seconds):
+    return [ShortData(Timestamp=datetime.fromtimestamp(s, timezone.utc), Duration=5) for s in seconds]
+
+
+def test_dedupe_drops_records_on_shared_edges():
+    batches = [_records(0, 5, 10), _records(10, 15), [], _records(15, 20, 25)]
+    deduped = list(_dedupeBatches(iter(batches)))
+
+    timestamps = [int(r.Timestamp.timestamp()) for batch in deduped for r in batch]
+    assert timestamps == [0, 5, 10, 15, 20, 25]
+    assert len(deduped) == len(batches)
+
+
+def test_dedupe_drops_columns_on_shared_edges():
+    def columns(*seconds):
+        return ShortColumns(Timestamp=np.array(seconds, dtype=np.int64),
+            Duration=np.full(len(seconds), 5, dtype=np.int64))
+
+    batches = [columns(0, 5, 10), columns(10, 15), columns(), columns(15, 20)]
+    deduped = list(_dedupeBatches(iter(batches)))
+
+    assert np.concatenate([b.Timestamp for b in deduped]).tolist() == [0, 5, 10, 15, 20]
+
+
+def _client(**kwargs):
+    simulator = Simulator(devices=1, perSecond=None, perDay=None,
+        now=datetime(2021, 3, 1, tzinfo=timezone.utc).timestamp(), history=timedelta(days=30))
+    return simulator, Client("test", endpoint="http://test.invalid",
+        adapter=SimulatorAdapter(simulator, sleep=False), **kwargs)
+
+
+def test_planned_empty_range_is_one_request():
+    simulator, client = _client(planner=WindowPlanner())
+    fromTs = datetime(2021, 2, 20, tzinfo=timezone.utc)
+    client.shortEnergy("D100000", fromTs, fromTs)
+
+    assert simulator.Requests == 1
+
+
+def test_updating_a_device_drops_its_window_timezone():
+    simulator, client = _client(alignWindows=True)
+    fromTs = datetime(2021, 2, 20, tzinfo=timezone.utc)
+    client.longEnergy("D100000", fromTs, fromTs + timedelta(days=2), Granularity.Daily)
+    assert client._Client__timezones["D100000"] != LORD_HOWE
+
+    client.updateDevice("D100000", {"Timezone": LORD_HOWE})
+    assert "D100000" not in client._Client__timezones
+
+    client.longEnergy("D100000", fromTs, fromTs + timedelta(days=2), Granularity.Daily)
+    assert client._Client__timezones["D100000"] == LORD_HOWE
@@ -1,6 +1,11 @@
-from .enums import SignalQuality as SignalQualityEnum
+from .enums import SignalQuality as SignalQualityEnum, Granularity
 from datetime import datetime, timedelta, timezone as dtTimezone
-from typing import Union
+from typing import Any, Callable, List, Tuple, Union
+from dataclasses import dataclass, fields
+from zoneinfo import ZoneInfo
+import importlib
+import json
+import sys
 
 QUALITY_BAND = (SignalQualityEnum.Excellent, SignalQualityEnum.Good, \
     SignalQualityEnum.Low, SignalQualityEnum.Poor)
@@ -48,6 +53,11 @@ def NormaliseTimestamps(fromTs: Union[int, datetime], toTs: Union[int, datetime]
         elif not isinstance(fromTs, datetime):
             raise TypeError(fromTs)
 
+    # a default "now" is timezone aware, while epoch ints become naive local
+    # time, so make both aware before they are compared
+    if (fromTs.tzinfo is None) != (toTs.tzinfo is None):
+        fromTs, toTs = fromTs.astimezone(), toTs.astimezone()
+
     return (fromTs, toTs)
 
 def CreateQueryWindows(fromTs: datetime, toTs: datetime, maxQueryPeriod):
@@ -65,4 +75,164 @@ def CreateQueryWindows(fromTs: datetime, toTs: datetime, maxQueryPeriod):
 
     return windows
 
-    
\ No newline at end of file
+# length of each granularity interval that does not start on a local midnight
+GRANULARITY_MINUTES = {
+    Granularity.FiveMinute: 5,
+    Granularity.FifteenMinute: 15,
+    Granularity.HalfHourly: 30,
+    Granularity.Hourly: 60
+}
+# how far aligning a grid edge to the start of its week or month can move it
+GRANULARITY_MARGIN = {
+    Granularity.Weekly: timedelta(days=7),
+    Granularity.Monthly: timedelta(days=31)
+}
+
+def AlignTimestamp(ts: datetime, granularity: Union[str, Granularity] = None, timezone: str = None) -> datetime:
+    """
+    Floors a timestamp to the start of its granularity interval in the
+    given timezone, weeks starting on a Monday.
+
+    ts : datetime - naive values are taken as local system time
+    granularity : str, Granularity - interval to align to, None to only convert
+    timezone : str - IANA timezone name, defaults to UTC
+
+    return : datetime - timezone aware start of the interval
+    """
+    local = ts.astimezone(ZoneInfo(timezone) if timezone else dtTimezone.utc)
+
+    if granularity is None:
+        return local
+
+    granularity = Granularity(granularity)
+    if granularity in GRANULARITY_MINUTES:
+        minutes = local.hour * 60 + local.minute
+        minutes -= minutes % GRANULARITY_MINUTES[granularity]
+        return local.replace(hour=minutes // 60, minute=minutes % 60, second=0, microsecond=0)
+
+    local = local.replace(hour=0, minute=0, second=0, microsecond=0)
+    if granularity == Granularity.Weekly:
+        local -= timedelta(days=local.weekday())
+    elif granularity == Granularity.Monthly:
+        local = local.replace(day=1)
+
+    return local
+
+def CreateAlignedQueryWindows(fromTs: datetime, toTs: datetime, maxQueryPeriod: timedelta,
+        granularity: Union[str, Granularity] = None, timezone: str = None):
+    """
+    Splits a range into query windows like CreateQueryWindows, but cuts
+    them on a fixed grid counted from the epoch in the given timezone,
+    with each edge aligned to the start of a granularity interval. Every
+    call over the same period produces the same inner windows, only the
+    first and last follow fromTs and toTs, so windows can be cached and
+    resumed and no granularity interval is split across two windows.
+
+    Grid steps of a day or more are whole local days, shortened so a
+    window never exceeds maxQueryPeriod after alignment or across a
+    daylight saving change.
+    """
+    granularity = None if granularity is None else Granularity(granularity)
+    tz = ZoneInfo(timezone) if timezone else dtTimezone.utc
+    step = maxQueryPeriod
+    if step >= timedelta(days=1):
+        margin = GRANULARITY_MARGIN.get(granularity, timedelta(0))
+        if timezone:
+            margin += timedelta(days=1)
+        step = timedelta(days=max(1, (step - margin).days))
+
+    # arithmetic on aware datetimes sharing a tzinfo is on the local wall clock
+    origin = datetime(1970, 1, 1, tzinfo=tz)
+    index = (fromTs.astimezone(tz) - origin) // step + 1
+    end = toTs.timestamp()
+
+    windows = []
+    start = fromTs
+    while True:
+        edge = AlignTimestamp(origin + index * step, granularity, timezone)
+        if edge.timestamp() >= end:
+            break
+        if edge.timestamp() > start.timestamp():
+            start = _appendBoundedWindows(windows, start, edge, maxQueryPeriod, granularity, timezone)
+        index += 1
+
+    _appendBoundedWindows(windows, start, toTs, maxQueryPeriod, granularity, timezone)
+    return windows
+
+def _appendBoundedWindows(windows: List[Tuple[datetime, datetime]], start: datetime, end: datetime,
+        maxQueryPeriod: timedelta, granularity: Granularity, timezone: str) -> datetime:
+    """
+    Appends the window from start to end, first cutting off aligned
+    windows of at most maxQueryPeriod in elapsed time while it is longer,
+    as a window of whole local hours or days is when the clocks go back.
+
+    return : datetime - end of the last window
+    """
+    limit = maxQueryPeriod.total_seconds()
+    while end.timestamp() - start.timestamp() > limit:
+        bound = start.astimezone(dtTimezone.utc) + maxQueryPeriod
+        cut = AlignTimestamp(bound, granularity, timezone)
+        if cut.timestamp() <= start.timestamp():
+            cut = AlignTimestamp(bound, None, timezone)
+        windows.append((start, cut))
+        start = cut
+
+    windows.append((start, end))
+    return end
+
+
+# json parsers in order of preference, each a module exposing loads
+JSON_BACKENDS = ('orjson', 'ujson', 'json')
+_jsonLoads: Callable[[Union[bytes, str]], Any] = json.loads
+
+def SetJsonBackend(backend: Union[str, Callable[[Union[bytes, str]], Any]] = None) -> Callable:
+    """
+    Sets the json parser used to decode every response. Takes the name
+    of a module with a loads function, a loads callable, or None to use
+    the fastest installed parser from JSON_BACKENDS.
+
+    return : Callable - the loads function now in use
+    """
+    global _jsonLoads
+
+    if callable(backend):
+        _jsonLoads = backend
+    elif backend is not None:
+        _jsonLoads = importlib.import_module(backend).loads
+    else:
+        for name in JSON_BACKENDS:
+            try:
+                _jsonLoads = importlib.import_module(name).loads
+                break
+            except ImportError:
+                continue
+
+    return _jsonLoads
+
+def JsonLoads(content: Union[bytes, str]) -> Any:
+    """
+    Parses json with the backend chosen by SetJsonBackend.
+    """
+    return _jsonLoads(content)
+
+SetJsonBackend()
+
+def Slotted(cls: type) -> type:
+    """
+    dataclass(slots=True), which needs Python 3.10. Older versions get
+    the same result by rebuilding the class with a slot per field, as
+    3.10 does, so partial devices still miss on unset fields.
+    """
+    if sys.version_info >= (3, 10):
+        return dataclass(slots=True)(cls)
+
+    cls = dataclass(cls)
+    names = tuple(f.name for f in fields(cls))
+    namespace = dict(cls.__dict__)
+    for name in names + ('__dict__', '__weakref__'):
+        namespace.pop(name, None)
+    namespace['__slots__'] = names
+
+    slotted = type(cls)(cls.__name__, cls.__bases__, namespace)
+    slotted.__qualname__ = cls.__qualname__
+    return slotted